@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingest import NO_ASSIST, OWN_GOAL
+
+
+
+class AssistMatrix:
+    # Sparse scorer x assistant count matrix of a season, built once from the goals DataFrame
+    # Rows: every player plus a last row for own goals. Columns: every player plus a last column for unassisted goals
+
+    def __init__(self, df):
+        scorers = df['Scorer'].to_numpy(dtype=object)
+        assistants = df['Assistant'].to_numpy(dtype=object)
+
+        # Everybody who scored or assisted, own goals and missing assistants are not players
+        names = np.concatenate([scorers, assistants])
+        self.players = np.unique(names[(names != OWN_GOAL) & (names != NO_ASSIST)])
+        self.player_ids = {name: i for i, name in enumerate(self.players)}
+        n = len(self.players)
+
+        # Extra row and column
+        self.own_goal_row = n
+        self.unassisted_column = n
+
+        rows = np.array([self.player_ids.get(name, n) for name in scorers], dtype=np.int64)
+        columns = np.array([self.player_ids.get(name, n) for name in assistants], dtype=np.int64)
+        counts = sparse.coo_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(n + 1, n + 1))
+
+        # Row-major copy for "who assisted X", column-major copy for "whom X assisted"
+        self.by_scorer = counts.tocsr()
+        self.by_assistant = counts.tocsc()
+
+    def _series(self, ids, counts, labels):
+        series = pd.Series(counts, index=labels[ids], dtype='int64')
+        return series.sort_values(ascending=False, kind='stable')
+
+    def received(self, player):
+        # Assists received by the player, per assistant (unassisted goals are not included)
+        if player not in self.player_ids:
+            return pd.Series(dtype='int64')
+        row = self.by_scorer.getrow(self.player_ids[player])
+        keep = row.indices != self.unassisted_column
+        return self._series(row.indices[keep], row.data[keep], self.players)
+
+    def granted(self, player):
+        # Assists given by the player, per scorer (own goals appear as OWN_GOAL)
+        if player not in self.player_ids:
+            return pd.Series(dtype='int64')
+        column = self.by_assistant.getcol(self.player_ids[player])
+        labels = np.append(self.players, OWN_GOAL)
+        return self._series(column.indices, column.data, labels)
+
+    def unassisted(self, player):
+        # Goals the player scored without an assist, as a one-row Series (empty when there are none)
+        if player not in self.player_ids:
+            return pd.Series(dtype='int64')
+        count = self.by_scorer[self.player_ids[player], self.unassisted_column]
+        if count == 0:
+            return pd.Series(dtype='int64')
+        return pd.Series([count], index=[player], dtype='int64')
+
+    def goals(self, player):
+        # Goals scored by the player, assisted or not
+        if player not in self.player_ids:
+            return 0
+        return int(self.by_scorer.getrow(self.player_ids[player]).sum())
+
+    def assists(self, player):
+        # Assists given by the player
+        if player not in self.player_ids:
+            return 0
+        return int(self.by_assistant.getcol(self.player_ids[player]).sum())
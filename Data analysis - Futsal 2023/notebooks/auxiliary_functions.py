@@ -1,15 +1,16 @@
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
-from matplotlib.ticker import PercentFormatter
-from matplotlib.colors import LinearSegmentedColormap
-import seaborn as sns
-import os
-import numpy as np
-from matplotlib import gridspec
-from PIL import Image, ImageDraw, ImageFont
+from itertools import zip_longest
 
+from fonts import get_font
+from lazy import lazy_import
+from tables import TableSpec, highlight_rows, paginate, plot_tables, raster_tables
 
-os.environ["OMP_NUM_THREADS"] = "9"
+
+# Plotting libraries, imported the first time a chart is drawn so that importing this module stays cheap
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
+mcolors = lazy_import('matplotlib.colors')
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
 
 
 #Colors for charts
@@ -21,65 +22,74 @@ color_assits_bg = '#9F6923'
 color_assits_lt = 'white' 
 
 # Colors alternate rows
-row_colors = ['#DDB06D', '#EBCFA7'] 
+row_colors = ['#DDB06D', '#EBCFA7']
 
 
 
-def plot_season_standings_table(df_players):
-    
-    # Create a figure and axis for the table
-    fig, ax = plt.subplots(figsize=(3.5, 3)) 
-    ax.axis('off')  # Disable the axes
-
-    # Create a table
-    table = ax.table(cellText=df_players.values, colLabels=df_players.columns, cellLoc='center', loc='center')
-
-    # Table styling
-    table.auto_set_font_size(False) 
-    table.set_fontsize(10)
-    table.scale(3.5, 3.5)  # Adjust the scale
-    table.scale(0.85, 0.5)  # Adjust the scale to reduce space between rows
-
-    # Highlight the first row with a different color
-    for i in range(len(df_players.columns)):
-        cell = table[(0, i)]
-        cell.set_facecolor(color_points_bg)  # Background color
-        cell.get_text().set_color(color_points_lt)  # Text color
-        cell.get_text().set_weight('bold')  # Bold text
-
-    # Alternate row colors for better visualization
-    for i in range(len(df_players)):
-        for j in range(len(df_players.columns)):
-            table[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Bold the sixth column
-    for i in range(len(df_players)):
-        table[(i + 1, 6)].get_text().set_weight('bold')
-
-    # Display the table
+def show_figure():
+    # Display the current figure (the batch renderer replaces this to save it to a file instead)
     plt.show()
 
 
 
+def show_image(image):
+    # Display a PIL image in Jupyter Notebook (the batch renderer replaces this to save it to a file instead)
+    from IPython.display import display
+    display(image)
+
+
+
+def format_efficiency(df, column='Efficiency', decimals=2):
+    # Efficiency is kept numeric in the tables and only formatted as a percentage for display
+    if column in df.columns and df[column].dtype.kind in 'fiu':
+        df = df.assign(**{column: df[column].map(('{:.%df}%%' % decimals).format)})
+    return df
+
+
+
+def plot_season_standings_table(df_players, backend='matplotlib', rows_per_page=None):
+    # Format the efficiency as a percentage
+    df_players = format_efficiency(df_players)
+
+    # Header highlighted and the points in bold, one figure per page
+    for page in paginate(df_players, rows_per_page):
+        show_tables([TableSpec(page, color_points_bg, color_points_lt, row_colors, fontsize=10, header_bold=True, bold_columns=['Points'])], backend)
+
+
+
+
+def show_tables(specs, backend='matplotlib'):
+    # Draw tables side by side with the table engine ('matplotlib') or straight into an image ('raster')
+    if backend == 'raster':
+        show_image(raster_tables(specs))
+    elif backend == 'matplotlib':
+        plot_tables(specs)
+        show_figure()
+    else:
+        raise ValueError(f'Unknown table backend: {backend}')
+
+
+
+def plot_points_evolution(timeline, player_names, title='Score Evolution Throughout the Year', ylabel='Score'):
+    # Columns of the chosen players in the matches x players matrix
+    positions = {name: i for i, name in enumerate(timeline.players)}
 
-def plot_points_evolution(df_vd, player_names):
- 
     # Plot the points of each player by date
     plt.figure(figsize=(20, 10))
 
     for player in player_names:
-        plt.plot(df_vd['Date'], df_vd[player + '_points'], label=player, linewidth=5)  
+        plt.plot(timeline.dates, timeline.values[:, positions[player]], label=player, linewidth=5)
 
     # Remove the top, right, and bottom borders
-    sns.despine(top=True, right=True, left=True, bottom=True)    
+    sns.despine(top=True, right=True, left=True, bottom=True)
 
     # Remove the grid
     plt.grid(False)
 
     # Set the title and labels
-    plt.title('Score Evolution Throughout the Year', fontsize=20, weight='bold')
+    plt.title(title, fontsize=20, weight='bold')
     plt.xlabel('Date')
-    plt.ylabel('Score')
+    plt.ylabel(ylabel)
     
     # Add legend
     plt.legend(loc='center left', bbox_to_anchor=(1, 0.5))
@@ -91,7 +101,7 @@ def plot_points_evolution(df_vd, player_names):
     plt.tight_layout()
     
     # Display the plot
-    plt.show()
+    show_figure()
 
 
 
@@ -115,7 +125,7 @@ def plot_goal_scorers(df):
 
     # Create a custom color palette
     colors = [start_color, end_color]
-    cmap = LinearSegmentedColormap.from_list("custom_green", colors, N=num_bars)
+    cmap = mcolors.LinearSegmentedColormap.from_list("custom_green", colors, N=num_bars)
     custom_palette = [cmap(i/num_bars) for i in range(num_bars)]
 
     # Display the bar plot with the custom palette
@@ -138,7 +148,7 @@ def plot_goal_scorers(df):
     plt.tick_params(axis='y', labelsize=10)
     
     # Show the graph
-    plt.show()
+    show_figure()
 
 
 
@@ -159,7 +169,7 @@ def plot_assist_leaders(assistant_counts):
 
     # Create a custom color palette
     colors = [start_color, end_color]
-    cmap = LinearSegmentedColormap.from_list("custom_green", colors, N=num_bars)
+    cmap = mcolors.LinearSegmentedColormap.from_list("custom_green", colors, N=num_bars)
     custom_palette = [cmap(i/num_bars) for i in range(num_bars)]
 
     sns.barplot(x=assistant_counts.values, y=assistant_counts.index, palette=custom_palette)
@@ -181,75 +191,23 @@ def plot_assist_leaders(assistant_counts):
     plt.tick_params(axis='y', labelsize=10)
 
     # Show the chart
-    plt.show()
-
+    show_figure()
 
 
-def plot_assistants_scorers_tables(df_assistants, df_scorer):
-    # Create a figure and axes for the subplots
-    fig, axs = plt.subplots(1, 2, figsize=(8, 4))
 
-    # Disable the axes in both subplots
-    for ax in axs:
-        ax.axis('off')
+def plot_assistants_scorers_tables(df_assistants, df_scorer, backend='matplotlib', rows_per_page=None):
+    # Assistants and scorers side by side, the count of each table in bold
+    for assistants, scorers in zip_longest(paginate(df_assistants, rows_per_page), paginate(df_scorer, rows_per_page)):
+        specs = []
+        if assistants is not None:
+            specs.append(TableSpec(assistants, color_assits_bg, color_assits_lt, row_colors, fontsize=10, header_bold=True, bold_columns=['Assists'],
+                                   title='Assistants Table', title_color=color_assits_bg, title_size=14))
+        if scorers is not None:
+            specs.append(TableSpec(scorers, color_gols_bg, color_gols_lt, row_colors, fontsize=10, header_bold=True, bold_columns=['Goals'],
+                                   title='Scorer Table', title_color=color_gols_bg, title_size=14))
 
-    # Table 1: Assistants Table
-    table1 = axs[0].table(cellText=df_assistants.values, colLabels=df_assistants.columns, cellLoc='center', loc='upper center')
-    table1.auto_set_font_size(False)
-    table1.set_fontsize(10)
-    table1.scale(3.4, 3.4)  # Adjust the scale
-    table1.scale(0.95, 0.5)  # Adjust the scale to reduce space between rows
-
-    # Highlight the first row with a different color and text color for Assistants Table
-    for i in range(len(df_assistants.columns)):
-        cell = table1[(0, i)]
-        cell.set_facecolor(color_assits_bg)  # Background color
-        cell.get_text().set_color(color_assits_lt)  # Text color
-        cell.get_text().set_weight('bold')  # Bold text
-
-    # Alternate row colors for better visualization in Assistants Table
-    for i in range(len(df_assistants)):
-        for j in range(len(df_assistants.columns)):
-            table1[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Bold the fourth column in Assistants Table
-    for i in range(len(df_assistants)):
-        table1[(i + 1, 3)].get_text().set_weight('bold')
-
-    # Title for Table 1
-    axs[0].set_title('Assistants Table', fontsize=14, fontweight='bold', color=color_assits_bg, pad=10)    
-
-    # Table 2: Scorer Table
-    table2 = axs[1].table(cellText=df_scorer.values, colLabels=df_scorer.columns, cellLoc='center', loc='upper center')
-    table2.auto_set_font_size(False)
-    table2.set_fontsize(10)
-    table2.scale(3.4, 3.4)  # Adjust the scale
-    table2.scale(0.95, 0.5)  # Adjust the scale to reduce space between rows
-
-    # Highlight the first row with a different color and text color for Scorer Table
-    for i in range(len(df_scorer.columns)):
-        cell = table2[(0, i)]
-        cell.set_facecolor(color_gols_bg)  # Background color
-        cell.get_text().set_color(color_gols_lt)  # Text color
-        cell.get_text().set_weight('bold')  # Bold text
-
-    # Alternate row colors for better visualization in Scorer Table
-    for i in range(len(df_scorer)):
-        for j in range(len(df_scorer.columns)):
-            table2[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Bold the fourth column in Scorer Table
-    for i in range(len(df_scorer)):
-        table2[(i + 1, 3)].get_text().set_weight('bold')
-
-    # Manually adjust the margins
-    plt.subplots_adjust(wspace=2.45)  # Adjust the space between the subplots
-
-    # Title for Table 2
-    axs[1].set_title('Scorer Table', fontsize=14, fontweight='bold', color=color_gols_bg , pad=10)
-
-    # Display the tables together
-    plt.show()
+        # Display the tables together
+        show_tables(specs, backend)
 
 
 
@@ -282,7 +240,7 @@ def plot_goals_assists(df_scorer, df_assistants):
 
     # Adjust layout and display the plots
     plt.tight_layout()
-    plt.show()
+    show_figure()
 
 
 
@@ -347,80 +305,23 @@ def plot_goals_per_location(df_sum_goals_venues):
     ax3.set_xticklabels(ax3.get_xticklabels(), fontweight='bold')
 
     # Display the plots
-    plt.show()
+    show_figure()
 
 
 
-def plot_monthly_tables(table_month, table_goals_month, table_assists_month, months_eng, selected_month):
-    # Create a grid with 1 row and 3 columns to accommodate the 3 tables
-    gs = gridspec.GridSpec(1, 3, width_ratios=[1, 1, 1])
-
-    # Create a figure with the grid
-    fig = plt.figure(figsize=(15, 5))
-
-    # Add the first table to the axis of the first column
-    ax0 = plt.subplot(gs[0])
-    ax0.axis('off')
-    table0 = ax0.table(cellText=table_month.values, colLabels=table_month.columns, loc='center', cellLoc='center', colColours=[color_points_bg]*len(table_month.columns))
-    table0.auto_set_font_size(False)
-    table0.set_fontsize(13)
-    table0.auto_set_column_width(col=list(range(len(table_month.columns))))
-    table0.scale(1, 1.5)  # Adjust the value as needed
-    ax0.text(0.5, 0.90, f'Points Table - {months_eng[selected_month]}', fontsize=14, ha='center', va='center', color=color_points_bg, fontweight='bold', transform=ax0.transAxes)
-
-    # Change the color of the first row text for the first table
-    for i in range(len(table_month.columns)):
-        cell = table0[(0, i)]
-        cell.get_text().set_color(color_points_lt)  # Text color
-
-    # Alternate row colors for the first table
-    for i in range(len(table_month)):
-        for j in range(len(table_month.columns)):
-            table0[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Add the second table to the axis of the second column
-    ax1 = plt.subplot(gs[1])
-    ax1.axis('off')
-    table1 = ax1.table(cellText=table_goals_month.values, colLabels=table_goals_month.columns, loc='center', cellLoc='center', colColours=[color_gols_bg]*len(table_goals_month.columns))
-    table1.auto_set_font_size(False)
-    table1.set_fontsize(13)
-    table1.auto_set_column_width(col=list(range(len(table_goals_month.columns))))
-    table1.scale(1, 1.5)  # Adjust the value as needed
-    ax1.text(0.5, 0.90, f'Goals Table - {months_eng[selected_month]}', fontsize=14, ha='center', va='center', color=color_gols_bg, fontweight='bold', transform=ax1.transAxes)
-
-    # Alternate row colors for the second table
-    for i in range(len(table_goals_month)):
-        for j in range(len(table_goals_month.columns)):
-            table1[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Change the color of the first row text for the second table
-    for i in range(len(table_goals_month.columns)):
-        cell = table1[(0, i)]
-        cell.get_text().set_color(color_gols_lt)  # Text color        
-
-    # Add the third table to the axis of the third column
-    ax2 = plt.subplot(gs[2])
-    ax2.axis('off')
-    table2 = ax2.table(cellText=table_assists_month.values, colLabels=table_assists_month.columns, loc='center', cellLoc='center', colColours=[color_assits_bg]*len(table_assists_month.columns))
-    table2.auto_set_font_size(False)
-    table2.set_fontsize(13)
-    table2.auto_set_column_width(col=list(range(len(table_assists_month.columns))))
-    table2.scale(1, 1.5)  # Adjust the value as needed
-    ax2.text(0.5, 0.90, f'Assists Table - {months_eng[selected_month]}', fontsize=14, ha='center', va='center', color=color_assits_bg, fontweight='bold', transform=ax2.transAxes)
-
-    # Alternate row colors for the third table
-    for i in range(len(table_assists_month)):
-        for j in range(len(table_assists_month.columns)):
-            table2[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Change the color of the first row text for the third table
-    for i in range(len(table_assists_month.columns)):
-        cell = table2[(0, i)]
-        cell.get_text().set_color(color_assits_lt)  # Text color        
-
-    # Adjust layout
-    plt.tight_layout()
-    plt.show()
+def plot_monthly_tables(table_month, table_goals_month, table_assists_month, months_eng, selected_month, backend='matplotlib', rows_per_page=None):
+    # Format the efficiency as a percentage
+    table_month = format_efficiency(table_month)
+
+    # Points, goals and assists tables of the month side by side
+    tables = [(table_month, color_points_bg, color_points_lt, 'Points Table'),
+              (table_goals_month, color_gols_bg, color_gols_lt, 'Goals Table'),
+              (table_assists_month, color_assits_bg, color_assits_lt, 'Assists Table')]
+    pages = zip_longest(*[paginate(table, rows_per_page) for table, _, _, _ in tables])
+    for page in pages:
+        show_tables([TableSpec(df, header_color, header_text_color, row_colors, fontsize=13,
+                               title=f'{title} - {months_eng[selected_month]}', title_color=header_color, title_size=14)
+                     for df, (_, header_color, header_text_color, title) in zip(page, tables) if df is not None], backend)
 
 
 
@@ -473,7 +374,7 @@ def plot_games_goals_month(months_pt,goals_per_month, games_per_month):
     plt.tight_layout()
 
     # Show the plots
-    plt.show()
+    show_figure()
 
 
 
@@ -509,7 +410,7 @@ def plot_average_goals_month(months_pt, average_goals_per_game):
     plt.grid(False)
 
     # Display the plot
-    plt.show()
+    show_figure()
 
 
 
@@ -543,7 +444,7 @@ def plot_goal_type(goal_type_counts):
     # Remove the x-axis legend
     plt.yticks([])  
 
-    plt.show()
+    show_figure()
 
 
 
@@ -576,63 +477,36 @@ def plot_goal_time(segment_counts):
     # Set the y-axis limit
     plt.ylim(0, 450)
 
-    plt.show()
+    show_figure()
 
 
 
-def plot_top_performances(top_10_scorers, top_10_assistants):
-    # Create a grid of 1 row and 2 columns to accommodate the 2 tables
-    gs = gridspec.GridSpec(1, 2, width_ratios=[1, 1])
-
-    # Create a figure with the grid
-    fig = plt.figure(figsize=(15, 5))
-
-    # Add the first table to the first column's axis
-    ax0 = plt.subplot(gs[0])
-    ax0.axis('off')
-    table0 = ax0.table(cellText=top_10_scorers.values, colLabels=top_10_scorers.columns, loc='center', cellLoc='center', colColours=[color_gols_bg]*len(top_10_scorers.columns))
-    table0.auto_set_font_size(False)
-    table0.set_fontsize(15)
-    table0.auto_set_column_width(col=list(range(len(top_10_scorers.columns))))
-    table0.scale(2, 2.2)  # Adjust value as needed
-    ax0.text(0.5, 1.20, f'Top Number of Goals in a Match', fontsize=20, ha='center', va='center', color=color_gols_bg, fontweight='bold', transform=ax0.transAxes)
-
-    # Alternate row colors for the first table
-    for i in range(len(top_10_scorers)):
-        for j in range(len(top_10_scorers.columns)):
-            table0[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Add the second table to the second column's axis
-    ax1 = plt.subplot(gs[1])
-    ax1.axis('off')
-    table1 = ax1.table(cellText=top_10_assistants.values, colLabels=top_10_assistants.columns, loc='center', cellLoc='center', colColours=[color_assits_bg]*len(top_10_assistants.columns))
-    table1.auto_set_font_size(False)
-    table1.set_fontsize(15)
-    table1.auto_set_column_width(col=list(range(len(top_10_assistants.columns))))
-    table1.scale(2, 2.2)  # Adjust value as needed
-    ax1.text(0.5, 1.20, f'Top Number of Assists in a Match', fontsize=20, ha='center', va='center', color=color_assits_bg, fontweight='bold', transform=ax1.transAxes)
-
-    # Alternate row colors for the second table
-    for i in range(len(top_10_assistants)):
-        for j in range(len(top_10_assistants.columns)):
-            table1[(i + 1, j)].set_facecolor(row_colors[i % 2])
-
-    # Adjust the layout
-    plt.tight_layout()
-    plt.show()
+def plot_top_performances(top_10_scorers, top_10_assistants, backend='matplotlib'):
+    # Best matches in goals and assists side by side
+    show_tables([
+        TableSpec(top_10_scorers, color_gols_bg, color_gols_lt, row_colors, fontsize=15,
+                  title='Top Number of Goals in a Match', title_color=color_gols_bg, title_size=20),
+        TableSpec(top_10_assistants, color_assits_bg, color_assits_lt, row_colors, fontsize=15,
+                  title='Top Number of Assists in a Match', title_color=color_assits_bg, title_size=20)
+    ], backend)
 
 
 
-def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, efficiency, participations, goals_scored, assists):
+def draw_player_stats(chosen_player, num_games, wins, draws, losses, points, efficiency, participations, goals_scored, assists):
+    # Stats card of a player as a PIL image
+    # Format the efficiency as a percentage
+    if not isinstance(efficiency, str):
+        efficiency = f'{efficiency:.2f}%'
+
     # Create a blank image
     width, height = 800, 300
     image = Image.new("RGB", (width, height), "#DDB06D")
     draw = ImageDraw.Draw(image)
 
-    # Use Arial Bold font
-    font_size = 22
-    font_path_bold = "C:/Windows/Fonts/arialbd.ttf"  # Path to Arial Bold font on Windows
-    font_bold = ImageFont.truetype(font_path_bold, font_size)
+    # Bold sans fonts (Arial Bold when installed), loaded once per size
+    font_bold = get_font(22)
+    font_large = get_font(30)
+    font_medium = get_font(27)
 
     # Define column width
     column_width = width // 2
@@ -644,7 +518,7 @@ def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, eff
     text_height_player = text_bbox_player[3] - text_bbox_player[1]
     x_player = (column_width - text_width_player) / 5
     y_player = (height - text_height_player) / 2
-    draw.text((x_player, y_player), text_player, font=ImageFont.truetype(font_path_bold, 30), fill=color_points_bg )
+    draw.text((x_player, y_player), text_player, font=font_large, fill=color_points_bg )
 
     # Second column (additional information)
     column2_x = column_width - 51  # Adjust to the right to separate columns
@@ -655,7 +529,7 @@ def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, eff
     text_bbox_games = draw.textbbox((0, 0), text_games, font=font_bold)
     text_width_games = text_bbox_games[2] - text_bbox_games[0]
     x_games = column2_x + (column_width - text_width_games) / 2.7
-    draw.text((x_games, column2_y), text_games, font=ImageFont.truetype(font_path_bold, 30), fill=color_points_bg )
+    draw.text((x_games, column2_y), text_games, font=font_large, fill=color_points_bg )
 
     # Line 2: Wins, Losses, and Draws
     text_results = f"Wins: {wins} | Draws: {draws} | Losses: {losses}"
@@ -664,11 +538,11 @@ def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, eff
 
     # Line 3: Points
     text_points = f"{points} Points"
-    text_bbox_points = draw.textbbox((0, 0), text_points, font=ImageFont.truetype(font_path_bold, 30))
+    text_bbox_points = draw.textbbox((0, 0), text_points, font=font_large)
     text_width_points = text_bbox_points[2] - text_bbox_points[0]
     x_points = column2_x + (column_width - text_width_points) / 2.3
     column2_y += text_height_player + 30  # Adjust down for the next line
-    draw.text((x_points, column2_y), text_points, font=ImageFont.truetype(font_path_bold, 30), fill="#00361e")
+    draw.text((x_points, column2_y), text_points, font=font_large, fill="#00361e")
 
     # Line 4: Efficiency
     text_efficiency = f"{efficiency} Efficiency"
@@ -684,7 +558,7 @@ def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, eff
     text_width_participations = text_bbox_participations[2] - text_bbox_participations[0]
     x_participations = column2_x + (column_width - text_width_participations) / 5
     column2_y += text_height_player + 30  # Adjust down for the next line
-    draw.text((x_participations, column2_y), text_participations, font=ImageFont.truetype(font_path_bold, 27), fill="#740013")
+    draw.text((x_participations, column2_y), text_participations, font=font_medium, fill="#740013")
 
     # Line 6: Goals and Assists
     text_goals_assists = f"Goals: {goals_scored} | Assists: {assists}"
@@ -694,226 +568,49 @@ def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, eff
     column2_y += text_height_player + 17  # Adjust down for the next line
     draw.text((x_goals_assists, column2_y), text_goals_assists, font=font_bold, fill="#fe2713")
 
-    # Display the image in Jupyter Notebook
-    display(image)
-
-
-
-def plot_player_classification(df_player_adjacent_points, chosen_player):
-    # Create a figure and axes for the subplots
-    fig, axs = plt.subplots(1, 1, figsize=(8, 4))  # Use only 1 subplot
-
-    # Disable the axes
-    axs.axis('off')
-
-    # Table 1
-    table1 = axs.table(cellText=df_player_adjacent_points.values, colLabels=df_player_adjacent_points.columns, cellLoc='center', loc='upper center')
-    table1.auto_set_font_size(False)
-    table1.set_fontsize(20)
-    table1.scale(3.4, 3.4)  # Adjust the scale
-
-    # Alternate row colors for better visualization
-    for i in range(1, len(df_player_adjacent_points)+1):
-        for j in range(len(df_player_adjacent_points.columns)):
-            table1[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-    # Highlight the first row with a different color
-    for i in range(len(df_player_adjacent_points.columns)):
-        table1[(0, i)].set_facecolor(color_points_bg) 
-        table1[(0, i)].get_text().set_color(color_points_lt)
-
-    # Mark the player's row in light green
-    for i in range(len(df_player_adjacent_points)):
-        if df_player_adjacent_points.iloc[i]['Player'] == chosen_player:
-            for j in range(len(df_player_adjacent_points.columns)):
-                table1[(i+1, j)].set_facecolor('lightgreen')  # Light green color
-            break
-
-
-    # Make the sixth column bold
-    for i in range(len(df_player_adjacent_points)):
-        table1[(i+1, 6)].get_text().set_weight('bold')
-
-    # Adjust margins manually
-    plt.subplots_adjust(wspace=2.45)  # Adjust the space between subplots
-
-    # Display the table
-    plt.show()
-
+    return image
 
 
-def plot_player_goals_assits_classification(df_player_adjacent_scorers, df_player_adjacent_assists, chosen_player):
-    # Create a figure and axes for the subplots
-    fig, axs = plt.subplots(1, 2, figsize=(15, 5))
 
-    # Disable the axes in both subplots
-    for ax in axs:
-        ax.axis('off')
-
-    # Table 1: Scorers
-    table1 = axs[0].table(cellText=df_player_adjacent_scorers.values, colLabels=df_player_adjacent_scorers.columns, cellLoc='center', loc='upper center')
-    table1.auto_set_font_size(False)
-    table1.set_fontsize(15)
-    table1.scale(3.4, 3.4)  # Adjust the scale
-
-    # Highlight the first row with a different color
-    for i in range(len(df_player_adjacent_scorers.columns)):
-        table1[(0, i)].set_facecolor(color_gols_bg)
-        table1[(0, i)].get_text().set_color(color_gols_lt)
-
-    # Alternate row colors for better visualization
-    for i in range(1, len(df_player_adjacent_scorers)+1):
-        for j in range(len(df_player_adjacent_scorers.columns)):
-            table1[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-    # Mark the player's row in light green
-    for i in range(len(df_player_adjacent_scorers)):
-        if df_player_adjacent_scorers.iloc[i]['Player'] == chosen_player:
-            for j in range(len(df_player_adjacent_scorers.columns)):
-                table1[(i+1, j)].set_facecolor('lightgreen')  # Light green color
-            break
-
-    # Make the fourth column bold (index 3)
-    for i in range(len(df_player_adjacent_scorers)):
-        table1[(i + 1, 3)].get_text().set_weight('bold')
-
-    # Set the title for the first table
-    axs[0].set_title('Scorers Around Player', fontsize=16, fontweight='bold')
+def plot_player_stats(chosen_player, num_games, wins, draws, losses, points, efficiency, participations, goals_scored, assists):
+    # Display the image in Jupyter Notebook
+    show_image(draw_player_stats(chosen_player, num_games, wins, draws, losses, points, efficiency, participations, goals_scored, assists))
 
-    # Table 2: Assists
-    table2 = axs[1].table(cellText=df_player_adjacent_assists.values, colLabels=df_player_adjacent_assists.columns, cellLoc='center', loc='upper center')
-    table2.auto_set_font_size(False)
-    table2.set_fontsize(15)
-    table2.scale(3.4, 3.4)  # Adjust the scale
 
-    # Highlight the first row with a different color
-    for i in range(len(df_player_adjacent_assists.columns)):
-        table2[(0, i)].set_facecolor(color_assits_bg)
-        table2[(0, i)].get_text().set_color(color_assits_lt)
 
-    # Alternate row colors for better visualization
-    for i in range(1, len(df_player_adjacent_assists)+1):
-        for j in range(len(df_player_adjacent_assists.columns)):
-            table2[(i, j)].set_facecolor(row_colors[(i-1) % 2])
+def plot_player_classification(df_player_adjacent_points, chosen_player, backend='matplotlib'):
+    # Format the efficiency as a percentage
+    df_player_adjacent_points = format_efficiency(df_player_adjacent_points)
 
-    # Mark the player's row in light green
-    for i in range(len(df_player_adjacent_assists)):
-        if df_player_adjacent_assists.iloc[i]['Player'] == chosen_player:
-            for j in range(len(df_player_adjacent_assists.columns)):
-                table2[(i+1, j)].set_facecolor('lightgreen')  # Light green color
-            break
+    # The player's row in light green and the points in bold
+    show_tables([TableSpec(df_player_adjacent_points, color_points_bg, color_points_lt, row_colors, fontsize=20, bold_columns=['Points'],
+                           highlight_rows=highlight_rows(df_player_adjacent_points, chosen_player)[:1])], backend)
 
-    # Make the fourth column bold (index 3)
-    for i in range(len(df_player_adjacent_assists)):
-        table2[(i+1, 3)].get_text().set_weight('bold')
 
-    # Set the title for the second table
-    axs[1].set_title('Assists Around Player', fontsize=16, fontweight='bold')
 
-    # Adjust margins manually
-    plt.subplots_adjust(wspace=2.45)  # Adjust the space between subplots
+def plot_player_goals_assits_classification(df_player_adjacent_scorers, df_player_adjacent_assists, chosen_player, backend='matplotlib'):
+    # Scorers and assistants around the player side by side, the player's row in light green and the counts in bold
+    show_tables([
+        TableSpec(df_player_adjacent_scorers, color_gols_bg, color_gols_lt, row_colors, fontsize=15, bold_columns=['Goals'],
+                  highlight_rows=highlight_rows(df_player_adjacent_scorers, chosen_player)[:1], title='Scorers Around Player', title_size=16),
+        TableSpec(df_player_adjacent_assists, color_assits_bg, color_assits_lt, row_colors, fontsize=15, bold_columns=['Assists'],
+                  highlight_rows=highlight_rows(df_player_adjacent_assists, chosen_player)[:1], title='Assists Around Player', title_size=16)
+    ], backend)
 
-    # Display the tables side by side
-    plt.show()
 
 
+def plot_player_best_performance(top_5_scorer_games, top_5_assist_games, chosen_player, has_goals, has_assists, backend='matplotlib'):
+    # Tables of the best matches the player has, in goals and/or assists
+    specs = []
+    if has_goals:
+        specs.append(TableSpec(top_5_scorer_games, color_gols_bg, color_gols_lt, row_colors, fontsize=15,
+                               title='Top Number of Goals in a Match', title_color=color_gols_bg, title_size=20))
+    if has_assists:
+        specs.append(TableSpec(top_5_assist_games, color_assits_bg, color_assits_lt, row_colors, fontsize=15,
+                               title='Top Number of Assists in a Match', title_color=color_assits_bg, title_size=20))
 
-def plot_player_best_performance(top_5_scorer_games, top_5_assist_games, chosen_player, has_goals, has_assists):
-   # Check the conditions and plot the corresponding tables
-    if has_goals and has_assists:
-        # Create a 1x2 grid for accommodating the 2 tables
-        gs = gridspec.GridSpec(1, 2, width_ratios=[1, 1])
-
-        # Create a figure with the grid
-        fig = plt.figure(figsize=(15, 4.3))
-
-        # Add the first table to the first subplot
-        ax0 = plt.subplot(gs[0])
-        ax0.axis('off')
-        table0 = ax0.table(cellText=top_5_scorer_games.values, colLabels=top_5_scorer_games.columns, loc='center', cellLoc='center', colColours=[color_gols_bg ]*len(top_5_scorer_games.columns))
-        table0.auto_set_font_size(False)
-        table0.set_fontsize(15)
-        table0.auto_set_column_width(col=list(range(len(top_5_scorer_games.columns))))
-        table0.scale(2, 2.2)  # Adjust the value as needed
-        ax0.text(0.5, 0.90, f'Top Number of Goals in a Match', fontsize=20, ha='center', va='center', color=color_gols_bg, fontweight='bold', transform=ax0.transAxes)
-
-        # Add alternate row colors
-        for i in range(1, len(top_5_scorer_games)+1):
-            for j in range(len(top_5_scorer_games.columns)):
-                table0[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-        # Set the color of the first row text
-        for i in range(len(top_5_scorer_games.columns)):
-            table0[(0, i)].get_text().set_color(color_gols_lt)
-
-        # Add the second table to the second subplot
-        ax1 = plt.subplot(gs[1])
-        ax1.axis('off')
-        table1 = ax1.table(cellText=top_5_assist_games.values, colLabels=top_5_assist_games.columns, loc='center', cellLoc='center', colColours=[color_assits_bg ]*len(top_5_assist_games.columns))
-        table1.auto_set_font_size(False)
-        table1.set_fontsize(15)
-        table1.auto_set_column_width(col=list(range(len(top_5_assist_games.columns))))
-        table1.scale(2, 2.2)  # Adjust the value as needed
-        ax1.text(0.5, 0.90, f'Top Number of Assists in a Match', fontsize=20, ha='center', va='center', color=color_assits_bg, fontweight='bold', transform=ax1.transAxes)
-
-        # Add alternate row colors
-        for i in range(1, len(top_5_assist_games)+1):
-            for j in range(len(top_5_assist_games.columns)):
-                table1[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-        # Set the color of the first row text
-        for i in range(len(top_5_assist_games.columns)):
-            table1[(0, i)].get_text().set_color(color_assits_lt)
-
-        # Adjust layout
-        plt.tight_layout()
-
-        # Display the tables together
-        plt.show()
-    elif has_goals:
-        # If the player has only goals, plot the goals table
-        plt.figure(figsize=(15, 5))
-        plt.axis('off')
-        table0 = plt.table(cellText=top_5_scorer_games.values, colLabels=top_5_scorer_games.columns, loc='center', cellLoc='center', colColours=[color_gols_bg ]*len(top_5_scorer_games.columns))
-        table0.auto_set_font_size(False)
-        table0.set_fontsize(15)
-        table0.auto_set_column_width(col=list(range(len(top_5_scorer_games.columns))))
-        table0.scale(2, 2.2)  # Adjust the value as needed
-        plt.text(0.5, 0.90, f'Top Number of Goals in a Match', fontsize=20, ha='center', va='center', color=color_gols_bg, fontweight='bold', transform=plt.gca().transAxes)
-
-        # Add alternate row colors
-        for i in range(1, len(top_5_scorer_games)+1):
-            for j in range(len(top_5_scorer_games.columns)):
-                table0[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-        # Set the color of the first row text
-        for i in range(len(top_5_scorer_games.columns)):
-            table0[(0, i)].get_text().set_color(color_gols_lt)
-
-        plt.tight_layout()
-        plt.show()
-    elif has_assists:
-        # If the player has only assists, plot the assists table
-        plt.figure(figsize=(15, 5))
-        plt.axis('off')
-        table1 = plt.table(cellText=top_5_assist_games.values, colLabels=top_5_assist_games.columns, loc='center', cellLoc='center', colColours=[color_assits_bg ]*len(top_5_assist_games.columns))
-        table1.auto_set_font_size(False)
-        table1.set_fontsize(25)
-        table1.auto_set_column_width(col=list(range(len(top_5_assist_games.columns))))
-        table1.scale(2, 2.2)  # Adjust the value as needed
-        plt.text(0.5, 0.90, f'Top Number of Assists in a Match', fontsize=20, ha='center', va='center', color=color_assits_bg, fontweight='bold', transform=plt.gca().transAxes)
-
-        # Add alternate row colors
-        for i in range(1, len(top_5_assist_games)+1):
-            for j in range(len(top_5_assist_games.columns)):
-                table1[(i, j)].set_facecolor(row_colors[(i-1) % 2])
-
-        # Set the color of the first row text
-        for i in range(len(top_5_assist_games.columns)):
-            table1[(0, i)].get_text().set_color(color_assits_lt)
-
-        plt.tight_layout()
-        plt.show()
+    if specs:
+        show_tables(specs, backend)
     else:
         # If the player has neither goals nor assists, print a message
         print(f"The player {chosen_player} did not score any goals or assists.") 
@@ -948,7 +645,7 @@ def plot_frequent_teamates(players_count, chosen_player, max_value):
     # Set the y-axis limit to max_value + 10% of it
     plt.ylim(0, max_value + 0.1 * max_value)
 
-    plt.show()
+    show_figure()
 
 
 
@@ -991,7 +688,7 @@ def plot_win_lose_teamate(players, losses, draws, wins, games, efficiency, max_g
     # Set the y-axis limit to max_games + 10% of it
     plt.ylim(0, max_games + 0.1 * max_games)
 
-    plt.show()
+    show_figure()
 
 
 
@@ -1034,7 +731,7 @@ def plot_player_involvement(df_scorer_counts, df_assistant_counts, total_counts,
     # Remove the x-axis legend
     plt.yticks([])
     plt.ylim(0, total_counts + total_counts * 0.15)
-    plt.show()
+    show_figure()
 
 
 
@@ -1089,7 +786,7 @@ def plot_player_involvement_period(part_counts, part_counts_goals, part_counts_a
     # Legend
     plt.legend(["Involvement", "Goals", "Assists"])
 
-    plt.show()
+    show_figure()
 
 
 
@@ -1145,7 +842,7 @@ def plot_player_involviment_type(part_counts, part_counts_goals, part_counts_ass
     # Legend
     plt.legend(["Involvement", "Goals", "Assists"])
 
-    plt.show()
+    show_figure()
 
 
 
@@ -1234,7 +931,7 @@ def plot_player_assists_teamates(assistant_counts_scorer, no_assistant_counts, a
         plt.tight_layout()
 
         # Show the charts
-        plt.show()   
+        show_figure()   
 
     elif assistant_counts_scorer.empty and not no_assistant_counts.empty and assistant_counts_assistant.empty:
         # Plot only the second chart
@@ -1261,7 +958,7 @@ def plot_player_assists_teamates(assistant_counts_scorer, no_assistant_counts, a
         plt.tight_layout()
 
         # Show the chart
-        plt.show()   
+        show_figure()   
 
     elif not assistant_counts_scorer.empty and no_assistant_counts.empty and assistant_counts_assistant.empty:
         # Plot only the first chart
@@ -1288,7 +985,7 @@ def plot_player_assists_teamates(assistant_counts_scorer, no_assistant_counts, a
         plt.tight_layout()
 
         # Show the chart
-        plt.show()      
+        show_figure()      
 
     elif assistant_counts_scorer.empty and no_assistant_counts.empty and not assistant_counts_assistant.empty:
         # Plot only the third chart
@@ -1314,4 +1011,4 @@ def plot_player_assists_teamates(assistant_counts_scorer, no_assistant_counts, a
         plt.tight_layout()
 
         # Show the chart
-        plt.show()	
\ No newline at end of file
+        show_figure()	
\ No newline at end of file
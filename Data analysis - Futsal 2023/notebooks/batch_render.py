@@ -0,0 +1,232 @@
+import os
+import re
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from goal_types import GOAL_TYPES, SEGMENTS
+from standings import adjacent_rows
+
+
+# A chart to render: 'function' is the name of a plot_* function of auxiliary_functions
+RenderJob = namedtuple('RenderJob', ['name', 'function', 'args', 'kwargs'])
+
+# Outcome of a rendered chart
+RenderResult = namedtuple('RenderResult', ['name', 'files', 'seconds', 'error'])
+
+# Formats understood by the renderer
+FORMATS = ('png', 'pdf', 'svg')
+
+# Output of the chart being rendered in this process: (path without extension, formats, list of written files)
+_target = None
+
+
+
+def safe_name(name):
+    # File name for a chart name (player names may contain accents and spaces, but no path separators)
+    return re.sub(r'[\\/:*?"<>|]+', '_', name).strip()
+
+
+
+def _save_figure():
+    # Replacement of auxiliary_functions.show_figure: save every open figure and close it
+    import matplotlib.pyplot as plt
+
+    base, formats, files = _target
+    for number in plt.get_fignums():
+        figure = plt.figure(number)
+        suffix = '' if not files else f' ({len(files) // len(formats) + 1})'
+        for extension in formats:
+            path = f'{base}{suffix}.{extension}'
+            figure.savefig(path, bbox_inches='tight', facecolor=figure.get_facecolor())
+            files.append(path)
+    plt.close('all')
+
+
+
+def _save_image(image):
+    # Replacement of auxiliary_functions.show_image: save the PIL image
+    base, formats, files = _target
+    for extension in formats:
+        path = f'{base}.{extension}'
+        image.save(path)
+        files.append(path)
+
+
+
+def init_worker():
+    # Headless matplotlib and plotting functions loaded once per process
+    import matplotlib
+    matplotlib.use('Agg')
+
+    import auxiliary_functions
+    auxiliary_functions.show_figure = _save_figure
+    auxiliary_functions.show_image = _save_image
+
+
+
+@contextmanager
+def _rendering_here():
+    # init_worker in the calling process (e.g. the notebook) for one batch: its backend and display
+    # functions are put back afterwards, so its own charts show again
+    global _target
+    import matplotlib
+    import auxiliary_functions
+
+    backend = matplotlib.get_backend()
+    show_figure, show_image = auxiliary_functions.show_figure, auxiliary_functions.show_image
+    init_worker()
+    try:
+        yield
+    finally:
+        auxiliary_functions.show_figure, auxiliary_functions.show_image = show_figure, show_image
+        matplotlib.use(backend)
+        _target = None
+
+
+
+def render_job(job, output_dir, formats=('png',)):
+    # Render one chart to output_dir and time it, errors are reported instead of raised
+    global _target
+    import matplotlib.pyplot as plt
+    import auxiliary_functions
+    from style import theme
+
+    _target = (os.path.join(output_dir, safe_name(job.name)), formats, [])
+    start = time.perf_counter()
+    error = None
+    try:
+        # The theme is set for the chart only, the process settings are left as they were
+        with theme():
+            getattr(auxiliary_functions, job.function)(*job.args, **job.kwargs)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        # Nothing survives the job, so memory stays flat however many charts a worker renders
+        plt.close('all')
+
+    return RenderResult(job.name, list(_target[2]), time.perf_counter() - start, error)
+
+
+
+def render_all(jobs, output_dir, formats=('png',), processes=None, cache=None):
+    # Render the charts in a pool of processes and return the render time of each one
+    # With a RenderCache, charts whose inputs did not change are copied from it instead of rendered
+    formats = tuple(formats)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'Unknown formats: {sorted(unknown)}')
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = [None] * len(jobs)
+    keys = [None] * len(jobs)
+    pending = []
+    for i, job in enumerate(jobs):
+        if cache is not None:
+            start = time.perf_counter()
+            keys[i] = cache.key(job, formats)
+            files = cache.get(keys[i], os.path.join(output_dir, safe_name(job.name)))
+            if files is not None:
+                results[i] = (RenderResult(job.name, files, time.perf_counter() - start, None), True)
+                continue
+        pending.append(i)
+
+    if processes == 1 or len(pending) <= 1:
+        with _rendering_here():
+            rendered = [render_job(jobs[i], output_dir, formats) for i in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker) as executor:
+            futures = [executor.submit(render_job, jobs[i], output_dir, formats) for i in pending]
+            rendered = [future.result() for future in futures]
+
+    for i, result in zip(pending, rendered):
+        if cache is not None and result.error is None and result.files:
+            cache.put(keys[i], os.path.join(output_dir, safe_name(jobs[i].name)), result.files)
+        results[i] = (result, False)
+
+    return pd.DataFrame([tuple(result) + (cached,) for result, cached in results],
+                        columns=['Chart', 'Files', 'Seconds', 'Error', 'Cached'])
+
+
+
+def season_jobs(df, df_players, df_scorer, df_assistants, timeline, top=15):
+    # Charts of the whole season
+    assistant_counts = df.loc[df['Assistant'] != '-', 'Assistant'].value_counts()
+    jobs = [
+        RenderJob('Season Standing', 'plot_season_standings_table', (df_players,), {}),
+        RenderJob('Points Evolution', 'plot_points_evolution', (timeline, df_players['Player'].head(top).tolist()), {}),
+        RenderJob('Goal Scorers', 'plot_goal_scorers', (df,), {}),
+        RenderJob('Assist Leaders', 'plot_assist_leaders', (assistant_counts,), {}),
+        RenderJob('Assistants and Scorers Tables', 'plot_assistants_scorers_tables', (df_assistants, df_scorer), {}),
+        RenderJob('Goals and Assists', 'plot_goals_assists', (df_scorer, df_assistants), {})
+    ]
+
+    if 'Goal Type' in df.columns:
+        jobs.append(RenderJob('Goal Types', 'plot_goal_type', (df['Goal Type'].value_counts(),), {}))
+    if 'Game Segment' in df.columns:
+        jobs.append(RenderJob('Goal Time', 'plot_goal_time', (df['Game Segment'].value_counts().reindex(SEGMENTS),), {}))
+
+    return jobs
+
+
+
+def _counts(values, labels):
+    # Non-zero counts indexed from 1, as the involvement charts expect
+    series = pd.Series(values, index=range(1, len(labels) + 1))
+    return series[series > 0]
+
+
+
+def player_jobs(player, df, df_players, df_scorer, df_assistants, player_index, teammate_matrices, assist_matrix):
+    # Charts of one player
+    record = player_index[player]
+    jobs = [
+        RenderJob(f'{player} - Stats', 'plot_player_stats', player_index.stats_card(player), {}),
+        RenderJob(f'{player} - Classification', 'plot_player_classification', (adjacent_rows(df_players, player), player), {}),
+        RenderJob(f'{player} - Goals and Assists Classification', 'plot_player_goals_assits_classification',
+                  (adjacent_rows(df_scorer, player), adjacent_rows(df_assistants, player), player), {})
+    ]
+
+    # Best matches in goals and assists
+    goals = df[df['Scorer'] == player].groupby('Date').size().rename('Number of Goals').reset_index()
+    assists = df[df['Assistant'] == player].groupby('Date').size().rename('Number of Assists').reset_index()
+    top_goals = goals.nlargest(5, 'Number of Goals').assign(Date=lambda d: d['Date'].dt.strftime('%d/%m/%Y'))
+    top_assists = assists.nlargest(5, 'Number of Assists').assign(Date=lambda d: d['Date'].dt.strftime('%d/%m/%Y'))
+    top_goals.insert(1, 'Scorer', player)
+    top_assists.insert(1, 'Assistant', player)
+    if not top_goals.empty or not top_assists.empty:
+        jobs.append(RenderJob(f'{player} - Best Performance', 'plot_player_best_performance',
+                              (top_goals, top_assists, player, not top_goals.empty, not top_assists.empty), {}))
+
+    # Teammates
+    players_count = teammate_matrices.teammates(player)
+    if not players_count.empty:
+        jobs.append(RenderJob(f'{player} - Frequent Teammates', 'plot_frequent_teamates', (players_count, player, players_count.max()), {}))
+        df_plot = teammate_matrices.teammate_results(player)
+        jobs.append(RenderJob(f'{player} - Teammates Results', 'plot_win_lose_teamate', (
+            df_plot.index.tolist(), df_plot['Losing Team'].tolist(), df_plot['Draw Team'].tolist(), df_plot['Winning Team'].tolist(),
+            df_plot['Games'].tolist(), df_plot['Efficiency'].map('{:.0f}%'.format).tolist(), df_plot['Games'].max(), player), {}))
+
+    # Direct involvement in goals
+    total = record.participations
+    if total > 0:
+        jobs.append(RenderJob(f'{player} - Involvement', 'plot_player_involvement', (
+            record.goals, record.assists, total, record.assists / total * 100, record.goals / total * 100, player), {}))
+
+        segment_mapping = {label: i + 1 for i, label in enumerate(SEGMENTS)}
+        jobs.append(RenderJob(f'{player} - Involvement by Period', 'plot_player_involvement_period', (
+            _counts([g + a for g, a in zip(record.goals_by_segment, record.assists_by_segment)], SEGMENTS),
+            _counts(record.goals_by_segment, SEGMENTS), _counts(record.assists_by_segment, SEGMENTS), player, segment_mapping), {}))
+
+        type_mapping = {label: i + 1 for i, label in enumerate(GOAL_TYPES)}
+        jobs.append(RenderJob(f'{player} - Involvement by Goal Type', 'plot_player_involviment_type', (
+            _counts([g + a for g, a in zip(record.goals_by_type, record.assists_by_type)], GOAL_TYPES),
+            _counts(record.goals_by_type, GOAL_TYPES), _counts(record.assists_by_type, GOAL_TYPES), player, type_mapping), {}))
+
+        jobs.append(RenderJob(f'{player} - Assist Partners', 'plot_player_assists_teamates', (
+            assist_matrix.received(player), assist_matrix.unassisted(player), assist_matrix.granted(player), player), {}))
+
+    return jobs
@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+# Modules of the analytics core: loading, standings, indexes and matrices
+CORE_MODULES = ['ingest', 'participation', 'standings', 'timeline', 'periods', 'goal_types', 'teammates', 'assists', 'player_index']
+
+# Plotting layer, which must not load any plotting library until something is drawn
+PLOTTING_MODULES = ['style', 'fonts', 'tables', 'auxiliary_functions', 'batch_render', 'render_cache', 'stat_cards']
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'PIL', 'IPython']
+
+# Cold import budget of the core and the plotting layer together (seconds)
+IMPORT_BUDGET = 1.5
+
+NOTEBOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Synthetic seasons the analysis is measured on; the workbooks are only written and read where 'xlsx' is set
+# (openpyxl alone would take minutes at the largest scale)
+SCALES = {
+    'small': {'n_matches': 41, 'n_players': 55, 'xlsx': True},
+    'medium': {'n_matches': 2000, 'n_players': 400, 'xlsx': True},
+    'large': {'n_matches': 20000, 'n_players': 5000, 'xlsx': False}
+}
+
+# Stored results the runs are compared with, and how much slower / bigger a stage may get before it fails
+BASELINES_FILE = os.path.join(NOTEBOOKS_DIR, 'benchmark_baselines.json')
+TIME_TOLERANCE = 1.5
+MEMORY_TOLERANCE = 1.25
+
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MB = 1.0
+
+
+
+def import_time(modules, repeats=3):
+    # Best time of a cold import of the modules, each attempt in a fresh interpreter,
+    # and the heavy libraries that the import loaded
+    code = (
+        'import sys, time\n'
+        'start = time.perf_counter()\n'
+        f'import {", ".join(modules)}\n'
+        'print(time.perf_counter() - start)\n'
+        'print(",".join(sorted({name.split(".")[0] for name in sys.modules})))\n'
+    )
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], cwd=NOTEBOOKS_DIR, capture_output=True, text=True, check=True).stdout
+        seconds, loaded = output.splitlines()
+        times.append(float(seconds))
+    return min(times), sorted(set(loaded.split(',')) & set(HEAVY_MODULES))
+
+
+
+def check_import_budget(budget=IMPORT_BUDGET, repeats=3):
+    # Fails (AssertionError) when importing the core and the plotting layer takes longer than the budget
+    # or pulls in a plotting library; returns the import time of each group otherwise
+    rows = []
+    for group, modules in [('core', CORE_MODULES), ('plotting', PLOTTING_MODULES), ('all', CORE_MODULES + PLOTTING_MODULES)]:
+        seconds, heavy = import_time(modules, repeats)
+        rows.append((group, seconds, ', '.join(heavy)))
+    report = pd.DataFrame(rows, columns=['Modules', 'Seconds', 'Heavy Imports'])
+
+    total = report.loc[report['Modules'] == 'all', 'Seconds'].iloc[0]
+    loaded = report.loc[report['Heavy Imports'] != '', 'Modules'].tolist()
+    assert not loaded, f'Plotting libraries imported eagerly by: {loaded}\n{report}'
+    assert total <= budget, f'Cold import took {total:.2f} s, budget {budget:.2f} s\n{report}'
+    return report
+
+
+
+def _read_workbooks(season):
+    # Cold read: the workbooks are parsed and cleaned into an empty cache folder
+    import ingest
+
+    cache_dir = tempfile.mkdtemp(prefix='futsal-benchmark-')
+    try:
+        df, df_vd = ingest.load_season(*season['paths'], cache_dir=cache_dir)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {}
+
+
+
+def _read_cache(season):
+    # Warm read from the Parquet cache
+    import ingest
+
+    ingest.load_season(*season['paths'], cache_dir=season['cache_dir'])
+    return {}
+
+
+
+def _clean(season):
+    import ingest
+    return {'df': ingest.clean_goals(season['raw_goals'].copy()), 'df_vd': ingest.clean_matches(season['raw_matches'].copy())}
+
+
+
+def _participation(season):
+    from participation import ParticipationIndex
+    return {'index': ParticipationIndex(season['df_vd'])}
+
+
+
+def _standings(season):
+    from standings import compute_standings
+    return {'df_players': compute_standings(season['index'])}
+
+
+
+def _leaderboards(season):
+    from standings import compute_assistants, compute_scorers
+    return {'df_scorer': compute_scorers(season['df'], season['df_players']),
+            'df_assistants': compute_assistants(season['df'], season['df_players'])}
+
+
+
+def _timeline(season):
+    from timeline import points_timeline
+    return {'timeline': points_timeline(season['index'])}
+
+
+
+def _ratings(season):
+    from ratings import RatingEngine
+    ratings = RatingEngine.from_index(season['index'])
+    return {'ratings': ratings, 'rating_timeline': ratings.trajectory()}
+
+
+
+def _periods(season):
+    from periods import period_table
+    return {'monthly': period_table(season['index'], season['df'], 'month')}
+
+
+
+def _goal_types(season):
+    from goal_types import classify_goals, game_segments
+    df = season['df'].assign(**{'Goal Type': classify_goals(season['df']), 'Game Segment': game_segments(season['df']['Minute'])})
+    return {'df': df}
+
+
+
+def _teammates(season):
+    from teammates import TeammateMatrices
+    return {'teammate_matrices': TeammateMatrices(season['index'])}
+
+
+
+def _assists(season):
+    from assists import AssistMatrix
+    return {'assist_matrix': AssistMatrix(season['df'])}
+
+
+
+def _player_index(season):
+    from player_index import PlayerIndex
+    return {'player_index': PlayerIndex(season['index'], season['df'], season['df_players'], season['df_scorer'], season['df_assistants'])}
+
+
+
+# Analysis stages in order: each one takes what the previous ones produced
+STAGES = [
+    ('read workbooks', _read_workbooks, True),
+    ('read cache', _read_cache, True),
+    ('clean', _clean, False),
+    ('participation', _participation, False),
+    ('standings', _standings, False),
+    ('leaderboards', _leaderboards, False),
+    ('timeline', _timeline, False),
+    ('ratings', _ratings, False),
+    ('periods', _periods, False),
+    ('goal types', _goal_types, False),
+    ('teammates', _teammates, False),
+    ('assists', _assists, False),
+    ('player index', _player_index, False)
+]
+
+
+
+def synthetic_season(scale, seed=0):
+    # Generated season of a scale, its workbooks written once to the cache folder
+    import ingest
+    from synthetic import generate_season, write_season
+
+    params = SCALES[scale]
+    raw_goals, raw_matches = generate_season(params['n_matches'], params['n_players'], seed=seed)
+    season = {'raw_goals': raw_goals, 'raw_matches': raw_matches}
+    if params['xlsx']:
+        directory = os.path.join(ingest.CACHE_DIR, 'synthetic', f'{scale}-{seed}')
+        paths = (os.path.join(directory, os.path.basename(ingest.GOALS_FILE)), os.path.join(directory, os.path.basename(ingest.MATCHES_FILE)))
+        if not all(os.path.exists(path) for path in paths):
+            paths = write_season(directory, raw_goals, raw_matches)
+        season.update(paths=paths, cache_dir=os.path.join(directory, '.cache'))
+        ingest.load_season(*paths, cache_dir=season['cache_dir'])
+    return season
+
+
+
+def profile_stages(scale, repeats=3, seed=0):
+    # Best time and peak traced memory of every stage on a synthetic season
+    season = synthetic_season(scale, seed)
+    rows = []
+    for name, stage, needs_xlsx in STAGES:
+        if needs_xlsx and 'paths' not in season:
+            continue
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stage(season)
+            times.append(time.perf_counter() - start)
+
+        # Memory in a separate run, tracing slows the stage down
+        tracemalloc.start()
+        try:
+            season.update(stage(season))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        rows.append((scale, name, min(times), peak / 2 ** 20))
+
+    return pd.DataFrame(rows, columns=['Scale', 'Stage', 'Seconds', 'Peak MB'])
+
+
+
+def _grouped_counts(df):
+    # Counts the analysis runs on the goals frame: goals per player, per player and date, per venue day
+    observed = {'observed': True}
+    return [
+        ('value_counts Scorer', lambda: df['Scorer'].value_counts()),
+        ('groupby Date, Scorer', lambda: df.groupby(['Date', 'Scorer'], **observed).size()),
+        ('groupby Assistant', lambda: df[df['Assistant'] != '-'].groupby('Assistant', **observed).size())
+    ]
+
+
+
+def compare_schema(scales=('small', 'medium', 'large'), repeats=3, seed=0):
+    # Memory of the goals and matches frames of each scale before and after schema.compact_season,
+    # and the best time of the grouped counts on both
+    import ingest
+    from schema import compact_season, memory_report
+
+    memory, timings = [], []
+    for scale in scales:
+        season = synthetic_season(scale, seed)
+        df, df_vd = ingest.clean_goals(season['raw_goals'].copy()), ingest.clean_matches(season['raw_matches'].copy())
+        compact_df, compact_vd = compact_season(df, df_vd)
+        memory.append(memory_report({'df': df, 'df_vd': df_vd}, {'df': compact_df, 'df_vd': compact_vd}).assign(Scale=scale))
+
+        for (name, before), (_, after) in zip(_grouped_counts(df), _grouped_counts(compact_df)):
+            seconds = []
+            for count in (before, after):
+                times = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    count()
+                    times.append(time.perf_counter() - start)
+                seconds.append(min(times))
+            timings.append((scale, name, seconds[0], seconds[1]))
+
+    memory = pd.concat(memory, ignore_index=True)
+    memory = memory[['Scale'] + [column for column in memory.columns if column != 'Scale']]
+    timings = pd.DataFrame(timings, columns=['Scale', 'Operation', 'Seconds Before', 'Seconds After'])
+    timings['Speedup'] = (timings['Seconds Before'] / timings['Seconds After']).round(2)
+    return memory, timings
+
+
+
+def load_baselines(path=BASELINES_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return {}
+
+
+
+def save_baselines(report, path=BASELINES_FILE):
+    # Store the results of a run as the new baselines of its scales (other scales are kept)
+    baselines = load_baselines(path)
+    for scale, rows in report.groupby('Scale', sort=False):
+        baselines[scale] = {stage: {'seconds': round(seconds, 4), 'peak_mb': round(peak, 2)}
+                            for stage, seconds, peak in rows[['Stage', 'Seconds', 'Peak MB']].itertuples(index=False, name=None)}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=1)
+
+
+
+def compare_baselines(report, baselines):
+    # Ratio of every stage to its baseline and whether it is a regression
+    def baseline(row, key):
+        return baselines.get(row['Scale'], {}).get(row['Stage'], {}).get(key, float('nan'))
+
+    report = report.copy()
+    report['Baseline Seconds'] = report.apply(baseline, axis=1, key='seconds')
+    report['Baseline MB'] = report.apply(baseline, axis=1, key='peak_mb')
+    report['Time Ratio'] = (report['Seconds'] / report['Baseline Seconds']).round(2)
+    report['Memory Ratio'] = (report['Peak MB'] / report['Baseline MB']).round(2)
+    slower = (report['Time Ratio'] > TIME_TOLERANCE) & (report['Seconds'] - report['Baseline Seconds'] > MIN_SECONDS)
+    bigger = (report['Memory Ratio'] > MEMORY_TOLERANCE) & (report['Peak MB'] - report['Baseline MB'] > MIN_MB)
+    report['Regression'] = slower | bigger
+    return report
+
+
+
+def run_benchmarks(scales=('small', 'medium'), repeats=3, update=False, path=BASELINES_FILE):
+    # Profile the stages at each scale and fail (AssertionError) on regressions against the stored baselines;
+    # with update=True the results become the new baselines instead
+    report = pd.concat([profile_stages(scale, repeats) for scale in scales], ignore_index=True)
+    if update:
+        save_baselines(report, path)
+        return report
+
+    report = compare_baselines(report, load_baselines(path))
+    regressions = report[report['Regression']]
+    assert regressions.empty, f'Regressions against {os.path.basename(path)}:\n{regressions.to_string()}'
+    return report
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import budget and analysis stage benchmarks')
+    parser.add_argument('suite', nargs='?', choices=['imports', 'stages', 'schema', 'all'], default='all')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--update', action='store_true', help='store the results as the new baselines')
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 200)
+    if args.suite in ('imports', 'all'):
+        print(check_import_budget())
+    if args.suite in ('stages', 'all'):
+        print(run_benchmarks(args.scales, args.repeats, args.update).to_string(index=False))
+    if args.suite == 'schema':
+        for report in compare_schema(args.scales, args.repeats):
+            print(report.to_string(index=False))
@@ -0,0 +1,223 @@
+import argparse
+import heapq
+import itertools
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# A split of the attending players: the spread (highest minus lowest average strength of the teams),
+# the names of each team and the average strength of each team
+Draft = namedtuple('Draft', ['spread', 'teams', 'strengths'])
+
+# Splits returned by draft_teams
+TOP = 5
+
+# Cells (team, split of the players left) the last two teams are searched with at a time
+CHUNK = 200000
+
+# Tasks the search is split into per process (multi-process mode), so a process that finishes early takes another
+TASKS_PER_PROCESS = 4
+
+
+
+def player_strengths(players, table, column='Rating'):
+    # Strength of each attending player from a table with a 'Player' column: ratings.RatingEngine.table() ('Rating'),
+    # df_players ('Efficiency', 'Points') or df_scorer / df_assistants ('Average'). Players not in the table
+    # (e.g. the first match of a new player) get the median of the table
+    values = table.set_index('Player')[column].astype(float)
+    return pd.Series([values.get(player, values.median()) for player in players], index=list(players), name=column)
+
+
+
+def team_sizes(n_players, n_teams):
+    # Sizes of the teams, differing by at most one player, the larger teams first
+    if not 2 <= n_teams <= n_players:
+        raise ValueError(f'Cannot split {n_players} players into {n_teams} teams')
+    size, extra = divmod(n_players, n_teams)
+    return [size + 1] * extra + [size] * (n_teams - extra)
+
+
+
+@lru_cache(maxsize=None)
+def _combinations(n, size):
+    # Every choice of 'size' of n positions and the positions left by each, one row each in increasing order
+    count = math.comb(n, size)
+    chosen = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(n), size)), dtype=np.int64,
+                         count=count * size).reshape(count, size)
+    left = np.ones((len(chosen), n), dtype=bool)
+    np.put_along_axis(left, chosen, False, axis=1)
+    return chosen, np.nonzero(left)[1].reshape(len(chosen), n - size)
+
+
+
+def _search(values, sizes, top, part=0, parts=1):
+    # Branch and bound over the splits, one team at a time: each level tries every team of its size from the
+    # players left, the most promising first, and cuts the ones whose spread can no longer beat the top-th split
+    # found so far. The players are indexed strongest first (values sorted); the teams of a size are searched in
+    # the order of their strongest players, so every split is met once. With parts > 1 only every parts-th team
+    # of the first level (from 'part') is searched. Returns [(spread, teams)], the best first
+    values = np.asarray(values, dtype=float)
+    n_teams = len(sizes)
+    kept = []
+    order = itertools.count()
+
+    def threshold():
+        return -kept[0][0] if len(kept) == top else np.inf
+
+    def keep(spread, teams):
+        item = (-spread, next(order), teams)
+        if len(kept) < top:
+            heapq.heappush(kept, item)
+        elif spread < -kept[0][0]:
+            heapq.heapreplace(kept, item)
+
+    def visit(team, remaining, averages, teams):
+        size = sizes[team]
+        picked, unpicked = _combinations(len(remaining), size)
+        candidates, others = remaining[picked], remaining[unpicked]
+        if all(other == size for other in sizes[team:]):
+            # The strongest player left is in the first of the teams left
+            mask = candidates[:, 0] == remaining[0]
+            candidates, others = candidates[mask], others[mask]
+        elif team > 0 and sizes[team - 1] == size:
+            mask = candidates[:, 0] > teams[-1][0]
+            candidates, others = candidates[mask], others[mask]
+
+        totals = values[candidates].sum(axis=1)
+        chosen = totals / size
+        # Average of the players left after each candidate: the teams still to fill average that out,
+        # so the highest of them is at least that and the lowest at most that
+        rest = (values[remaining].sum() - totals) / (len(remaining) - size)
+        highest = np.maximum(np.maximum(chosen, rest), max(averages, default=-np.inf))
+        lowest = np.minimum(np.minimum(chosen, rest), min(averages, default=np.inf))
+        if team < n_teams - 2:
+            # The team of the strongest player left averages at least that player with the weakest ones,
+            # the team of the weakest at most that player with the strongest ones, whatever the size of that team
+            left = values[others]
+            other_sizes = set(sizes[team + 1:])
+            strongest = np.min([(left[:, 0] + left[:, left.shape[1] - other + 1:].sum(axis=1)) / other for other in other_sizes], axis=0)
+            weakest = np.max([(left[:, -1] + left[:, :other - 1].sum(axis=1)) / other for other in other_sizes], axis=0)
+            highest, lowest = np.maximum(highest, strongest), np.minimum(lowest, weakest)
+        bounds = highest - lowest
+
+        ranked = np.argsort(bounds, kind='stable')
+        if team == 0:
+            ranked = ranked[part::parts]
+        if team == n_teams - 2:
+            # The last team is what is left, so the bounds are the spreads
+            for candidate in ranked[bounds[ranked] < threshold()][:top]:
+                keep(float(bounds[candidate]), teams + [candidates[candidate], others[candidate]])
+        elif team == n_teams - 3:
+            last_two(team, ranked, bounds, candidates, others, chosen, averages, teams)
+        else:
+            for candidate in ranked:
+                if bounds[candidate] >= threshold():
+                    break
+                visit(team + 1, others[candidate], averages + [chosen[candidate]], teams + [candidates[candidate]])
+
+    def last_two(team, ranked, bounds, candidates, others, chosen, averages, teams):
+        # Every split of the players left after each candidate into the last two teams at once,
+        # CHUNK cells (candidate, split) at a time, the most promising candidates first
+        size, last = sizes[team + 1], sizes[team + 2]
+        picked, unpicked = _combinations(others.shape[1], size)
+        if size == last:
+            picked, unpicked = picked[picked[:, 0] == 0], unpicked[picked[:, 0] == 0]
+        fixed = averages or [np.nan]
+        step = max(1, CHUNK // len(picked))
+        for start in range(0, len(ranked), step):
+            rows = ranked[start:start + step]
+            rows = rows[bounds[rows] < threshold()]
+            if not len(rows):
+                break
+            left = values[others[rows]]
+            totals = left[:, picked].sum(axis=2)
+            second = totals / size
+            third = (left.sum(axis=1)[:, None] - totals) / last
+            highest = np.fmax(np.maximum(second, third), np.fmax(chosen[rows], max(fixed))[:, None])
+            lowest = np.fmin(np.minimum(second, third), np.fmin(chosen[rows], min(fixed))[:, None])
+            spreads = highest - lowest
+            if size != last and sizes[team] == size:
+                spreads[others[rows][:, picked[:, 0]] < candidates[rows, :1]] = np.inf
+
+            cells = spreads.ravel()
+            best = np.argpartition(cells, top)[:top] if len(cells) > top else np.arange(len(cells))
+            for cell in best[np.argsort(cells[best], kind='stable')]:
+                if cells[cell] >= threshold():
+                    break
+                row, split = divmod(int(cell), len(picked))
+                remaining = others[rows[row]]
+                keep(float(cells[cell]), teams + [candidates[rows[row]], remaining[picked[split]], remaining[unpicked[split]]])
+
+    visit(0, np.arange(len(values)), [], [])
+    return sorted((-spread, [team.tolist() for team in teams]) for spread, _, teams in kept)
+
+
+
+def draft_teams(strengths, n_teams=2, top=TOP, processes=1):
+    # The 'top' most balanced splits of the attending players (Series or dict: player -> strength) into
+    # n_teams teams of sizes differing by at most one, the smallest spread of the team averages first.
+    # With processes > 1 (None: one per CPU) the candidates for the first team are shared out among the processes
+    strengths = pd.Series(strengths, dtype=float)
+    if strengths.isna().any():
+        raise ValueError(f'Players without a strength: {strengths.index[strengths.isna()].tolist()}')
+    strengths = strengths.sort_values(ascending=False, kind='stable')
+    names, values = strengths.index.tolist(), strengths.tolist()
+    sizes = team_sizes(len(values), n_teams)
+
+    if processes == 1:
+        found = _search(values, sizes, top)
+    else:
+        parts = (processes or os.cpu_count()) * TASKS_PER_PROCESS
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            found = sorted(split for splits in executor.map(_search, [values] * parts, [sizes] * parts, [top] * parts,
+                                                            range(parts), [parts] * parts)
+                           for split in splits)[:top]
+
+    drafts = []
+    for spread, members in found:
+        teams = tuple(tuple(names[player] for player in team) for team in members)
+        averages = tuple(float(np.mean([strengths[name] for name in team])) for team in teams)
+        drafts.append(Draft(spread, teams, averages))
+    return drafts
+
+
+
+def draft_table(drafts):
+    # One row per split: its rank, spread, and the players (comma-joined as in df_vd) and average of each team
+    rows = []
+    for rank, draft in enumerate(drafts, start=1):
+        row = {'Rank': rank, 'Spread': round(draft.spread, 2)}
+        for number, (team, strength) in enumerate(zip(draft.teams, draft.strengths), start=1):
+            row[f'Team {number}'] = ', '.join(team)
+            row[f'Team {number} Average'] = round(strength, 2)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+
+if __name__ == '__main__':
+    from pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description='Most balanced splits of the attending players into teams')
+    parser.add_argument('players', nargs='+', help='names as in the Matches sheet')
+    parser.add_argument('--teams', type=int, default=2)
+    parser.add_argument('--top', type=int, default=TOP)
+    parser.add_argument('--by', default='Rating', choices=['Rating', 'Efficiency', 'Points', 'Goals', 'Assists'],
+                        help='Rating (Elo), Efficiency or Points of the standings, or Goals / Assists per match')
+    parser.add_argument('--processes', type=int, default=1, help='0 for one per CPU')
+    args = parser.parse_args()
+
+    values = Pipeline().run(['ratings', 'df_players', 'df_scorer', 'df_assistants'])
+    tables = {'Rating': values['ratings'].table(), 'Efficiency': values['df_players'], 'Points': values['df_players'],
+              'Goals': values['df_scorer'], 'Assists': values['df_assistants']}
+    column = 'Average' if args.by in ('Goals', 'Assists') else args.by
+    strengths = player_strengths(args.players, tables[args.by], column)
+    drafts = draft_teams(strengths, args.teams, args.top, args.processes or None)
+    with pd.option_context('display.max_colwidth', None, 'display.width', None):
+        print(draft_table(drafts).to_string(index=False))
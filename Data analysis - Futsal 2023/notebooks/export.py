@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import re
+import time
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+
+from ingest import SEASON
+from render_cache import update_hash
+
+
+# Workbook the notebook exports its tables to, one sheet per table
+TABLES_NAME = 'Futsal {season} - Tables'
+TABLES_FILE = TABLES_NAME.format(season=SEASON)
+
+# Formats understood by export_tables: 'xlsx' writes one workbook, the others one file per table
+FORMATS = ('xlsx', 'parquet', 'csv')
+
+# Hashes of the last export of each table, next to the outputs (ignored by git with the other caches)
+MANIFEST = os.path.join('.cache', 'export.json')
+
+# Sheet names: at most 31 characters, none of these
+SHEET_INVALID = re.compile(r'[\[\]:*?/\\]')
+SHEET_MAX = 31
+
+# Rows formatted and written at a time: the memory of the export does not grow with the tables
+CHUNK = 10000
+
+# Parts of the workbook package (SpreadsheetML)
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Cell styles of the workbook: 0 plain, 1 bold (headers), 2 date
+STYLES = (
+    f'<styleSheet xmlns="{MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+# Characters XML 1.0 cannot hold
+XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Day 0 of Excel dates
+EXCEL_EPOCH = np.datetime64('1899-12-30')
+
+
+
+def table_hash(df):
+    digest = hashlib.sha256()
+    update_hash(digest, df)
+    return digest.hexdigest()
+
+
+
+def sheet_name(name):
+    return SHEET_INVALID.sub('_', str(name))[:SHEET_MAX]
+
+
+
+def split_table(df, column, prefix=None):
+    # One table per value of a column (e.g. the period table by month), named '<prefix> <value>'
+    prefix = column if prefix is None else prefix
+    return {f'{prefix} {value}': rows.reset_index(drop=True) for value, rows in df.groupby(column, sort=True)}
+
+
+
+def column_letter(position):
+    # 0 -> A, 25 -> Z, 26 -> AA
+    letters = ''
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+
+def _text_cell(value):
+    text = escape(XML_INVALID.sub('', str(value)))
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f' t="inlineStr"><is><t{space}>{text}</t></is>'
+
+
+
+def _format_column(values):
+    # Inside of the <c> element of each value ('' for empty cells), one column of a chunk at a time
+    empty = values.isna().tolist()
+    if pd.api.types.is_bool_dtype(values):
+        cells = [f' t="b"><v>{int(value)}</v>' for value in values.fillna(False).tolist()]
+    elif pd.api.types.is_numeric_dtype(values):
+        # Excel has no infinity: non-finite numbers are written as empty cells, as the missing ones
+        numbers = values.astype('float64').to_numpy()
+        empty = (~np.isfinite(numbers)).tolist()
+        cells = [f'><v>{value!r}</v>' for value in values.fillna(0).tolist()]
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        # Excel dates have no time zone: time zone aware dates are written in their own wall-clock time
+        if values.dt.tz is not None:
+            values = values.dt.tz_localize(None)
+        days = (values.to_numpy(dtype='datetime64[ns]') - EXCEL_EPOCH) / np.timedelta64(1, 'D')
+        cells = [f' s="2"><v>{day!r}</v>' for day in np.nan_to_num(days).tolist()]
+    else:
+        cells = [_text_cell(value) for value in values.tolist()]
+    return ['' if missing else cell for cell, missing in zip(cells, empty)]
+
+
+
+def _write_sheet(stream, df):
+    letters = [column_letter(i) for i in range(len(df.columns))]
+    stream.write(f'{XML_HEADER}<worksheet xmlns="{MAIN_NS}"><sheetData>'.encode('utf-8'))
+    header = ''.join(f'<c r="{letter}1" s="1"{_text_cell(column)}</c>' for letter, column in zip(letters, df.columns))
+    stream.write(f'<row r="1">{header}</row>'.encode('utf-8'))
+
+    for start in range(0, len(df), CHUNK):
+        chunk = df.iloc[start:start + CHUNK]
+        columns = [_format_column(chunk.iloc[:, i]) for i in range(len(letters))]
+        rows = []
+        for offset, cells in enumerate(zip(*columns), start=start + 2):
+            row = ''.join(f'<c r="{letter}{offset}"{cell}</c>' for letter, cell in zip(letters, cells) if cell)
+            rows.append(f'<row r="{offset}">{row}</row>')
+        stream.write(''.join(rows).encode('utf-8'))
+    stream.write(b'</sheetData></worksheet>')
+
+
+
+def write_workbook(tables, path):
+    # All the tables in one .xlsx in a single streaming pass: each sheet goes straight into the zip
+    # CHUNK rows at a time, with inline strings so nothing has to be collected for a shared strings part
+    titles = [sheet_name(name) for name in tables]
+    if len(set(titles)) < len(titles):
+        raise ValueError(f'Two tables share a sheet name: {titles}')
+
+    sheets = ''.join(f'<sheet name={quoteattr(title)} sheetId="{i}" r:id="rId{i}"/>' for i, title in enumerate(titles, start=1))
+    relationships = ''.join(f'<Relationship Id="rId{i}" Type="{RELATIONSHIP_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                            for i in range(1, len(titles) + 1))
+    relationships += f'<Relationship Id="rId{len(titles) + 1}" Type="{RELATIONSHIP_NS}/styles" Target="styles.xml"/>'
+    overrides = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                        for i in range(1, len(titles) + 1))
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', XML_HEADER + (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{overrides}</Types>'))
+        package.writestr('_rels/.rels', XML_HEADER + (
+            f'<Relationships xmlns="{PACKAGE_NS}">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIP_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+        package.writestr('xl/workbook.xml', XML_HEADER + f'<workbook xmlns="{MAIN_NS}" xmlns:r="{RELATIONSHIP_NS}"><sheets>{sheets}</sheets></workbook>')
+        package.writestr('xl/_rels/workbook.xml.rels', XML_HEADER + f'<Relationships xmlns="{PACKAGE_NS}">{relationships}</Relationships>')
+        package.writestr('xl/styles.xml', XML_HEADER + STYLES)
+        for i, df in enumerate(tables.values(), start=1):
+            with package.open(f'xl/worksheets/sheet{i}.xml', 'w', force_zip64=True) as stream:
+                _write_sheet(stream, df)
+
+
+
+def _replace(path, write):
+    # Write through a temporary file so a failed export never leaves half a file behind
+    temporary = path + '.tmp'
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+
+def export_tables(tables, output_dir, name=TABLES_FILE, formats=('xlsx',), force=False):
+    # Export the tables ({name: DataFrame}, in sheet order) and return what was written.
+    # Files whose tables have the same content hash as in the last export are skipped (force=True writes everything);
+    # the workbook is rewritten as a whole when any of its tables changed
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'Unknown formats: {sorted(unknown)}')
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = _load_manifest(manifest_path)
+    hashes = {str(table): table_hash(df) for table, df in tables.items()}
+
+    # (format, file, tables it holds, writer)
+    outputs = []
+    if 'xlsx' in formats:
+        outputs.append(('xlsx', f'{name}.xlsx', list(hashes), lambda path: write_workbook(tables, path)))
+    for table, df in tables.items():
+        if 'parquet' in formats:
+            outputs.append(('parquet', f'{name} - {table}.parquet', [str(table)], lambda path, df=df: df.to_parquet(path, index=False)))
+        if 'csv' in formats:
+            outputs.append(('csv', f'{name} - {table}.csv', [str(table)], lambda path, df=df: df.to_csv(path, index=False, encoding='utf-8')))
+
+    rows = []
+    for extension, file_name, held, write in outputs:
+        path = os.path.join(output_dir, file_name)
+        content = {table: hashes[table] for table in held}
+        start = time.perf_counter()
+        written = force or manifest.get(file_name) != content or not os.path.exists(path)
+        if written:
+            _replace(path, write)
+            manifest[file_name] = content
+        rows.append((extension, path, len(held), written, time.perf_counter() - start))
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    return pd.DataFrame(rows, columns=['Format', 'File', 'Tables', 'Written', 'Seconds'])
@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+
+
+# Sans fonts tried in order: Arial (the look of the original cards), then its metric-compatible
+# Liberation Sans and DejaVu Sans on Linux
+BOLD_FONTS = [
+    'C:/Windows/Fonts/arialbd.ttf',
+    '/Library/Fonts/Arial Bold.ttf',
+    '/System/Library/Fonts/Supplemental/Arial Bold.ttf',
+    '/usr/share/fonts/truetype/msttcorefonts/Arial_Bold.ttf',
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
+    '/usr/share/fonts/liberation-sans/LiberationSans-Bold.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'
+]
+REGULAR_FONTS = [
+    'C:/Windows/Fonts/arial.ttf',
+    '/Library/Fonts/Arial.ttf',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/usr/share/fonts/truetype/msttcorefonts/Arial.ttf',
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+    '/usr/share/fonts/liberation-sans/LiberationSans-Regular.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf'
+]
+
+# Environment variables to force a font file
+FONT_ENV = {True: 'FUTSAL_BOLD_FONT', False: 'FUTSAL_REGULAR_FONT'}
+
+
+
+def _bundled_font(bold):
+    # DejaVu Sans ships with matplotlib, so it is there wherever the charts can be drawn
+    import matplotlib
+    name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+    return os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf', name)
+
+
+
+@lru_cache(maxsize=None)
+def resolve_font(bold=True):
+    # Path of the font used by the image cards and tables, None when no TrueType font is found at all
+    candidates = [os.environ.get(FONT_ENV[bold])] + (BOLD_FONTS if bold else REGULAR_FONTS)
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    try:
+        path = _bundled_font(bold)
+    except ImportError:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+
+@lru_cache(maxsize=None)
+def get_font(size, bold=True, path=None):
+    # FreeTypeFont of a font file at a size, loaded once per (path, size)
+    from PIL import ImageFont
+
+    path = path or resolve_font(bold)
+    if path is None:
+        # Pillow's own font, scalable since Pillow 10.1
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(path, size)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+# Goal types, in the order used by the charts
+ADVANTAGE = 'Advantage Goal'
+REDUCTION = 'Reduction Goal'
+EQUALIZING = 'Equalizing Goal'
+TIEBREAKER = 'Tiebreaker Goal'
+TURNING = 'Turning Goal'
+GOAL_TYPES = [ADVANTAGE, REDUCTION, EQUALIZING, TIEBREAKER, TURNING]
+
+# Segments of the match and the minutes where the next one starts
+SEGMENTS = ['Beginning', 'Middle', 'End']
+SEGMENT_STARTS = [20, 40]
+
+
+
+def parse_score(score):
+    # Score after each goal, typed as '2x1' or '2-1', split into the goals of each team
+    teams = pd.Series(score, dtype='object').str.extract(r'(\d+)\s*[x-]\s*(\d+)')
+    teams.columns = ['Team A', 'Team B']
+    return teams.astype(float)
+
+
+
+def game_segments(minutes):
+    # Segment of the match of each goal from its minute, NaN when the minute was not recorded
+    minutes = pd.Series(minutes).astype('float64').to_numpy()
+    segments = np.array(SEGMENTS, dtype=object)[np.searchsorted(SEGMENT_STARTS, np.nan_to_num(minutes), side='right')]
+    segments[np.isnan(minutes)] = np.nan
+    return segments
+
+
+
+def classify_difference(result, previous, last_ahead):
+    # Goal type from the score difference (Team A - Team B) after and before the goal,
+    # and the team that was ahead the last time the score was not tied (+1 Team A, -1 Team B, 0 nobody yet)
+    if result == 0:
+        return EQUALIZING
+    if abs(result) > abs(previous):
+        if abs(result) > 1:
+            return ADVANTAGE
+        return TIEBREAKER if last_ahead in (0, np.sign(result)) else TURNING
+    if abs(result) < abs(previous):
+        return REDUCTION
+    return None
+
+
+
+def classify_goals(df, key=None):
+    # Goal type of every goal in one vectorized pass, the state never crosses from one match ('key') to the next.
+    # The key defaults to the match ID of ingest.assign_matches, else to the date (which merges matches played on
+    # the same day). Goals must be in the order they were scored inside each match; rows without a score get NaN
+    if key is None:
+        key = 'Match' if 'Match' in df.columns else 'Date'
+    teams = parse_score(df['Score'].to_numpy())
+    valid = teams.notna().all(axis=1).to_numpy()
+
+    result = (teams['Team A'] - teams['Team B'])[valid].to_numpy(dtype=np.int64)
+    match = df[key].to_numpy()[valid]
+    if key == 'Match' and 'Date' in df.columns:
+        # Goals without a match (ingest.NO_MATCH, negative) are kept apart by date
+        dates = pd.factorize(df['Date'].to_numpy()[valid])[0]
+        match = np.where(match < 0, -1 - dates, match)
+    match = pd.Series(match)
+
+    # Difference before the goal (0 at kick-off)
+    previous = pd.Series(result).groupby(match).shift(1, fill_value=0).to_numpy()
+
+    # Team that was ahead the last time the score was not tied, before the goal
+    ahead = pd.Series(np.sign(result), dtype=float).replace(0, np.nan)
+    last_ahead = ahead.groupby(match).ffill().groupby(match).shift(1).fillna(0).to_numpy()
+
+    goal_up = np.abs(result) > np.abs(previous)
+    conditions = [
+        result == 0,
+        goal_up & (np.abs(result) > 1),
+        goal_up & ((last_ahead == 0) | (last_ahead == np.sign(result))),
+        goal_up,
+        np.abs(result) < np.abs(previous)
+    ]
+    choices = [EQUALIZING, ADVANTAGE, TIEBREAKER, TURNING, REDUCTION]
+
+    goal_type = np.full(len(df), np.nan, dtype=object)
+    goal_type[valid] = np.select(conditions, choices, default=None)
+    return pd.Series(goal_type, index=df.index, name='Goal Type')
+
+
+
+class GoalState:
+    # Running state of one match, to classify goals one at a time as they are scored
+
+    __slots__ = ('result', 'last_ahead')
+
+    def __init__(self):
+        self.result = 0
+        self.last_ahead = 0
+
+    def update(self, team_a, team_b):
+        # Classify the goal that made the score team_a x team_b and move the state forward
+        result = int(team_a) - int(team_b)
+        goal_type = classify_difference(result, self.result, self.last_ahead)
+        if result != 0:
+            self.last_ahead = int(np.sign(result))
+        self.result = result
+        return goal_type
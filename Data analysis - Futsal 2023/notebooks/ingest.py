@@ -0,0 +1,262 @@
+import hashlib
+import itertools
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# Folders of the project
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# Workbooks exported from omarcador.com, one pair per season
+SEASON = '2023'
+GOALS_NAME = 'Futsal {season} - Goals.xlsx'
+MATCHES_NAME = 'Futsal {season} - Wins and Losses.xlsx'
+
+GOALS_FILE = os.path.join(DATA_DIR, GOALS_NAME.format(season=SEASON))
+MATCHES_FILE = os.path.join(DATA_DIR, MATCHES_NAME.format(season=SEASON))
+
+# Portuguese headers of the workbooks and their English names
+GOALS_COLUMNS = {
+    'Data': 'Date',
+    'Goleador': 'Scorer',
+    'Assistente': 'Assistant',
+    'Minuto': 'Minute',
+    'Placar': 'Score'
+}
+
+MATCHES_COLUMNS = {
+    'Data': 'Date',
+    'Local': 'Location',
+    'Time Vencedor': 'Winning Team',
+    'Time Perdedor': 'Losing Team',
+    'Time Empate 1': 'Draw Team 1',
+    'Time Empate 2': 'Draw Team 2'
+}
+
+# Columns holding the comma-joined rosters of each match
+TEAM_COLUMNS = ['Winning Team', 'Losing Team', 'Draw Team 1', 'Draw Team 2']
+
+# Value used in the Goals sheet when nobody assisted
+NO_ASSIST = '-'
+
+# Own goals are registered as 'Gol Contra' on omarcador.com
+OWN_GOAL = 'Own Goal'
+OWN_GOAL_LABELS = ['Gol Contra', OWN_GOAL]
+
+# Bump this when the cleaning below changes so old caches are rebuilt
+CACHE_VERSION = 3
+
+# Match of the goals whose date has no match in the matches sheet
+NO_MATCH = -1
+
+
+
+def parse_dates(values):
+    # Dates typed by hand in the workbook come as text (e.g. '19//12/2023'), so they are cleaned and read day-first
+    is_text = values.map(lambda x: isinstance(x, str))
+    dates = pd.to_datetime(values.where(~is_text), errors='coerce')
+
+    if is_text.any():
+        cleaned = values[is_text].str.replace(r'/+', '/', regex=True).str.strip()
+        dates[is_text] = pd.to_datetime(cleaned, dayfirst=True, errors='coerce')
+
+    return dates
+
+
+
+def clean_goals(df):
+    # Rename the columns
+    df = df.rename(columns=GOALS_COLUMNS)
+
+    # Parse the dates only once
+    df['Date'] = parse_dates(df['Date'])
+
+    # Strip the names and use a single label for own goals
+    df['Scorer'] = df['Scorer'].astype(str).str.strip().replace(OWN_GOAL_LABELS, OWN_GOAL)
+    df['Assistant'] = df['Assistant'].fillna(NO_ASSIST).astype(str).str.strip()
+
+    # The score is typed as '2x1', keep it as text and let the analysis split it
+    df['Score'] = df['Score'].astype('object')
+
+    return df.reset_index(drop=True)
+
+
+
+def clean_matches(df_vd):
+    # Rename the columns
+    df_vd = df_vd.rename(columns=MATCHES_COLUMNS)
+
+    # Parse the dates only once
+    df_vd['Date'] = parse_dates(df_vd['Date'])
+
+    # Empty team cells stay as NaN, the others are kept as text
+    for column in TEAM_COLUMNS:
+        df_vd[column] = df_vd[column].astype('object')
+
+    return number_matches(df_vd.reset_index(drop=True))
+
+
+
+def number_matches(df_vd):
+    # Stable match IDs: position of each match in date order, matches of the same date in sheet order
+    # (the order ParticipationIndex gives its match codes)
+    order = np.argsort(df_vd['Date'].to_numpy(), kind='stable')
+    match = np.empty(len(df_vd), dtype=np.int64)
+    match[order] = np.arange(len(df_vd))
+    return df_vd.assign(Match=match)
+
+
+
+def _score_runs(scores):
+    # Run of each goal of a date (0, 1, ...): a new run starts each time the score starts again (e.g. '1x0' after '5x4'),
+    # goals without a score stay in the current run. Also whether each run ended level (None when it has no score)
+    totals = scores.sum(axis=1, min_count=2).to_numpy()
+    runs = np.zeros(len(totals), dtype=np.int64)
+    level = [None]
+    previous = np.nan
+    for position, (total, (a, b)) in enumerate(zip(totals, scores.to_numpy())):
+        if not np.isnan(total):
+            if not np.isnan(previous) and total <= previous:
+                level.append(None)
+            previous = total
+            level[-1] = bool(a == b)
+        runs[position] = len(level) - 1
+    return runs, level
+
+
+
+def _place_runs(level, draws):
+    # Matches of the date (positions) of each run of goals, in order. The goals of a draw can only be a draw
+    # and those of a win a win, and a match left without goals must be a 0x0 draw. Returns the placements
+    # that fit, the earliest first
+    placements = []
+    for chosen in itertools.combinations(range(len(draws)), len(level)):
+        skipped = set(range(len(draws))) - set(chosen)
+        if all(draws[match] for match in skipped) and all(run is None or run == draws[match] for run, match in zip(level, chosen)):
+            placements.append(chosen)
+    return placements
+
+
+
+def assign_matches(df, df_vd):
+    # Match of every goal, goals of a date without matches get NO_MATCH. On a date with several matches the goals
+    # (in sheet order) are split into runs where the score starts again, and the runs go to the matches in order,
+    # skipping the goalless draws. The sheets cannot always tell which draw was the 0x0 one: a warning is issued
+    # then, and the earliest placement is used
+    from goal_types import parse_score
+
+    if 'Match' not in df_vd.columns:
+        df_vd = number_matches(df_vd)
+    match = df['Date'].map(df_vd.groupby('Date')['Match'].min()).to_numpy(dtype=float)
+
+    shared = df_vd['Date'][df_vd['Date'].duplicated()].unique()
+    for date in shared:
+        rows = np.flatnonzero((df['Date'] == date).to_numpy())
+        matches = df_vd[df_vd['Date'] == date].sort_values(by='Match')
+        ids, draws = matches['Match'].to_numpy(), matches['Winning Team'].isna().tolist()
+        runs, level = _score_runs(parse_score(df['Score'].to_numpy()[rows]))
+        placements = _place_runs(level, draws) if len(level) <= len(draws) else []
+        if len(placements) != 1:
+            fit = 'do not fit its {} matches' if not placements else 'fit its {} matches in more than one way'
+            warnings.warn(f'The goals of {pd.Timestamp(date):%Y-%m-%d} {fit.format(len(draws))}, check the match of each goal')
+        places = np.array(placements[0]) if placements else np.minimum(np.arange(len(level)), len(draws) - 1)
+        match[rows] = ids[places[runs]]
+
+    return df.assign(Match=np.nan_to_num(match, nan=NO_MATCH).astype(np.int64))
+
+
+
+def file_hash(path):
+    # Hash the workbook in chunks to detect real content changes
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+
+def _cache_paths(path, cache_dir):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, name + '.parquet'), os.path.join(cache_dir, name + '.json')
+
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+
+def _signatures(paths, known):
+    # (mtime_ns, size, sha256) of each file, hashing only the ones whose mtime or size differ from the known signature
+    signatures = []
+    for position, path in enumerate(paths):
+        stat = os.stat(path)
+        old = known[position] if position < len(known) else None
+        if old is not None and old['mtime_ns'] == stat.st_mtime_ns and old['size'] == stat.st_size:
+            signatures.append(old)
+        else:
+            signatures.append({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_hash(path)})
+    return signatures
+
+
+
+def load_cached(path, clean, cache_dir=CACHE_DIR, depends=()):
+    # Parquet copy of the workbook and the signatures of the sources it was built from: the workbook and the
+    # files in 'depends' (read by 'clean' too). Unchanged mtimes and sizes mean a fresh cache without hashing
+    parquet_path, meta_path = _cache_paths(path, cache_dir)
+    sources = [path, *depends]
+    meta = _read_meta(meta_path)
+    fresh = meta is not None and meta.get('version') == CACHE_VERSION and os.path.exists(parquet_path)
+    known = meta.get('sources', []) if fresh else []
+    signatures = _signatures(sources, known)
+
+    if fresh and len(known) == len(sources) and [signature['sha256'] for signature in signatures] == [signature['sha256'] for signature in known]:
+        # The files were touched but not changed: refresh the signatures and reuse the cache
+        if signatures != known:
+            _write_meta(meta_path, {'version': CACHE_VERSION, 'sources': signatures})
+        return pd.read_parquet(parquet_path)
+
+    # Rebuild the cache from the workbook
+    df = clean(pd.read_excel(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(parquet_path, index=False)
+    _write_meta(meta_path, {'version': CACHE_VERSION, 'sources': signatures})
+
+    return df
+
+
+
+def load_goals(path=GOALS_FILE, cache_dir=CACHE_DIR, matches_path=None):
+    # With matches_path every goal is keyed to its match ('Match') when the cache is built,
+    # so the cache depends on the matches workbook as well
+    if matches_path is None:
+        return load_cached(path, clean_goals, cache_dir)
+    return load_cached(path, lambda df: assign_matches(clean_goals(df), load_matches(matches_path, cache_dir)),
+                       cache_dir, depends=[matches_path])
+
+
+
+def load_matches(path=MATCHES_FILE, cache_dir=CACHE_DIR):
+    return load_cached(path, clean_matches, cache_dir)
+
+
+
+def load_season(goals_path=GOALS_FILE, matches_path=MATCHES_FILE, cache_dir=CACHE_DIR):
+    # Goals (df) and match results (df_vd) of a season, every goal keyed to its match
+    return load_goals(goals_path, cache_dir, matches_path), load_matches(matches_path, cache_dir)
@@ -0,0 +1,21 @@
+import importlib
+
+
+
+class LazyModule:
+    # Stand-in for a module that is only imported the first time one of its attributes is used
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        # Once imported the module lives in sys.modules, so this is a dictionary lookup after the first call
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}>'
+
+
+
+def lazy_import(name):
+    return LazyModule(name)
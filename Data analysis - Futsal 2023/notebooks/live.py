@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from goal_types import GoalState, game_segments, parse_score
+from ingest import GOALS_COLUMNS, NO_ASSIST, OWN_GOAL, OWN_GOAL_LABELS, parse_dates
+
+
+# Result of a goal event: the goal row, score (team A, team B), goal type, game segment,
+# provisional standings and the time from receiving the event to the update (seconds)
+LiveUpdate = namedtuple('LiveUpdate', ['goal', 'score', 'goal_type', 'segment', 'standings', 'seconds'])
+
+# Kinds of events in a feed; events without 'event' are goals
+START, GOAL, END, STOP = 'start', 'goal', 'end', 'stop'
+
+# Default port of the socket feed
+PORT = 8765
+
+
+
+def goal_row(event, date):
+    # Row of df from a goal event with the Goals sheet fields (Portuguese or English names), cleaned as ingest does
+    event = {GOALS_COLUMNS.get(key, key): value for key, value in event.items()}
+    scorer = str(event.get('Scorer', '')).strip()
+    assistant = event.get('Assistant')
+    assistant = NO_ASSIST if assistant is None or pd.isna(assistant) else str(assistant).strip()
+    minute = event.get('Minute')
+    score = event.get('Score')
+
+    if event.get('Date') not in (None, ''):
+        date = parse_dates(pd.Series([event['Date']], dtype=object)).iloc[0]
+    return {
+        'Date': pd.Timestamp(date),
+        'Scorer': OWN_GOAL if scorer in OWN_GOAL_LABELS else scorer,
+        'Assistant': assistant or NO_ASSIST,
+        'Minute': np.nan if minute in (None, '') else float(minute),
+        'Score': np.nan if score in (None, '') else str(score)
+    }
+
+
+
+class LiveMatch:
+    # A match being played: the two rosters, the running score and the goals received so far.
+    # Scores in the feed are typed team A first ('2x1'); the backfilled rows follow the workbook,
+    # winning (or first drawing) team first
+
+    def __init__(self, date, location, team_a, team_b):
+        self.date = pd.Timestamp(date)
+        self.location = location
+        self.teams = (list(team_a), list(team_b))
+        self.score = [0, 0]
+        self.state = GoalState()
+        self.goals = []
+        self.sides = []
+
+    @classmethod
+    def from_event(cls, event):
+        return cls(event['date'], event.get('location'), event['team_a'], event['team_b'])
+
+    def _side(self, goal):
+        # Team that scored (0 for A, 1 for B): from the score when the feed sends it, else from the rosters
+        teams = parse_score([goal['Score']]).iloc[0]
+        if teams.notna().all():
+            new = [int(teams['Team A']), int(teams['Team B'])]
+            changed = [side for side in (0, 1) if new[side] != self.score[side]]
+            if len(changed) == 1 and new[changed[0]] == self.score[changed[0]] + 1:
+                return changed[0]
+            raise ValueError(f"Score {goal['Score']} does not follow {self.score[0]}x{self.score[1]}")
+
+        for name in (goal['Scorer'], goal['Assistant']):
+            sides = [side for side in (0, 1) if name in self.teams[side]]
+            if len(sides) == 1:
+                return sides[0]
+        raise ValueError(f"Cannot tell which team scored: {goal['Scorer']} (send the score)")
+
+    def add_goal(self, event):
+        # Apply a goal event, the score is checked before anything changes
+        goal = goal_row(event, self.date)
+        side = self._side(goal)
+        self.score[side] += 1
+        goal_type = self.state.update(*self.score)
+        self.goals.append(goal)
+        self.sides.append(side)
+        return goal, tuple(self.score), goal_type, game_segments([goal['Minute']])[0]
+
+    def winner(self):
+        # Team in front (0 or 1), None on a draw
+        if self.score[0] == self.score[1]:
+            return None
+        return 0 if self.score[0] > self.score[1] else 1
+
+    def match_row(self):
+        # Row of df_vd for the current score
+        winner = self.winner()
+        a, b = (', '.join(team) for team in self.teams)
+        row = {'Date': self.date, 'Location': self.location,
+               'Winning Team': np.nan, 'Losing Team': np.nan, 'Draw Team 1': np.nan, 'Draw Team 2': np.nan}
+        if winner is None:
+            row.update({'Draw Team 1': a, 'Draw Team 2': b})
+        else:
+            row.update({'Winning Team': (a, b)[winner], 'Losing Team': (b, a)[winner]})
+        return row
+
+    def goal_rows(self):
+        # Rows of df with the score after each goal typed as in the workbook, winning team first
+        first = 1 if self.winner() == 1 else 0
+        score = [0, 0]
+        rows = []
+        for goal, side in zip(self.goals, self.sides):
+            score[side] += 1
+            rows.append({**goal, 'Score': f'{score[first]}x{score[1 - first]}'})
+        return rows
+
+    def backfill(self, log):
+        # Append the finished match and its goals to the season store (a MatchLog)
+        log.append(self.match_row(), self.goal_rows())
+
+
+
+async def file_events(path, follow=True, poll=0.05):
+    # Events of a JSON Lines file; with follow=True new lines are awaited (as tail -f) until a 'stop' event
+    with open(path, encoding='utf-8') as f:
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(poll)
+                continue
+            if line.strip():
+                yield json.loads(line)
+
+
+
+async def socket_events(host='127.0.0.1', port=PORT):
+    # Events sent as JSON lines by any client connecting to host:port, until a 'stop' event
+    queue = asyncio.Queue()
+
+    async def receive(reader, writer):
+        try:
+            async for line in reader:
+                if line.strip():
+                    await queue.put(json.loads(line))
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(receive, host, port)
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+
+async def run_live(events, log, match=None, on_update=None, on_error=None):
+    # Consume a feed: 'start' events open a match (date, location, team_a, team_b), goal events update it,
+    # 'end' backfills it into the log and 'stop' ends the feed. Each goal is reported to on_update as a LiveUpdate;
+    # bad events go to on_error (raised by default). Returns the matches that ended
+    finished = []
+    async for event in events:
+        received = time.perf_counter()
+        kind = event.get('event', GOAL)
+        try:
+            if kind == START:
+                if match is not None:
+                    raise ValueError(f'Start while the match of {match.date:%Y-%m-%d} is still open, end it first')
+                match = LiveMatch.from_event(event)
+            elif kind == GOAL:
+                if match is None:
+                    raise ValueError('Goal before the match started')
+                goal, score, goal_type, segment = match.add_goal(event)
+                standings = log.standings(match.match_row())
+                if on_update is not None:
+                    on_update(LiveUpdate(goal, score, goal_type, segment, standings, time.perf_counter() - received))
+            elif kind == END:
+                if match is None:
+                    raise ValueError('End before the match started')
+                match.backfill(log)
+                finished.append(match)
+                match = None
+            elif kind == STOP:
+                break
+            else:
+                raise ValueError(f'Unknown event: {kind}')
+        except (KeyError, ValueError) as error:
+            if on_error is None:
+                raise
+            on_error(event, error)
+    return finished
+
+
+
+def format_update(update, top=3):
+    # One line per goal: minute, scorer, assistant, score, goal type and segment, then the provisional leaders
+    goal = update.goal
+    minute = '--' if np.isnan(goal['Minute']) else f"{goal['Minute']:.0f}'"
+    assist = '' if goal['Assistant'] == NO_ASSIST else f" ({goal['Assistant']})"
+    details = ', '.join(str(value) for value in (update.goal_type, update.segment) if isinstance(value, str))
+    leaders = ', '.join(f'{row.Player} {row.Points}' for row in update.standings.head(top).itertuples())
+    return (f"{minute} {goal['Scorer']}{assist} {update.score[0]}x{update.score[1]} [{details}] "
+            f'| {leaders} | {update.seconds * 1000:.1f} ms')
+
+
+
+if __name__ == '__main__':
+    from match_log import MatchLog
+
+    parser = argparse.ArgumentParser(description='Live match stats from a feed of goal events')
+    parser.add_argument('log', help='JSON Lines season store (match_log.MatchLog) the finished matches are appended to')
+    parser.add_argument('--file', help='JSON Lines feed to follow')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    events = file_events(args.file) if args.file else socket_events(args.host, args.port)
+    asyncio.run(run_live(events, MatchLog(args.log), on_update=lambda update: print(format_update(update)),
+                         on_error=lambda event, error: print(f'Skipped {event}: {error}')))
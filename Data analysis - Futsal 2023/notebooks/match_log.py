@@ -0,0 +1,324 @@
+import json
+import os
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingest import GOALS_COLUMNS, MATCHES_COLUMNS, NO_ASSIST, OWN_GOAL, TEAM_COLUMNS
+from participation import COLUMN_OUTCOMES, OUTCOME_POINTS, ParticipationIndex
+from periods import period_labels, period_table, summarize_periods
+from ratings import RatingEngine
+from standings import compute_assistants, compute_scorers, compute_standings, leaderboard_table, standings_table
+from timeline import Timeline, points_timeline, timeline_columns
+
+
+# Columns of the cleaned sheets (df and df_vd), as the events are stored
+GOAL_FIELDS = list(GOALS_COLUMNS.values())
+MATCH_FIELDS = list(MATCHES_COLUMNS.values())
+
+
+
+def _roster(value):
+    # Names of a comma-joined roster cell, split the same way as participation.split_rosters
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    names = [name.strip() for name in str(value).split(',')]
+    return [name for name in names if name != '']
+
+
+
+def _to_json(row, fields):
+    # Event line of a match or goal row: ISO dates, None for the empty cells
+    event = {}
+    for field in fields:
+        value = row.get(field)
+        if isinstance(value, float) and np.isnan(value) or value is pd.NaT:
+            value = None
+        elif isinstance(value, (pd.Timestamp, np.datetime64)):
+            value = pd.Timestamp(value).isoformat()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        event[field] = value
+    return event
+
+
+
+def _from_json(event, fields):
+    # Row of a match or goal event, with the types of the cleaned sheets
+    row = {field: np.nan if event.get(field) is None else event[field] for field in fields}
+    row['Date'] = pd.Timestamp(row['Date'])
+    if 'Minute' in row:
+        row['Minute'] = float(row['Minute'])
+    return row
+
+
+
+class MatchLog:
+    # Append-only store of the matches and goals of a season. Appending a match updates the standings,
+    # leaderboard and period counts of its players, their ratings and its participation rows, so the cost of an append
+    # depends only on the size of the match; the tables are built from those counts when asked for.
+    # With a path, every append is also written to a JSON Lines file that is replayed on open
+
+    def __init__(self, path=None, period='month'):
+        self.path = path
+        self.period = period
+        # Name and dtype of the period column of the period table
+        self.period_column, labels = period_labels(pd.Series([], dtype='datetime64[ns]'), period)
+        self.period_dtype = labels.dtype
+        self._labels = {}
+
+        # Matches (rows of df_vd) and goals (rows of df) in the order they were appended
+        self.matches = []
+        self.goals = []
+
+        # Player IDs in order of first appearance, and their (loss, draw, win) counts
+        self.players = []
+        self.player_ids = {}
+        self.counts = []
+
+        # Goals and assists credited to each player
+        self.goal_counts = Counter()
+        self.assist_counts = Counter()
+
+        # (period, player) -> (loss, draw, win) counts, goals and assists
+        self.period_results = defaultdict(lambda: [0, 0, 0])
+        self.period_goals = Counter()
+        self.period_assists = Counter()
+
+        # Participation rows: match position, player ID and points earned
+        self.match = []
+        self.player = []
+        self.points = []
+
+        # Elo ratings, updated with every appended match
+        self.ratings = RatingEngine()
+
+        if path is not None and os.path.exists(path):
+            self._replay(path)
+
+    @classmethod
+    def from_season(cls, df, df_vd, period='month'):
+        # Log of a loaded season (in memory, save() writes it): the matches in date order,
+        # each date's goals appended with its first match
+        log = cls(period=period)
+        log._period(list(pd.concat([df_vd['Date'], df['Date']]).drop_duplicates()))
+        goals_by_date = defaultdict(list)
+        for goal in df.to_dict('records'):
+            goals_by_date[goal['Date']].append(goal)
+        for match in df_vd.sort_values(by='Date', kind='stable').to_dict('records'):
+            log.append(match, goals_by_date.pop(match['Date'], None))
+        for rows in goals_by_date.values():
+            log.append_goals(rows)
+        return log
+
+    @property
+    def n_matches(self):
+        return len(self.matches)
+
+    def append(self, match, goals=None):
+        # Add a match (a row of df_vd: dict or Series) and, optionally, its goals (rows of df)
+        row = _from_json(_to_json(match, MATCH_FIELDS), MATCH_FIELDS)
+        if row['Date'] is pd.NaT:
+            raise ValueError('A match needs a date')
+        if self.matches and row['Date'] < self.matches[-1]['Date']:
+            raise ValueError(f"Match of {row['Date']:%Y-%m-%d} is older than the last logged match "
+                             f"({self.matches[-1]['Date']:%Y-%m-%d}), rebuild the log with MatchLog.from_season")
+        goal_rows = self._goal_rows(goals, row['Date'])
+
+        if self.path is not None:
+            self._write([{'event': 'match', **_to_json(row, MATCH_FIELDS)}] + [{'event': 'goal', **_to_json(goal, GOAL_FIELDS)} for goal in goal_rows])
+        self._apply_match(row)
+        self._apply_goals(goal_rows)
+
+    def append_goals(self, goals):
+        # Add goals without a match (e.g. recorded after the match was logged)
+        goal_rows = self._goal_rows(goals)
+        if self.path is not None:
+            self._write([{'event': 'goal', **_to_json(goal, GOAL_FIELDS)} for goal in goal_rows])
+        self._apply_goals(goal_rows)
+
+    def _goal_rows(self, goals, date=None):
+        # Goal rows from a DataFrame or a list of dicts, dated with the match when the date is missing
+        if goals is None:
+            return []
+        records = goals.to_dict('records') if isinstance(goals, pd.DataFrame) else list(goals)
+        rows = []
+        for record in records:
+            record = {**record}
+            if date is not None and pd.isna(record.get('Date')):
+                record['Date'] = date
+            record['Assistant'] = NO_ASSIST if pd.isna(record.get('Assistant')) else record['Assistant']
+            rows.append(_from_json(_to_json(record, GOAL_FIELDS), GOAL_FIELDS))
+        return rows
+
+    def _write(self, events):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events))
+
+    def save(self, path):
+        # Write the whole log to a JSON Lines file and append to it from now on
+        events = [{'event': 'match', **_to_json(match, MATCH_FIELDS)} for match in self.matches]
+        events += [{'event': 'goal', **_to_json(goal, GOAL_FIELDS)} for goal in self.goals]
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events))
+        os.replace(path + '.tmp', path)
+        self.path = path
+
+    def _replay(self, path):
+        # Apply the events of the file in order, consecutive goals in one batch
+        goal_rows = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event['event'] == 'goal':
+                    goal_rows.append(_from_json(event, GOAL_FIELDS))
+                    continue
+                self._apply_goals(goal_rows)
+                goal_rows = []
+                self._apply_match(_from_json(event, MATCH_FIELDS))
+        self._apply_goals(goal_rows)
+
+    def _period(self, dates):
+        # Period label of each date, labelled once per date
+        new = sorted({date for date in dates if date not in self._labels})
+        if new:
+            _, labels = period_labels(pd.Series(new, dtype='datetime64[ns]'), self.period)
+            self._labels.update((date, label.item() if isinstance(label, np.generic) else label) for date, label in zip(new, labels))
+        return [self._labels[date] for date in dates]
+
+    def _apply_match(self, row):
+        position = len(self.matches)
+        self.matches.append(row)
+        period = self._period([row['Date']])[0]
+
+        for column in TEAM_COLUMNS:
+            outcome = COLUMN_OUTCOMES[column]
+            for name in _roster(row[column]):
+                player = self.player_ids.get(name)
+                if player is None:
+                    player = self.player_ids[name] = len(self.players)
+                    self.players.append(name)
+                    self.counts.append([0, 0, 0])
+                self.counts[player][outcome] += 1
+                self.period_results[(period, name)][outcome] += 1
+                self.match.append(position)
+                self.player.append(player)
+                self.points.append(int(OUTCOME_POINTS[outcome]))
+        self.ratings.append(row)
+
+    def _apply_goals(self, rows):
+        if not rows:
+            return
+        self.goals += rows
+        for row, period in zip(rows, self._period([row['Date'] for row in rows])):
+            if row['Scorer'] not in (NO_ASSIST, OWN_GOAL):
+                self.goal_counts[row['Scorer']] += 1
+            if row['Scorer'] != OWN_GOAL:
+                self.period_goals[(period, row['Scorer'])] += 1
+            if row['Assistant'] not in (NO_ASSIST, OWN_GOAL):
+                self.assist_counts[row['Assistant']] += 1
+            if row['Assistant'] != NO_ASSIST:
+                self.period_assists[(period, row['Assistant'])] += 1
+
+    def matches_frame(self):
+        # The logged matches as df_vd
+        df_vd = pd.DataFrame(self.matches, columns=MATCH_FIELDS)
+        df_vd['Date'] = pd.to_datetime(df_vd['Date'])
+        for column in TEAM_COLUMNS:
+            df_vd[column] = df_vd[column].astype('object')
+        return df_vd
+
+    def goals_frame(self):
+        # The logged goals as df
+        df = pd.DataFrame(self.goals, columns=GOAL_FIELDS)
+        df['Date'] = pd.to_datetime(df['Date'])
+        df['Minute'] = df['Minute'].astype(float)
+        df['Score'] = df['Score'].astype('object')
+        return df
+
+    def _alphabetical(self):
+        # Player IDs in the alphabetical order of ParticipationIndex
+        return np.array(sorted(range(len(self.players)), key=self.players.__getitem__), dtype=np.int64)
+
+    def standings(self, match=None):
+        # With a match (a row of df_vd), the standings as if it were appended, the log is not changed
+        players = list(self.players)
+        counts = np.array(self.counts, dtype=np.int64).reshape(-1, 3)
+        if match is not None:
+            ids = dict(self.player_ids)
+            extra = []
+            for column in TEAM_COLUMNS:
+                for name in _roster(match.get(column)):
+                    if name not in ids:
+                        ids[name] = len(players)
+                        players.append(name)
+                    extra.append((ids[name], COLUMN_OUTCOMES[column]))
+            counts = np.vstack([counts, np.zeros((len(players) - len(counts), 3), dtype=np.int64)])
+            for player, outcome in extra:
+                counts[player, outcome] += 1
+
+        order = sorted(range(len(players)), key=players.__getitem__)
+        return standings_table(np.array(players, dtype=object)[order], counts[order])
+
+    def scorers(self, df_players=None):
+        df_players = self.standings() if df_players is None else df_players
+        return leaderboard_table(df_players, pd.Series(self.goal_counts, dtype=np.int64), 'Goals')
+
+    def assistants(self, df_players=None):
+        df_players = self.standings() if df_players is None else df_players
+        return leaderboard_table(df_players, pd.Series(self.assist_counts, dtype=np.int64), 'Assists')
+
+    def period_table(self):
+        column = self.period_column
+        names = [column, 'Player']
+
+        def counts(values, name):
+            keys = sorted(values)
+            return pd.Series([values[key] for key in keys], index=pd.MultiIndex.from_tuples(keys, names=names), name=name, dtype=np.int64)
+
+        keys = sorted(self.period_results)
+        results = pd.DataFrame([self.period_results[key] for key in keys], columns=['Losses', 'Draws', 'Wins'],
+                               index=pd.MultiIndex.from_tuples(keys, names=names), dtype=np.int64)
+        table = summarize_periods(column, results, counts(self.period_goals, 'Goals'), counts(self.period_assists, 'Assists'))
+        return table.astype({column: self.period_dtype})
+
+    def timeline(self):
+        # Cumulative points of every player after each match, as timeline.points_timeline
+        rank = np.empty(len(self.players), dtype=np.int64)
+        order = self._alphabetical()
+        rank[order] = np.arange(len(order))
+        points = sparse.csr_matrix((np.array(self.points, dtype=np.int32), (np.array(self.match, dtype=np.int64), rank[np.array(self.player, dtype=np.int64)])),
+                                   shape=(self.n_matches, len(self.players))).toarray()
+        dates = np.array([row['Date'] for row in self.matches], dtype='datetime64[ns]')
+        return Timeline(dates, np.array(self.players, dtype=object)[order], np.cumsum(points, axis=0))
+
+
+
+def check_consistency(log):
+    # Fails (AssertionError) when the incremental tables of the log differ from a full recomputation
+    # of the logged season with the batch functions
+    df, df_vd = log.goals_frame(), log.matches_frame()
+    index = ParticipationIndex(df_vd)
+    df_players = compute_standings(index)
+
+    pairs = [
+        ('standings', log.standings(), df_players),
+        ('scorers', log.scorers(), compute_scorers(df, df_players)),
+        ('assistants', log.assistants(), compute_assistants(df, df_players)),
+        ('period table', log.period_table(), period_table(index, df, log.period))
+    ]
+    for name, incremental, full in pairs:
+        pd.testing.assert_frame_equal(incremental, full, obj=name)
+
+    incremental, full = log.timeline(), points_timeline(index)
+    for field in Timeline._fields:
+        np.testing.assert_array_equal(getattr(incremental, field), getattr(full, field), err_msg=f'timeline {field}')
+
+    # Same ratings as rating the whole season at once (the players in first appearance order there)
+    incremental, full = log.ratings.trajectory(), RatingEngine.from_index(index).trajectory()
+    np.testing.assert_array_equal(incremental.dates, full.dates, err_msg='ratings dates')
+    np.testing.assert_allclose(timeline_columns(incremental, full.players), full.values, err_msg='ratings')
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingest import TEAM_COLUMNS
+
+
+# Outcome codes of a player in a match
+LOSS = 0
+DRAW = 1
+WIN = 2
+
+# Points earned for each outcome code (loss, draw, win)
+OUTCOME_POINTS = np.array([0, 1, 3], dtype=np.int16)
+
+# Outcome represented by each roster column
+COLUMN_OUTCOMES = {'Winning Team': WIN, 'Losing Team': LOSS, 'Draw Team 1': DRAW, 'Draw Team 2': DRAW}
+
+
+
+def split_rosters(df_vd):
+    # One row per player in each match, the comma-joined cells are split only here
+    frames = []
+    for team, column in enumerate(TEAM_COLUMNS):
+        names = df_vd[column].dropna().astype(str).str.split(',').explode().str.strip()
+        names = names[names != '']
+        frames.append(pd.DataFrame({
+            'Match': names.index.to_numpy(),
+            'Player': names.to_numpy(dtype=object),
+            'Outcome': COLUMN_OUTCOMES[column],
+            'Team': team
+        }))
+
+    rosters = pd.concat(frames, ignore_index=True)
+    return rosters.sort_values(by=['Match', 'Team'], kind='stable').reset_index(drop=True)
+
+
+
+class ParticipationIndex:
+    # Integer index of who played each match and with which outcome, built once per season
+
+    def __init__(self, df_vd):
+        # Match IDs follow the date order of the matches
+        matches = df_vd.sort_values(by='Date', kind='stable')
+        self.match_labels = matches.index.to_numpy()
+        matches = matches.reset_index(drop=True)
+        self.dates = matches['Date'].to_numpy()
+        self.locations = matches['Location'].to_numpy(dtype=object)
+
+        # Player IDs follow the alphabetical order of the names
+        rosters = split_rosters(matches)
+        self.players, player_codes = np.unique(rosters['Player'].to_numpy(dtype=object), return_inverse=True)
+        self.player_ids = {name: i for i, name in enumerate(self.players)}
+
+        # Long format participation rows
+        self.match = rosters['Match'].to_numpy(dtype=np.int32)
+        self.player = player_codes.reshape(-1).astype(np.int32)
+        self.outcome = rosters['Outcome'].to_numpy(dtype=np.int8)
+
+        # Team of each row: position of its roster column in TEAM_COLUMNS (a match can have more than two)
+        self.team = rosters['Team'].to_numpy(dtype=np.int8)
+
+        # Sparse match x player matrix with a 1 for each participation
+        self.matrix = self.to_sparse()
+
+    @property
+    def n_matches(self):
+        return len(self.dates)
+
+    @property
+    def n_players(self):
+        return len(self.players)
+
+    @property
+    def points(self):
+        # Points earned in each participation row
+        return OUTCOME_POINTS[self.outcome]
+
+    def player_id(self, name):
+        return self.player_ids[name]
+
+    def to_sparse(self, values=None, rows=None):
+        # Match x player matrix holding 'values' for each participation row (1 by default)
+        if rows is None:
+            rows = slice(None)
+        match = self.match[rows]
+        player = self.player[rows]
+        if values is None:
+            values = np.ones(len(match), dtype=np.int32)
+        return sparse.csr_matrix((values, (match, player)), shape=(self.n_matches, self.n_players))
+
+    def outcome_matrix(self, outcome):
+        # Match x player matrix of the participations with the given outcome code
+        return self.to_sparse(rows=self.outcome == outcome)
+
+    def match_mask(self, start=None, end=None):
+        # Participation rows whose match date falls between start and end (inclusive)
+        dates = self.dates[self.match]
+        mask = np.ones(len(dates), dtype=bool)
+        if start is not None:
+            mask &= dates >= np.datetime64(pd.Timestamp(start))
+        if end is not None:
+            mask &= dates <= np.datetime64(pd.Timestamp(end))
+        return mask
+
+    def to_frame(self):
+        # Long format table with one row per player in each match
+        return pd.DataFrame({
+            'Match': self.match,
+            'Date': self.dates[self.match],
+            'Player': self.players[self.player],
+            'Outcome': self.outcome,
+            'Team': self.team
+        })
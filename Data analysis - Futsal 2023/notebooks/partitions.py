@@ -0,0 +1,135 @@
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ingest import DATA_DIR, GOALS_NAME, MATCHES_NAME
+
+
+# Season of a weekly group: its two workbooks live in data/<group>/ (data/ itself for DEFAULT_GROUP)
+Partition = namedtuple('Partition', ['group', 'season', 'goals_path', 'matches_path'])
+
+# Group of the workbooks found directly in data/
+DEFAULT_GROUP = 'main'
+
+# Counts of a partition that the tables are built from, and that add up across partitions:
+# 'results' holds the Losses, Draws and Wins of each player, 'goals' and 'assists' the credited ones,
+# 'venue_goals' and 'venue_matches' are indexed by location, and the period_* counts by (period, player)
+Partial = namedtuple('Partial', ['results', 'goals', 'assists', 'venue_goals', 'venue_matches',
+                                 'period_column', 'period_results', 'period_goals', 'period_assists'])
+
+# Season in the name of a goals workbook
+GOALS_PATTERN = re.compile('^' + re.escape(GOALS_NAME).replace(re.escape('{season}'), '(?P<season>.+)') + '$')
+
+
+
+def find_partitions(data_dir=DATA_DIR):
+    # Every (group, season) whose goals and matches workbooks are both in the data folder, by group and season
+    partitions = []
+    for directory, folders, files in os.walk(data_dir):
+        folders[:] = sorted(folder for folder in folders if not folder.startswith('.'))
+        group = os.path.relpath(directory, data_dir).replace(os.sep, '/')
+        group = DEFAULT_GROUP if group == '.' else group
+        for name in sorted(files):
+            match = GOALS_PATTERN.match(name)
+            if match is None:
+                continue
+            season = match.group('season')
+            matches_path = os.path.join(directory, MATCHES_NAME.format(season=season))
+            if os.path.exists(matches_path):
+                partitions.append(Partition(group, season, os.path.join(directory, name), matches_path))
+    return sorted(partitions, key=lambda partition: (partition.group, partition.season))
+
+
+
+def season_partial(df, df_vd, period='month'):
+    # Partial results of one season
+    from participation import ParticipationIndex
+    from periods import period_counts
+    from standings import credited_counts, outcome_counts
+    from venues import venue_counts
+
+    index = ParticipationIndex(df_vd)
+    results = pd.DataFrame(outcome_counts(index), index=pd.Index(index.players, name='Player'), columns=['Losses', 'Draws', 'Wins'])
+    venue_goals, venue_matches = venue_counts(df, df_vd)
+    period_column, period_results, period_goals, period_assists = period_counts(index, df, period)
+    return Partial(results, credited_counts(df, 'Scorer'), credited_counts(df, 'Assistant'), venue_goals, venue_matches,
+                   period_column, period_results, period_goals, period_assists)
+
+
+
+def partial_tables(partial):
+    # Standings, scorers, assistants, venue and period tables of a partial (of one season or merged)
+    from periods import summarize_periods
+    from standings import leaderboard_table, standings_table
+    from venues import venue_summary
+
+    df_players = standings_table(partial.results.index.to_numpy(dtype=object), partial.results[['Losses', 'Draws', 'Wins']].to_numpy())
+    return {
+        'standings': df_players,
+        'scorers': leaderboard_table(df_players, partial.goals, 'Goals'),
+        'assistants': leaderboard_table(df_players, partial.assists, 'Assists'),
+        'venues': venue_summary(partial.venue_goals, partial.venue_matches),
+        'period table': summarize_periods(partial.period_column, partial.period_results, partial.period_goals, partial.period_assists)
+    }
+
+
+
+def _add(values):
+    # Sum of Series / DataFrames by index label, labels sorted as groupby sorts them
+    values = pd.concat(values)
+    return values.groupby(level=list(range(values.index.nlevels))).sum()
+
+
+
+def merge_partials(partials):
+    # Partial of several partitions, adding up their counts (a period split across partitions is added up into one row)
+    partials = list(partials)
+    if not partials:
+        raise ValueError('No partials to merge')
+    columns = {partial.period_column for partial in partials}
+    if len(columns) > 1:
+        raise ValueError(f'Partials computed with different periods: {sorted(columns)}')
+
+    merged = {field: _add([getattr(partial, field) for partial in partials]) for field in Partial._fields if field != 'period_column'}
+    return Partial(period_column=columns.pop(), **merged)
+
+
+
+def analyze_partition(partition, period='month'):
+    # Partial results and tables of a partition, its Parquet cache next to its workbooks
+    from ingest import load_season
+    from schema import compact_season
+
+    cache_dir = os.path.join(os.path.dirname(partition.goals_path), '.cache')
+    df, df_vd = compact_season(*load_season(partition.goals_path, partition.matches_path, cache_dir))
+    partial = season_partial(df, df_vd, period)
+    return partial, partial_tables(partial)
+
+
+
+def analyze_partitions(partitions=None, period='month', processes=None):
+    # Partials and tables of every partition (all the ones in data/ by default), one partition per process
+    if partitions is None:
+        partitions = find_partitions()
+    partitions = list(partitions)
+
+    if processes == 1 or len(partitions) <= 1:
+        outputs = [analyze_partition(partition, period) for partition in partitions]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            outputs = list(executor.map(analyze_partition, partitions, [period] * len(partitions)))
+
+    partials = {partition: partial for partition, (partial, _) in zip(partitions, outputs)}
+    tables = {partition: tables for partition, (_, tables) in zip(partitions, outputs)}
+    return partials, tables
+
+
+
+def all_time(partials, groups=None, seasons=None):
+    # Tables of the chosen groups and seasons (all by default) merged from their partials, without reading any rows again
+    chosen = [partial for partition, partial in partials.items()
+              if (groups is None or partition.group in groups) and (seasons is None or partition.season in seasons)]
+    return partial_tables(merge_partials(chosen))
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from ingest import NO_ASSIST, OWN_GOAL
+from participation import DRAW, LOSS, WIN, OUTCOME_POINTS
+
+
+# Built-in calendars: name of the period column and how to label a date with it. The labels carry the year
+# (pandas Periods such as 2023-04), so the same month of two years stays in two rows; weeks run Monday to Sunday
+# as ISO weeks, and the one around New Year is a single week
+PERIODS = {
+    'month': ('Month', lambda dates: dates.dt.to_period('M')),
+    'week': ('Week', lambda dates: dates.dt.to_period('W')),
+    'quarter': ('Quarter', lambda dates: dates.dt.to_period('Q')),
+    'year': ('Year', lambda dates: dates.dt.year)
+}
+
+# Columns of the period table, in display order (the period column goes after 'Player')
+PERIOD_COLUMNS = ['Player', 'Games', 'Wins', 'Losses', 'Draws', 'Points', 'Efficiency', 'Goals', 'Assists', 'Goals Average', 'Assists Average']
+
+
+
+def period_labels(dates, period='month'):
+    # Name of the period column and the label of each date
+    # 'period' is one of PERIODS or a custom calendar: a function mapping a Series of dates to labels
+    dates = pd.Series(pd.to_datetime(dates)).reset_index(drop=True)
+    if callable(period):
+        return 'Period', pd.Series(np.asarray(period(dates)))
+    column, label = PERIODS[period]
+    return column, label(dates).reset_index(drop=True)
+
+
+
+def period_table(index, df, period='month'):
+    return summarize_periods(*period_counts(index, df, period))
+
+
+
+def period_counts(index, df, period='month'):
+    # Name of the period column and the counts summarize_periods builds the table from
+    # Period of each match, then of each participation row
+    column, match_periods = period_labels(index.dates, period)
+    match_periods = match_periods.to_numpy()[index.match]
+
+    # Wins, losses and draws of each player in each period in one grouped pass
+    results = pd.DataFrame({column: match_periods, 'Player': index.players[index.player], 'Outcome': index.outcome})
+    results = results.groupby([column, 'Player', 'Outcome']).size().unstack('Outcome', fill_value=0)
+    results = results.reindex(columns=[LOSS, DRAW, WIN], fill_value=0)
+    results.columns = ['Losses', 'Draws', 'Wins']
+
+    # Goals and assists of each player in each period, own goals and missing assistants are not credited
+    _, goal_periods = period_labels(df['Date'], period)
+    goals = pd.DataFrame({column: goal_periods.to_numpy(), 'Scorer': df['Scorer'].to_numpy(), 'Assistant': df['Assistant'].to_numpy()})
+    scorers = goals[goals['Scorer'] != OWN_GOAL].groupby([column, 'Scorer']).size().rename('Goals')
+    assistants = goals[goals['Assistant'] != NO_ASSIST].groupby([column, 'Assistant']).size().rename('Assists')
+    scorers.index.names = assistants.index.names = [column, 'Player']
+    return column, results, scorers, assistants
+
+
+
+def summarize_periods(column, results, scorers, assistants):
+    # Period table from the counts indexed by (period, player): 'results' with the Losses, Draws and Wins columns,
+    # 'scorers' and 'assistants' with the goals and assists
+    # Join everything on (period, player)
+    table = pd.concat([results, scorers, assistants], axis=1).fillna(0).astype(int).reset_index()
+
+    # Games, points, efficiency (numeric, in percent) and averages
+    table['Games'] = table['Wins'] + table['Losses'] + table['Draws']
+    table['Points'] = table['Wins'] * OUTCOME_POINTS[WIN] + table['Draws'] * OUTCOME_POINTS[DRAW]
+    games = table['Games'].where(table['Games'] > 0)
+    table['Efficiency'] = (table['Points'] / (games * 3) * 100).round(2)
+    table['Goals Average'] = (table['Goals'] / games).round(2)
+    table['Assists Average'] = (table['Assists'] / games).round(2)
+
+    # Sort by period and points
+    table = table.sort_values(by=[column, 'Points'], ascending=[True, False], kind='stable').reset_index(drop=True)
+    return table[[PERIOD_COLUMNS[0], column] + PERIOD_COLUMNS[1:]]
+
+
+
+def period_rankings(table, selected_period, column='Month', top=10):
+    # Points, goals and assists rankings of one period of the period table (a Period or its text, e.g. '2023-04')
+    df_period = table[table[column] == selected_period]
+
+    rankings = []
+    for sort_column, columns in [('Points', ['Points', 'Games', 'Efficiency']),
+                                 ('Goals', ['Goals', 'Games', 'Goals Average']),
+                                 ('Assists', ['Assists', 'Games', 'Assists Average'])]:
+        ranking = df_period.sort_values(by=sort_column, ascending=False, kind='stable').head(top).reset_index(drop=True)
+        ranking.insert(0, 'Position', ranking.index + 1)
+        rankings.append(ranking[['Position', 'Player'] + columns])
+
+    return tuple(rankings)
@@ -0,0 +1,265 @@
+import hashlib
+import inspect
+import os
+import pickle
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import ingest
+from render_cache import local_modules, modules_hash, update_hash
+
+
+# A step of the analysis: function(**inputs) returns a dict with one value per name in 'outputs'.
+# Stage functions must not modify their inputs, the same objects are handed to every stage that reads them
+Stage = namedtuple('Stage', ['name', 'function', 'inputs', 'outputs'])
+
+# A workbook given to the pipeline: its content, not its path, decides whether the stages reading it rerun
+SourceFile = namedtuple('SourceFile', ['path'])
+
+# Outputs hashed by content, so an unchanged result stops the recomputation there; other objects
+# (indexes, matrices) are identified by the inputs and code of the stage that built them
+CONTENT_TYPES = (pd.DataFrame, pd.Series, np.ndarray, str, bytes, int, float, bool, tuple, list, dict, type(None))
+
+
+
+def _ingest(goals_file, matches_file):
+    # Parquet cache next to the workbooks (data/.cache for the season ones)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(goals_file.path)), '.cache')
+    df, df_vd = ingest.load_season(goals_file.path, matches_file.path, cache_dir)
+    return {'df': df, 'df_vd': df_vd}
+
+
+
+def _participation(df_vd):
+    from participation import ParticipationIndex
+    return {'index': ParticipationIndex(df_vd)}
+
+
+
+def _standings(index):
+    from standings import compute_standings
+    return {'df_players': compute_standings(index)}
+
+
+
+def _scorers(df, df_players):
+    from standings import compute_scorers
+    return {'df_scorer': compute_scorers(df, df_players)}
+
+
+
+def _assistants(df, df_players):
+    from standings import compute_assistants
+    return {'df_assistants': compute_assistants(df, df_players)}
+
+
+
+def _timeline(index):
+    from timeline import points_timeline
+    return {'timeline': points_timeline(index)}
+
+
+
+def _ratings(index):
+    from ratings import RatingEngine
+    ratings = RatingEngine.from_index(index)
+    return {'ratings': ratings, 'rating_timeline': ratings.trajectory()}
+
+
+
+def _venues(index, df, df_vd):
+    from venues import VenueStats
+    venue_stats = VenueStats(index, df, df_vd)
+    return {'df_venues': venue_stats.table, 'venue_stats': venue_stats}
+
+
+
+def _monthly(index, df, period):
+    from periods import period_table
+    return {'period_table': period_table(index, df, period)}
+
+
+
+def _goal_types(df):
+    from goal_types import classify_goals
+    return {'goal_types': classify_goals(df, key='Match')}
+
+
+
+def _segments(df):
+    from goal_types import game_segments
+    return {'segments': pd.Series(game_segments(df['Minute']), index=df.index, name='Game Segment')}
+
+
+
+def _player_profiles(index, df, goal_types, segments, df_players, df_scorer, df_assistants):
+    from player_index import PlayerIndex
+    df = df.assign(**{'Goal Type': goal_types, 'Game Segment': segments})
+    return {'player_index': PlayerIndex(index, df, df_players, df_scorer, df_assistants)}
+
+
+
+# The computations behind 02_eda_clean.ipynb
+EDA_STAGES = [
+    Stage('ingest', _ingest, ['goals_file', 'matches_file'], ['df', 'df_vd']),
+    Stage('participation', _participation, ['df_vd'], ['index']),
+    Stage('standings', _standings, ['index'], ['df_players']),
+    Stage('scorers', _scorers, ['df', 'df_players'], ['df_scorer']),
+    Stage('assistants', _assistants, ['df', 'df_players'], ['df_assistants']),
+    Stage('timeline', _timeline, ['index'], ['timeline']),
+    Stage('ratings', _ratings, ['index'], ['ratings', 'rating_timeline']),
+    Stage('venues', _venues, ['index', 'df', 'df_vd'], ['df_venues', 'venue_stats']),
+    Stage('monthly', _monthly, ['index', 'df', 'period'], ['period_table']),
+    Stage('goal types', _goal_types, ['df'], ['goal_types']),
+    Stage('segments', _segments, ['df'], ['segments']),
+    Stage('player profiles', _player_profiles,
+          ['index', 'df', 'goal_types', 'segments', 'df_players', 'df_scorer', 'df_assistants'], ['player_index'])
+]
+
+# Inputs of EDA_STAGES that no stage produces
+EDA_SOURCES = {
+    'goals_file': SourceFile(ingest.GOALS_FILE),
+    'matches_file': SourceFile(ingest.MATCHES_FILE),
+    'period': 'month'
+}
+
+
+
+def fingerprint(value):
+    # Hash of a source value or of a stage output
+    digest = hashlib.sha256()
+    if isinstance(value, SourceFile):
+        digest.update(ingest.file_hash(value.path).encode())
+    else:
+        update_hash(digest, value)
+    return digest.hexdigest()
+
+
+
+def code_hash(function, sources=None):
+    # Hash of a stage function and of the source of every analysis module it reaches, directly or through
+    # other modules, so a change in e.g. standings.py reruns the stages built on it. 'sources' keeps the
+    # module sources already read (name -> source) across calls
+    source = inspect.getsource(function)
+    digest = hashlib.sha256(source.encode())
+    digest.update(modules_hash(local_modules(source), sources).encode())
+    return digest.hexdigest()
+
+
+
+class Pipeline:
+    # Runs the stages in dependency order, caches their outputs by the hash of their code and inputs,
+    # and recomputes only the stages downstream of an input whose content changed
+
+    def __init__(self, stages=EDA_STAGES, cache_dir=None):
+        self.stages = {}
+        self.producer = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f'Duplicate stage: {stage.name}')
+            for output in stage.outputs:
+                if output in self.producer:
+                    raise ValueError(f'{output} is produced by both {self.producer[output]} and {stage.name}')
+                self.producer[output] = stage.name
+            self.stages[stage.name] = stage
+
+        # Last result of each stage in memory (stage -> (key, outputs)), every result pickled to cache_dir if given
+        self.cache_dir = cache_dir
+        self._memory = {}
+        modules = {}
+        self._code = {name: code_hash(stage.function, modules) for name, stage in self.stages.items()}
+
+        # Stage, status and time of the last run
+        self.last_run = None
+
+    def order(self, targets=None):
+        # Stages needed for the targets (stage or output names, everything by default), dependencies first
+        if targets is None:
+            targets = list(self.stages)
+        ordered, visiting = [], set()
+
+        def visit(name):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f'Cycle through stage {name}')
+            visiting.add(name)
+            for item in self.stages[name].inputs:
+                if item in self.producer:
+                    visit(self.producer[item])
+            visiting.discard(name)
+            ordered.append(name)
+
+        for target in targets:
+            name = target if target in self.stages else self.producer.get(target)
+            if name is None:
+                raise KeyError(f'Unknown stage or output: {target}')
+            visit(name)
+        return ordered
+
+    def _load(self, name, key):
+        if name in self._memory and self._memory[name][0] == key:
+            return self._memory[name][1]
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, key + '.pkl')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    outputs = pickle.load(f)
+                self._memory[name] = (key, outputs)
+                return outputs
+        return None
+
+    def _store(self, name, key, outputs):
+        self._memory[name] = (key, outputs)
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, key + '.pkl')
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+
+    def run(self, targets=None, **sources):
+        # Values of every input and output of the stages needed for the targets.
+        # Sources missing from the call are taken from EDA_SOURCES
+        sources = {**EDA_SOURCES, **sources}
+        values = {}
+        hashes = {}
+        report = []
+
+        for name in self.order(targets):
+            stage = self.stages[name]
+            for item in stage.inputs:
+                if item not in values:
+                    if item not in sources:
+                        raise KeyError(f'Stage {name} needs {item}, which is neither a source nor an output')
+                    values[item] = sources[item]
+                    hashes[item] = fingerprint(sources[item])
+
+            # The key changes with the code of the stage or the content of any of its inputs
+            digest = hashlib.sha256(self._code[name].encode())
+            for item in stage.inputs:
+                digest.update(f'{item}={hashes[item]};'.encode())
+            key = digest.hexdigest()
+
+            start = time.perf_counter()
+            outputs = self._load(name, key)
+            status = 'cached'
+            if outputs is None:
+                outputs = stage.function(**{item: values[item] for item in stage.inputs})
+                missing = set(stage.outputs) - set(outputs)
+                if missing:
+                    raise ValueError(f'Stage {name} did not return {sorted(missing)}')
+                self._store(name, key, outputs)
+                status = 'computed'
+
+            for output in stage.outputs:
+                values[output] = outputs[output]
+                value = outputs[output]
+                hashes[output] = fingerprint(value) if isinstance(value, CONTENT_TYPES) else f'{key}:{output}'
+            report.append((name, status, time.perf_counter() - start))
+
+        self.last_run = pd.DataFrame(report, columns=['Stage', 'Status', 'Seconds'])
+        return values
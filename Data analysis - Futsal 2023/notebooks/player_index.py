@@ -0,0 +1,116 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from goal_types import GOAL_TYPES, SEGMENTS, classify_goals, game_segments
+from standings import compute_assistants, compute_scorers, compute_standings
+
+
+# Profile of a player in a season
+# 'goals_by_segment' / 'assists_by_segment' follow SEGMENTS, 'goals_by_type' / 'assists_by_type' follow GOAL_TYPES
+PlayerRecord = namedtuple('PlayerRecord', [
+    'player', 'position', 'matches', 'wins', 'draws', 'losses', 'points', 'efficiency',
+    'goals', 'goals_position', 'goals_average', 'assists', 'assists_position', 'assists_average', 'participations',
+    'goals_by_segment', 'assists_by_segment', 'goals_by_type', 'assists_by_type'
+])
+
+
+
+def _breakdown(names, categories, order):
+    # Count of each category for each name: {name: tuple of counts in 'order'}
+    table = pd.crosstab(pd.Series(names, name='Player'), pd.Series(categories, name='Category'))
+    table = table.reindex(columns=order, fill_value=0)
+    return dict(zip(table.index, map(tuple, table.to_numpy(dtype=np.int64).tolist())))
+
+
+
+class PlayerIndex:
+    # Per-player profile records of a season, built in one pass and looked up by name in O(1)
+
+    def __init__(self, index, df, df_players=None, df_scorer=None, df_assistants=None):
+        # Tables the profiles come from (computed here when not given)
+        if df_players is None:
+            df_players = compute_standings(index)
+        if df_scorer is None:
+            df_scorer = compute_scorers(df, df_players)
+        if df_assistants is None:
+            df_assistants = compute_assistants(df, df_players)
+
+        # Segment and type of every goal
+        segments = df['Game Segment'] if 'Game Segment' in df.columns else game_segments(df['Minute'])
+        goal_types = df['Goal Type'] if 'Goal Type' in df.columns else classify_goals(df, key='Match')
+        scorers = df['Scorer'].to_numpy(dtype=object)
+        assistants = df['Assistant'].to_numpy(dtype=object)
+
+        empty_segments = (0,) * len(SEGMENTS)
+        empty_types = (0,) * len(GOAL_TYPES)
+        goals_by_segment = _breakdown(scorers, np.asarray(segments, dtype=object), SEGMENTS)
+        assists_by_segment = _breakdown(assistants, np.asarray(segments, dtype=object), SEGMENTS)
+        goals_by_type = _breakdown(scorers, np.asarray(goal_types, dtype=object), GOAL_TYPES)
+        assists_by_type = _breakdown(assistants, np.asarray(goal_types, dtype=object), GOAL_TYPES)
+
+        scorer_rows = df_scorer.set_index('Player')
+        assistant_rows = df_assistants.set_index('Player')
+
+        # One record per player of the standings
+        self._records = {}
+        for row in df_players.itertuples(index=False):
+            player = row.Player
+            goals = scorer_rows.at[player, 'Goals'] if player in scorer_rows.index else 0
+            assists = assistant_rows.at[player, 'Assists'] if player in assistant_rows.index else 0
+            self._records[player] = PlayerRecord(
+                player=player,
+                position=int(row.Position),
+                matches=int(row.Matches),
+                wins=int(row.Wins),
+                draws=int(row.Draws),
+                losses=int(row.Losses),
+                points=int(row.Points),
+                efficiency=float(row.Efficiency),
+                goals=int(goals),
+                goals_position=int(scorer_rows.at[player, 'Position']) if player in scorer_rows.index else None,
+                goals_average=float(scorer_rows.at[player, 'Average']) if player in scorer_rows.index else 0.0,
+                assists=int(assists),
+                assists_position=int(assistant_rows.at[player, 'Position']) if player in assistant_rows.index else None,
+                assists_average=float(assistant_rows.at[player, 'Average']) if player in assistant_rows.index else 0.0,
+                participations=int(goals + assists),
+                goals_by_segment=goals_by_segment.get(player, empty_segments),
+                assists_by_segment=assists_by_segment.get(player, empty_segments),
+                goals_by_type=goals_by_type.get(player, empty_types),
+                assists_by_type=assists_by_type.get(player, empty_types)
+            )
+
+    def __contains__(self, player):
+        return player in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, player):
+        return self._records[player]
+
+    def get(self, player, default=None):
+        return self._records.get(player, default)
+
+    @property
+    def players(self):
+        return list(self._records)
+
+    def stats_card(self, player):
+        # Arguments of plot_player_stats, in order
+        record = self._records[player]
+        return (record.player, record.matches, record.wins, record.draws, record.losses, record.points,
+                record.efficiency, record.participations, record.goals, record.assists)
+
+    def to_frame(self):
+        # All the records as a DataFrame, the breakdowns expanded into one column per segment / goal type
+        rows = []
+        for record in self._records.values():
+            row = record._asdict()
+            for prefix, labels in [('goals_by_segment', SEGMENTS), ('assists_by_segment', SEGMENTS),
+                                   ('goals_by_type', GOAL_TYPES), ('assists_by_type', GOAL_TYPES)]:
+                counts = row.pop(prefix)
+                row.update({f'{prefix.split("_by_")[0]} - {label}': count for label, count in zip(labels, counts)})
+            rows.append(row)
+        return pd.DataFrame(rows)
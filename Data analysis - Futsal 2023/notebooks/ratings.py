@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingest import TEAM_COLUMNS
+from participation import COLUMN_OUTCOMES
+from timeline import Timeline
+
+
+# Rating of a player before their first match
+INITIAL_RATING = 1000.0
+
+# Largest change of a rating in one match, and the rating difference at which the stronger team is
+# expected to score 10 times as much as the weaker one (the usual Elo constants)
+K_FACTOR = 32.0
+SCALE = 400.0
+
+# Score of a team for each outcome code (loss, draw, win)
+OUTCOME_SCORES = np.array([0.0, 0.5, 1.0])
+
+# Columns of the rating table, in display order
+RATING_COLUMNS = ['Position', 'Player', 'Matches', 'Rating']
+
+
+
+def rating_changes(ratings, players, teams, outcomes, k=K_FACTOR, scale=SCALE):
+    # Change of the rating of each participation row of one match. Every team plays as the average rating
+    # of its players against the average of the other teams, and all its players move by the same amount
+    teams, team = np.unique(teams, return_inverse=True)
+    if len(teams) < 2:
+        return np.zeros(len(players))
+    size = np.bincount(team)
+    strength = np.bincount(team, weights=ratings[players]) / size
+    opponents = (strength.sum() - strength) / (len(teams) - 1)
+    expected = 1 / (1 + 10 ** ((opponents - strength) / scale))
+    score = np.zeros(len(teams))
+    score[team] = OUTCOME_SCORES[outcomes]
+    return (k * (score - expected))[team]
+
+
+
+class RatingEngine:
+    # Elo ratings of the players, updated match by match in date order. Appending a match costs only
+    # the size of the match; the changes of every match are kept so the whole trajectory can be rebuilt
+
+    def __init__(self, k=K_FACTOR, initial=INITIAL_RATING, scale=SCALE):
+        self.k = k
+        self.initial = initial
+        self.scale = scale
+
+        # Player IDs in order of first appearance (alphabetical when built from a ParticipationIndex)
+        self.players = []
+        self.player_ids = {}
+        self.ratings = np.empty(0)
+        self.matches = np.empty(0, dtype=np.int64)
+
+        # Date of each match, and the participation rows (match, player) with their rating change
+        self.dates = []
+        self._match = []
+        self._player = []
+        self._change = []
+
+    @classmethod
+    def from_index(cls, index, **parameters):
+        # Ratings after every match of a season
+        engine = cls(**parameters)
+        engine._add_players(list(index.players))
+        bounds = np.searchsorted(index.match, np.arange(index.n_matches + 1))
+        for date, start, end in zip(index.dates, bounds[:-1], bounds[1:]):
+            engine._apply(date, index.player[start:end], index.team[start:end], index.outcome[start:end])
+        return engine
+
+    @property
+    def n_matches(self):
+        return len(self.dates)
+
+    def _add_players(self, names):
+        new = [name for name in dict.fromkeys(names) if name not in self.player_ids]
+        for name in new:
+            self.player_ids[name] = len(self.players)
+            self.players.append(name)
+        if new:
+            self.ratings = np.concatenate([self.ratings, np.full(len(new), self.initial)])
+            self.matches = np.concatenate([self.matches, np.zeros(len(new), dtype=np.int64)])
+
+    def _apply(self, date, players, teams, outcomes):
+        players = np.asarray(players, dtype=np.int64)
+        change = rating_changes(self.ratings, players, teams, outcomes, self.k, self.scale)
+        np.add.at(self.ratings, players, change)
+        np.add.at(self.matches, players, 1)
+        self._match.append(np.full(len(players), self.n_matches, dtype=np.int64))
+        self._player.append(players)
+        self._change.append(change)
+        self.dates.append(np.datetime64(pd.Timestamp(date), 'ns'))
+
+    def append(self, match):
+        # Update the ratings with a match (a row of df_vd: dict or Series), newer than the ones applied
+        date = pd.Timestamp(match['Date'])
+        if self.dates and date < self.dates[-1]:
+            raise ValueError(f'Match of {date:%Y-%m-%d} is older than the last rated match, rebuild the ratings')
+        names, teams, outcomes = [], [], []
+        for team, column in enumerate(TEAM_COLUMNS):
+            value = match.get(column)
+            if value is None or pd.isna(value):
+                continue
+            roster = [name.strip() for name in str(value).split(',') if name.strip()]
+            names += roster
+            teams += [team] * len(roster)
+            outcomes += [COLUMN_OUTCOMES[column]] * len(roster)
+        self._add_players(names)
+        self._apply(date, [self.player_ids[name] for name in names], np.array(teams, dtype=np.int64), np.array(outcomes, dtype=np.int64))
+
+    def rating(self, player):
+        return float(self.ratings[self.player_ids[player]])
+
+    def table(self):
+        # Current rating of every player that played, the highest first
+        df_ratings = pd.DataFrame({'Player': self.players, 'Matches': self.matches, 'Rating': self.ratings.round(1)})
+        df_ratings = df_ratings[df_ratings['Matches'] > 0]
+        df_ratings = df_ratings.sort_values(by='Rating', ascending=False, kind='stable').reset_index(drop=True)
+        df_ratings.insert(0, 'Position', np.arange(1, len(df_ratings) + 1))
+        return df_ratings[RATING_COLUMNS]
+
+    def trajectory(self, players=None):
+        # Rating of every player (or of the chosen ones, in the order given) after each match, matches x players
+        # as timeline.points_timeline, so plot_points_evolution can draw it
+        names = self.players if players is None else list(players)
+        column = np.full(len(self.players), -1, dtype=np.int64)
+        column[np.array([self.player_ids[name] for name in names], dtype=np.int64)] = np.arange(len(names))
+
+        changes = np.zeros((self.n_matches, len(names)))
+        if self._change:
+            columns = column[np.concatenate(self._player)]
+            kept = columns >= 0
+            changes = sparse.csr_matrix((np.concatenate(self._change)[kept], (np.concatenate(self._match)[kept], columns[kept])),
+                                        shape=changes.shape).toarray()
+        return Timeline(np.array(self.dates, dtype='datetime64[ns]'), np.array(names, dtype=object),
+                        self.initial + np.cumsum(changes, axis=0))
@@ -0,0 +1,163 @@
+import ast
+import hashlib
+import os
+import shutil
+import tempfile
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+
+# Folder of the analysis modules
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules the charts are drawn with: the theme, the plot_* functions with their helpers and constants, and the
+# stat cards. These and every analysis module they import are part of every key, a change in any of them
+# invalidates the whole cache
+CODE_MODULES = ['style', 'auxiliary_functions', 'stat_cards']
+
+# Default size limit of the cache folder
+MAX_BYTES = 512 * 1024 * 1024
+
+
+
+def update_hash(digest, obj):
+    # Feed the content of a chart argument into the hash (DataFrames, Series and arrays by value, not by identity)
+    if isinstance(obj, pd.DataFrame):
+        digest.update(b'DataFrame')
+        digest.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        digest.update(b'Series')
+        digest.update(repr((obj.name, str(obj.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        digest.update(repr((obj.shape, str(obj.dtype))).encode())
+        if obj.dtype == object:
+            digest.update(pd.util.hash_array(obj.ravel().astype(str)).tobytes())
+        else:
+            digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        digest.update(b'dict')
+        for key in sorted(obj, key=repr):
+            update_hash(digest, key)
+            update_hash(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        # Namedtuples (e.g. Timeline) are hashed field by field
+        digest.update(type(obj).__name__.encode())
+        for item in obj:
+            update_hash(digest, item)
+    else:
+        digest.update(repr(obj).encode())
+    digest.update(b'|')
+
+
+
+def local_modules(source):
+    # Analysis modules a piece of code imports (also inside functions) or uses by name, as in ingest.load_season
+    names = set()
+    for node in ast.walk(ast.parse(textwrap.dedent(source))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+        elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            names.add(node.value.id)
+    return {name for name in names if os.path.isfile(os.path.join(MODULE_DIR, name + '.py'))}
+
+
+
+def modules_hash(names, sources=None):
+    # Hash of the source of analysis modules and of every analysis module they reach through imports.
+    # 'sources' keeps the module sources already read (name -> source) across calls
+    sources = {} if sources is None else sources
+    pending, reached = set(names), set()
+    while pending:
+        name = pending.pop()
+        reached.add(name)
+        if name not in sources:
+            with open(os.path.join(MODULE_DIR, name + '.py'), encoding='utf-8') as f:
+                sources[name] = f.read()
+        pending |= local_modules(sources[name]) - reached
+
+    digest = hashlib.sha256()
+    for name in sorted(reached):
+        digest.update(f'|{name}|'.encode())
+        digest.update(sources[name].encode())
+    return digest.hexdigest()
+
+
+
+def _folder_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+
+class RenderCache:
+    # Rendered charts on disk, addressed by the hash of what produced them, evicted least recently used first
+
+    def __init__(self, cache_dir, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # The theme and the plotting code are part of every key
+        self._code = modules_hash(CODE_MODULES)
+
+    def key(self, job, formats):
+        digest = hashlib.sha256()
+        update_hash(digest, (self._code, job.function, tuple(formats)))
+        update_hash(digest, job.args)
+        update_hash(digest, job.kwargs)
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key, base):
+        # Copy the cached files of 'key' to 'base' + their suffix ('.png', ' (2).png', ...), None on a miss
+        entry = self._entry(key)
+        if not os.path.isdir(entry):
+            return None
+        files = []
+        for name in sorted(os.listdir(entry)):
+            path = base + name
+            shutil.copyfile(os.path.join(entry, name), path)
+            files.append(path)
+
+        # Mark the entry as recently used
+        os.utime(entry)
+        return files
+
+    def put(self, key, base, files):
+        # Store the rendered files of 'key', the entry appears atomically once complete
+        entry = self._entry(key)
+        if os.path.isdir(entry):
+            return
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix='.staging-')
+        for path in files:
+            shutil.copyfile(path, os.path.join(staging, path[len(base):]))
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same chart first
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def size(self):
+        return sum(_folder_size(entry.path) for entry in os.scandir(self.cache_dir) if entry.is_dir() and not entry.name.startswith('.'))
+
+    def evict(self):
+        # Remove the least recently used entries until the cache fits in max_bytes
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                entries.append((entry.stat().st_mtime, _folder_size(entry.path), entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from goal_types import GOAL_TYPES, SEGMENTS, parse_score
+from ingest import NO_ASSIST, OWN_GOAL, TEAM_COLUMNS
+
+
+# Columns of the goals frame holding player names (plus the NO_ASSIST and OWN_GOAL labels)
+PLAYER_COLUMNS = ['Scorer', 'Assistant']
+
+# Labels with a fixed set of values, kept in the order of the charts
+LABEL_DTYPES = {
+    'Goal Type': pd.CategoricalDtype(GOAL_TYPES),
+    'Game Segment': pd.CategoricalDtype(SEGMENTS)
+}
+
+# Columns holding small counts (minutes of a match, goals of a team) and match IDs
+SMALL_INT_COLUMNS = ['Minute', 'Team A', 'Team B', 'Match']
+
+# Smallest integer types, tried in order
+INT_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+
+def small_int(values):
+    # Values in the smallest integer type that holds them, nullable (Int8, ...) when some are missing;
+    # non-integral values are left as they are
+    values = pd.Series(values)
+    numbers = pd.to_numeric(values, errors='coerce')
+    present = numbers.dropna()
+    if (numbers.isna() != values.isna()).any() or not (present == present.round()).all():
+        return values
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype in INT_DTYPES:
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            break
+    if numbers.isna().any():
+        return numbers.astype(pd.api.types.pandas_dtype(dtype.__name__.capitalize()))
+    return numbers.astype(dtype)
+
+
+
+def compact_scores(score):
+    # Goals of each team after each goal ('Team A', 'Team B') in the smallest integer type
+    teams = parse_score(score)
+    return pd.DataFrame({column: small_int(teams[column]) for column in teams.columns})
+
+
+
+def player_dtype(df, df_vd):
+    # One categorical type for every player name of the season (rosters, scorers and assistants),
+    # shared by the columns so they compare and merge without recoding
+    names = [df[column].dropna().astype(str) for column in PLAYER_COLUMNS]
+    for column in TEAM_COLUMNS:
+        names.append(df_vd[column].dropna().astype(str).str.split(',').explode().str.strip())
+    names = pd.concat(names, ignore_index=True)
+    return pd.CategoricalDtype(sorted(set(names[names != '']) | {NO_ASSIST, OWN_GOAL}))
+
+
+
+def compact_goals(df, players=None):
+    # Goals frame with categorical names, score and labels, and small integer minutes and team goals
+    if players is None:
+        names = pd.concat([df[column] for column in PLAYER_COLUMNS]).dropna().astype(str)
+        players = pd.CategoricalDtype(sorted(set(names)))
+    df = df.copy()
+    for column in PLAYER_COLUMNS:
+        df[column] = df[column].astype(players)
+    for column in SMALL_INT_COLUMNS:
+        if column in df.columns:
+            df[column] = small_int(df[column])
+    if 'Score' in df.columns:
+        df['Score'] = df['Score'].astype('category')
+    for column, dtype in LABEL_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+
+def compact_matches(df_vd):
+    # Matches frame with categorical venues (the rosters stay text, ParticipationIndex holds them as integer codes)
+    df_vd = df_vd.assign(Location=df_vd['Location'].astype('category'))
+    if 'Match' in df_vd.columns:
+        df_vd['Match'] = small_int(df_vd['Match'])
+    return df_vd
+
+
+
+def compact_season(df, df_vd):
+    # Goals and matches of a season in the compact schema, the player names sharing one categorical type
+    return compact_goals(df, player_dtype(df, df_vd)), compact_matches(df_vd)
+
+
+
+def memory_usage(frames):
+    # Bytes of every column of the frames ({name: DataFrame}), object strings counted deeply
+    rows = []
+    for name, df in frames.items():
+        usage = df.memory_usage(deep=True, index=False)
+        rows += [(name, column, str(df[column].dtype), int(usage[column])) for column in df.columns]
+    return pd.DataFrame(rows, columns=['Frame', 'Column', 'Dtype', 'Bytes'])
+
+
+
+def memory_report(before, after):
+    # Memory of every column before and after (same frame names), with the totals of each frame
+    report = memory_usage(before).merge(memory_usage(after), on=['Frame', 'Column'], how='outer', suffixes=(' Before', ' After'))
+    totals = report.groupby('Frame', sort=False)[['Bytes Before', 'Bytes After']].sum().reset_index()
+    totals['Column'] = '(total)'
+    report = pd.concat([report, totals], ignore_index=True)
+
+    report['MB Before'] = (report['Bytes Before'] / 2 ** 20).round(3)
+    report['MB After'] = (report['Bytes After'] / 2 ** 20).round(3)
+    report['Ratio'] = (report['Bytes After'] / report['Bytes Before']).round(3)
+    return report[['Frame', 'Column', 'Dtype Before', 'Dtype After', 'MB Before', 'MB After', 'Ratio']]
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from goal_types import GOAL_TYPES, SEGMENTS
+
+
+# Default address of the service
+HOST = '127.0.0.1'
+PORT = 8000
+
+# Responses kept in memory (path and query -> status, body, ETag)
+CACHE_SIZE = 1024
+
+# Browsers and clients may reuse a response for this long before revalidating it with its ETag (seconds)
+MAX_AGE = 60
+
+# Requests larger than this are refused (bytes of request line and headers)
+MAX_REQUEST = 16384
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+
+def _records(df):
+    # Rows of a table as a list of dicts, NaN as null
+    return json.loads(df.to_json(orient='records', force_ascii=False))
+
+
+
+class StatsService:
+    # Read-only JSON views of a season: the tables and indices are built once, each response is
+    # serialized on its first request and served from memory afterwards
+
+    def __init__(self, values, cache_size=CACHE_SIZE):
+        from teammates import TeammateMatrices
+
+        # Outputs of pipeline.Pipeline.run
+        self.df_players = values['df_players']
+        self.df_scorer = values['df_scorer']
+        self.df_assistants = values['df_assistants']
+        self.player_index = values['player_index']
+        self.teammate_matrices = TeammateMatrices(values['index'])
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        # Routes: first path segment -> handler(parts, query) returning (status, payload)
+        self.routes = {
+            'standings': lambda parts, query: self._table(self.df_players, parts, query),
+            'scorers': lambda parts, query: self._table(self.df_scorer, parts, query),
+            'assistants': lambda parts, query: self._table(self.df_assistants, parts, query),
+            'players': self._players,
+            'health': lambda parts, query: (200, {'status': 'ok', 'players': len(self.player_index)})
+        }
+
+    @classmethod
+    def from_pipeline(cls, pipeline=None, **sources):
+        # Service over the season the pipeline loads (the EDA sources by default)
+        from pipeline import Pipeline
+
+        pipeline = Pipeline() if pipeline is None else pipeline
+        return cls(pipeline.run(['df_players', 'df_scorer', 'df_assistants', 'player_index', 'index'], **sources))
+
+    def _table(self, df, parts, query):
+        if len(parts) > 1:
+            return 404, {'error': 'Not found'}
+        limit = query.get('limit')
+        if limit is not None:
+            # ASCII only: str.isdigit also accepts digits such as '²' that int() refuses
+            if not (limit.isascii() and limit.isdigit()):
+                return 400, {'error': 'limit must be a non-negative integer'}
+            df = df.head(int(limit))
+        return 200, _records(df)
+
+    def _players(self, parts, query):
+        if len(parts) == 1:
+            return 200, self.player_index.players
+        if len(parts) > 3:
+            return 404, {'error': 'Not found'}
+        player = parts[1]
+        if player not in self.player_index:
+            return 404, {'error': f'Unknown player: {player}'}
+        if len(parts) == 2:
+            return 200, self.profile(player)
+        if parts[2] == 'teammates':
+            return 200, self.teammates(player)
+        return 404, {'error': 'Not found'}
+
+    def profile(self, player):
+        # Profile record with the segment and goal type breakdowns labelled
+        record = self.player_index[player]._asdict()
+        for field, labels in [('goals_by_segment', SEGMENTS), ('assists_by_segment', SEGMENTS),
+                              ('goals_by_type', GOAL_TYPES), ('assists_by_type', GOAL_TYPES)]:
+            record[field] = dict(zip(labels, record[field]))
+        return record
+
+    def teammates(self, player):
+        # Results with each teammate, the most games first
+        df_plot = self.teammate_matrices.teammate_results(player)
+        df_plot = df_plot.sort_values(by=['Games', 'Efficiency'], ascending=False, kind='stable').round({'Efficiency': 2})
+        return _records(df_plot.rename_axis('Teammate').reset_index())
+
+    def response(self, target):
+        # (status, body, ETag) of a request target such as '/players/Theo?x=1', cached by target
+        cached = self._cache.get(target)
+        if cached is not None:
+            self._cache.move_to_end(target)
+            return cached
+
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handler = self.routes.get(parts[0]) if parts else None
+        status, payload = (404, {'error': 'Not found'}) if handler is None else handler(parts, query)
+
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        cached = (status, body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        self._cache[target] = cached
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return cached
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 connection: GET and HEAD requests, kept alive until the client closes it
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(_response(431, b'', None, keep_alive=False))
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    writer.write(_response(400, b'', None, keep_alive=False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+                if method not in ('GET', 'HEAD'):
+                    writer.write(_response(405, b'', None, keep_alive))
+                else:
+                    try:
+                        status, body, etag = self.response(target)
+                    except Exception:
+                        # A failing handler answers 500 (not cached) instead of dropping the connection
+                        status, body, etag = 500, json.dumps({'error': 'Internal server error'}).encode('utf-8'), None
+                    if status == 200 and etag in headers.get('if-none-match', ''):
+                        status, body = 304, b''
+                    writer.write(_response(status, b'' if method == 'HEAD' else body, etag, keep_alive, len(body)))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST)
+        async with server:
+            await server.serve_forever()
+
+
+
+def _response(status, body, etag, keep_alive, length=None):
+    # Bytes of an HTTP/1.1 response, 'length' differs from len(body) for HEAD requests
+    headers = [f'HTTP/1.1 {status} {STATUS_TEXT[status]}',
+               f'Content-Length: {len(body) if length is None else length}',
+               'Connection: ' + ('keep-alive' if keep_alive else 'close')]
+    if status in (200, 304):
+        headers += [f'ETag: {etag}', f'Cache-Control: public, max-age={MAX_AGE}']
+    if status != 304:
+        headers.append('Content-Type: application/json; charset=utf-8')
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Season stats as JSON: /standings, /scorers, /assistants, /players, '
+                                                 '/players/<name>, /players/<name>/teammates (?limit=N on the tables)')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    service = StatsService.from_pipeline()
+    print(f'Serving {len(service.player_index)} players on http://{args.host}:{args.port}')
+    asyncio.run(service.serve(args.host, args.port))
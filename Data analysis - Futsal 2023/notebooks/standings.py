@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from ingest import NO_ASSIST, OWN_GOAL
+from participation import DRAW, LOSS, WIN, OUTCOME_POINTS
+
+
+# Columns of the season standings, in display order
+STANDINGS_COLUMNS = ['Position', 'Player', 'Matches', 'Wins', 'Losses', 'Draws', 'Points', 'Efficiency']
+
+
+
+def outcome_counts(index, start=None, end=None):
+    # Participation rows of the matches played between start and end
+    mask = index.match_mask(start, end)
+    player = index.player[mask]
+    outcome = index.outcome[mask]
+
+    # Count wins, draws and losses of every player in one pass: one bin per (player, outcome)
+    return np.bincount(player.astype(np.int64) * 3 + outcome, minlength=index.n_players * 3).reshape(-1, 3)
+
+
+
+def compute_standings(index, start=None, end=None):
+    return standings_table(index.players, outcome_counts(index, start, end))
+
+
+
+def standings_table(players, counts):
+    # Standings from the (loss, draw, win) counts of each player, 'players' in alphabetical order
+    df_players = pd.DataFrame({
+        'Player': players,
+        'Matches': counts.sum(axis=1),
+        'Wins': counts[:, WIN],
+        'Losses': counts[:, LOSS],
+        'Draws': counts[:, DRAW],
+        'Points': counts @ OUTCOME_POINTS.astype(np.int64)
+    })
+
+    # Keep only the players that played in the period
+    df_players = df_players[df_players['Matches'] > 0]
+
+    # Efficiency in percent, kept numeric (format it only when rendering)
+    df_players = df_players.assign(Efficiency=(df_players['Points'] / (df_players['Matches'] * 3) * 100).round(2))
+
+    # Sort the players by points and create the "Position" column
+    df_players = df_players.sort_values(by='Points', ascending=False, kind='stable').reset_index(drop=True)
+    df_players.insert(0, 'Position', np.arange(1, len(df_players) + 1))
+
+    return df_players[STANDINGS_COLUMNS]
+
+
+
+def credited_counts(df, column='Scorer'):
+    # Goals ('Scorer') or assists ('Assistant') of each player, own goals and missing assistants are not credited
+    return df[column][~df[column].isin([NO_ASSIST, OWN_GOAL])].value_counts()
+
+
+
+def compute_leaderboard(df, df_players, column='Scorer', label='Goals'):
+    return leaderboard_table(df_players, credited_counts(df, column), label)
+
+
+
+def leaderboard_table(df_players, counts, label):
+    # Leaderboard of the standings players from a Series of counts indexed by name
+    # Every player of the standings, with 0 for the ones that never scored or assisted
+    df_leaderboard = df_players[['Player', 'Matches']].copy()
+    df_leaderboard[label] = df_leaderboard['Player'].map(counts).fillna(0).astype(int)
+
+    # Average per match, rounded to 2 decimal places
+    df_leaderboard['Average'] = (df_leaderboard[label] / df_leaderboard['Matches']).round(2)
+
+    # Sort by the count and add the position column
+    df_leaderboard = df_leaderboard.sort_values(by=label, ascending=False, kind='stable').reset_index(drop=True)
+    df_leaderboard.insert(0, 'Position', np.arange(1, len(df_leaderboard) + 1))
+
+    return df_leaderboard[['Position', 'Player', 'Matches', label, 'Average']]
+
+
+
+def compute_scorers(df, df_players):
+    return compute_leaderboard(df, df_players, 'Scorer', 'Goals')
+
+
+
+def compute_assistants(df, df_players):
+    return compute_leaderboard(df, df_players, 'Assistant', 'Assists')
+
+
+
+def adjacent_rows(df, player, above=2, below=2):
+    # Rows around the player in a ranking table (empty DataFrame if the player is not in it)
+    positions = np.flatnonzero(df['Player'].to_numpy() == player)
+    if len(positions) == 0:
+        return df.iloc[0:0]
+    position = positions[0]
+    return df.iloc[max(0, position - above):position + below + 1]
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+from batch_render import safe_name
+
+
+# Size of a stats card drawn by draw_player_stats
+CARD_SIZE = (800, 300)
+
+
+
+def iter_cards(player_index, players=None):
+    # (player, card image) for the chosen players of a PlayerIndex, every player by default
+    from auxiliary_functions import draw_player_stats
+
+    for player in (player_index.players if players is None else players):
+        yield player, draw_player_stats(*player_index.stats_card(player))
+
+
+
+def render_cards(player_index, players=None, output_dir=None, sprite_path=None, columns=4, extension='png'):
+    # Stats cards of many players in one call, the fonts are loaded once for all of them
+    # Each card goes to output_dir as '<player> - Stats.<extension>' and/or into one sprite sheet at sprite_path
+    # Returns a DataFrame with the file of every card and its box (left, top, right, bottom) in the sprite sheet
+    from PIL import Image
+
+    if output_dir is None and sprite_path is None:
+        raise ValueError('Give an output_dir, a sprite_path or both')
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    players = player_index.players if players is None else list(players)
+    width, height = CARD_SIZE
+    rows = -(-len(players) // columns)
+    sprite = Image.new('RGB', (width * min(columns, len(players)), height * rows)) if sprite_path and players else None
+
+    records = []
+    for i, (player, card) in enumerate(iter_cards(player_index, players)):
+        path = None
+        if output_dir is not None:
+            path = os.path.join(output_dir, f'{safe_name(player)} - Stats.{extension}')
+            card.save(path)
+
+        box = None
+        if sprite is not None:
+            left, top = (i % columns) * width, (i // columns) * height
+            box = (left, top, left + width, top + height)
+            sprite.paste(card, box[:2])
+        records.append((player, path, box))
+
+    if sprite is not None:
+        sprite.save(sprite_path)
+
+    return pd.DataFrame(records, columns=['Player', 'File', 'Box'])
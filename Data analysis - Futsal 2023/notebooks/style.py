@@ -1,7 +1,4 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from contextlib import contextmanager
 
 ### Colors
 color1 = 'blue' # Light Blue
@@ -11,16 +8,36 @@ color4 = '#5854A3' # Purple
 color5 = '#2D5653' # Dark Green
 colorbg ='#EBCFA7' # BG Light Brown
 
-# Define the background style and colors of the chart elements.
-sns.set(rc={"axes.facecolor": colorbg, "figure.facecolor": colorbg, "axes.labelcolor": color2, "xtick.color": color2, "ytick.color": color2, "text.color": color2})
 color_palette_num = [color1, color2, color3, color4, color5]
 color_palette_cluster = [color1, color3, color5, color2, color4]
 
-# Set global parameters for all bar charts
-plt.rcParams['patch.edgecolor'] = 'none'  # Removes edges from all patches (including bars)
+# Background style and colors of the chart elements
+THEME_RC = {"axes.facecolor": colorbg, "figure.facecolor": colorbg, "axes.labelcolor": color2, "xtick.color": color2, "ytick.color": color2, "text.color": color2}
 
-# Remove Grids
-plt.rcParams['axes.grid'] = False
+# Global parameters for all charts
+CHART_RC = {
+    'patch.edgecolor': 'none',  # Removes edges from all patches (including bars)
+    'axes.grid': False,  # Remove Grids
+    'axes.edgecolor': color2  # Color of the axes borders
+}
 
-# Definir a cor das bordas globalmente
-plt.rcParams['axes.edgecolor'] = color2   
+
+
+def apply_theme():
+    # Set the theme for the rest of the session (notebooks), nothing is changed on import
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(rc=THEME_RC)
+    plt.rcParams.update(CHART_RC)
+
+
+
+@contextmanager
+def theme():
+    # Set the theme only inside a with block, the previous settings come back on exit
+    import matplotlib.pyplot as plt
+
+    with plt.rc_context():
+        apply_theme()
+        yield
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import GOALS_COLUMNS, GOALS_FILE, MATCHES_COLUMNS, MATCHES_FILE, NO_ASSIST, OWN_GOAL_LABELS
+
+
+# Venues of the 2023 season and how often they were used
+LOCATIONS = ['Clube Geraldo Santana', 'Colégio Bom Conselho', 'Quadra Sintética PUCRS']
+LOCATION_WEIGHTS = [0.62, 0.36, 0.02]
+
+# Label of own goals in the exported workbooks ('Gol Contra')
+RAW_OWN_GOAL = OWN_GOAL_LABELS[0]
+
+# Largest sheet Excel can open
+EXCEL_MAX_ROWS = 1048576
+
+# Matches whose rosters are drawn together (bounds the memory of the draw to CHUNK x players)
+CHUNK = 2048
+
+
+
+def _draw_rosters(rng, n_matches, weights, size):
+    # 'size' distinct players per match, regulars more likely than occasional players (Gumbel top-k)
+    log_weights = np.log(weights)
+    rosters = np.empty((n_matches, size), dtype=np.int64)
+    for start in range(0, n_matches, CHUNK):
+        keys = log_weights + rng.gumbel(size=(min(CHUNK, n_matches - start), len(weights)))
+        rosters[start:start + CHUNK] = np.argpartition(-keys, size - 1, axis=1)[:, :size]
+    return rosters
+
+
+
+def _within_match_order(rng, match):
+    # Random order of the rows of each match, the matches themselves stay in order
+    return np.lexsort((rng.random(len(match)), match))
+
+
+
+def generate_season(n_matches=41, n_players=55, team_size=6, goals_per_team=13.0, seed=0, start='2023-02-28', freq='D',
+                    own_goal_rate=0.015, assist_rate=0.55, no_details_rate=0.1, max_minute=60):
+    # Synthetic season in the schema of the omarcador.com workbooks: (goals, matches) with the Portuguese headers,
+    # comma-joined rosters, 'Placar' typed as '2-1' (first the winning team, or Time Empate 1 on draws),
+    # '-' when nobody assisted and 'Gol Contra' for own goals.
+    # Every match gets its own date (freq='D' keeps tens of thousands of matches inside the pandas date range);
+    # a share of the matches (no_details_rate) has no minutes nor scores, like the first matches of 2023
+    if 2 * team_size > n_players:
+        raise ValueError(f'{n_players} players are not enough for two teams of {team_size}')
+    rng = np.random.default_rng(seed)
+
+    # Players: a few regulars and a long tail of occasional players
+    names = np.array([f'Player {i:0{len(str(n_players))}d}' for i in range(1, n_players + 1)], dtype=object)
+    attendance = rng.pareto(1.5, n_players) + 0.05
+    skill = rng.lognormal(0, 0.6, n_players)
+
+    # Rosters: the first team_size players of each draw are team A
+    rosters = _draw_rosters(rng, n_matches, attendance, 2 * team_size).reshape(n_matches, 2, team_size)
+
+    # Goals of each team, the team with more goals is the winner
+    goals = rng.poisson(goals_per_team, size=(n_matches, 2))
+    draw = goals[:, 0] == goals[:, 1]
+    swap = goals[:, 1] > goals[:, 0]
+    rosters[swap] = rosters[swap, ::-1]
+    goals[swap] = goals[swap, ::-1]
+
+    # One row per goal, team 0 always the winning (or first drawing) team
+    total = goals.sum(axis=1)
+    match = np.repeat(np.arange(n_matches), total)
+    position = np.arange(len(match)) - np.repeat(np.cumsum(total) - total, total)
+    team = (position >= goals[match, 0]).astype(np.int64)
+    team = team[_within_match_order(rng, match)]
+
+    # Running score after each goal
+    offsets = np.repeat(np.cumsum(total) - total, total)
+    score_a = np.cumsum(team == 0) - np.concatenate([[0], np.cumsum(team == 0)])[offsets]
+    score_b = np.cumsum(team == 1) - np.concatenate([[0], np.cumsum(team == 1)])[offsets]
+
+    # Minute of each goal, increasing inside each match
+    minutes = rng.integers(0, max_minute, size=len(match)).astype(float)
+    minutes = minutes[np.lexsort((minutes, match))]
+
+    # Scorer and assistant: two different players of the scoring team, the better ones more often
+    players = rosters[match, team]
+    keys = np.log(skill[players]) + rng.gumbel(size=players.shape)
+    scorer_slot = keys.argmax(axis=1)
+    keys[np.arange(len(match)), scorer_slot] = -np.inf
+    assistant_slot = keys.argmax(axis=1)
+    scorer = names[players[np.arange(len(match)), scorer_slot]]
+    assistant = names[players[np.arange(len(match)), assistant_slot]]
+    assistant[rng.random(len(match)) >= assist_rate] = NO_ASSIST
+
+    own_goal = rng.random(len(match)) < own_goal_rate
+    scorer[own_goal] = RAW_OWN_GOAL
+    assistant[own_goal] = NO_ASSIST
+
+    # Matches recorded without minutes nor scores
+    no_details = (rng.random(n_matches) < no_details_rate)[match]
+    score = np.char.add(np.char.add(score_a.astype(str), '-'), score_b.astype(str)).astype(object)
+    score[no_details] = np.nan
+    minutes[no_details] = np.nan
+
+    dates = pd.date_range(start, periods=n_matches, freq=freq)
+    goals_columns = list(GOALS_COLUMNS)
+    df_goals = pd.DataFrame(dict(zip(goals_columns, [dates[match], scorer, assistant, minutes, score])))
+
+    # Matches sheet: winners / losers, or both teams as drawing teams
+    rosters_text = pd.DataFrame({
+        'A': [', '.join(team) for team in names[rosters[:, 0]]],
+        'B': [', '.join(team) for team in names[rosters[:, 1]]]
+    })
+    matches_columns = list(MATCHES_COLUMNS)
+    df_matches = pd.DataFrame({
+        matches_columns[0]: dates,
+        matches_columns[1]: rng.choice(LOCATIONS, size=n_matches, p=LOCATION_WEIGHTS),
+        matches_columns[2]: rosters_text['A'].where(~draw),
+        matches_columns[3]: rosters_text['B'].where(~draw),
+        matches_columns[4]: rosters_text['A'].where(draw),
+        matches_columns[5]: rosters_text['B'].where(draw)
+    })
+
+    return df_goals, df_matches
+
+
+
+def write_season(directory, df_goals, df_matches, goals_name=os.path.basename(GOALS_FILE), matches_name=os.path.basename(MATCHES_FILE)):
+    # Write a season as the two workbooks, with the file names and date format of the real ones
+    if len(df_goals) >= EXCEL_MAX_ROWS:
+        raise ValueError(f'{len(df_goals)} goals do not fit in one Excel sheet')
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for df, name in [(df_goals, goals_name), (df_matches, matches_name)]:
+        path = os.path.join(directory, name)
+        with pd.ExcelWriter(path, date_format='mm-dd-yy', datetime_format='mm-dd-yy') as writer:
+            df.to_excel(writer, sheet_name='Sheet1', index=False)
+        paths.append(path)
+    return tuple(paths)
@@ -0,0 +1,285 @@
+import io
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from fonts import get_font
+
+
+# A table to draw: 'bold_columns' are column names, 'highlight_rows' row positions (0 = first row under the header)
+TableSpec = namedtuple('TableSpec', [
+    'df', 'header_color', 'header_text_color', 'row_colors', 'fontsize', 'header_bold', 'bold_columns',
+    'highlight_rows', 'title', 'title_color', 'title_size'
+], defaults=[10, False, (), (), None, None, None])
+
+# Geometry of a table: column widths, start of the grid, row and title heights, total size
+Layout = namedtuple('Layout', ['widths', 'left', 'row_height', 'title_height', 'width', 'height'])
+
+# Geometry in multiples of the font size: height of a row, padding on each side of the text of a cell
+ROW_HEIGHT = 2.0
+CELL_PAD = 0.6
+
+# Space between tables, around the figure and under the title (points)
+TABLE_GAP = 24
+MARGIN = 6
+TITLE_HEIGHT = 2.2
+
+# Text color of the theme
+TEXT_COLOR = '#41210A'
+EDGE_COLOR = 'black'
+EDGE_WIDTH = 1.0
+HIGHLIGHT_COLOR = 'lightgreen'
+
+# Background of the raster images (the figure color of the theme) and their resolution
+BACKGROUND = '#EBCFA7'
+DPI = 100
+
+
+
+def paginate(df, rows_per_page=None):
+    # Split a long table into pages of rows_per_page rows (the whole table in one page by default)
+    if not rows_per_page or len(df) <= rows_per_page:
+        return [df]
+    return [df.iloc[start:start + rows_per_page] for start in range(0, len(df), rows_per_page)]
+
+
+
+def highlight_rows(df, value, column='Player'):
+    # Positions of the rows whose 'column' equals value (the chosen player in the classification tables)
+    return tuple(np.flatnonzero(df[column].to_numpy() == value))
+
+
+
+def _cells(spec):
+    # Text of every cell, as the matplotlib table would print it
+    return [str(c) for c in spec.df.columns], spec.df.to_numpy(dtype=object).astype(str)
+
+
+
+def _title_size(spec):
+    return spec.title_size or spec.fontsize * 1.4
+
+
+
+@lru_cache(maxsize=4096)
+def _mpl_text_width(text, fontsize, bold):
+    # Width of a text in points, measured once per (text, size, weight) without a renderer
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextToPath
+
+    prop = FontProperties(size=fontsize, weight='bold' if bold else 'normal')
+    return TextToPath().get_text_width_height_descent(text, prop, ismath=False)[0]
+
+
+
+def _raster_text_width(text, fontsize, bold):
+    return get_font(int(round(fontsize)), bold).getlength(text)
+
+
+
+def _layout(spec, measure, scale=1.0):
+    # Column widths, row height, title height and total size of a table, in points (pixels for the raster backend)
+    header, cells = _cells(spec)
+    fontsize = spec.fontsize * scale
+    bold_columns = set(spec.bold_columns)
+    widths = []
+    for j, name in enumerate(header):
+        # A text is at most as wide as its length times the widest character of the column: the texts are
+        # measured longest first, and the ones that cannot beat the widest so far are not measured
+        column = np.unique(cells[:, j])
+        bold = name in bold_columns
+        width = measure(name, fontsize, spec.header_bold)
+        glyph = max((measure(char, fontsize, bold) for char in set(''.join(column))), default=0)
+        lengths = np.char.str_len(column)
+        for k in np.argsort(-lengths, kind='stable'):
+            if lengths[k] * glyph <= width:
+                break
+            width = max(width, measure(column[k], fontsize, bold))
+        widths.append(width + 2 * CELL_PAD * fontsize)
+
+    # A title wider than the grid widens the table, the grid is then centered under it
+    row_height = ROW_HEIGHT * fontsize
+    title_height = TITLE_HEIGHT * _title_size(spec) * scale if spec.title else 0
+    title_width = measure(spec.title, _title_size(spec) * scale, True) + 2 * CELL_PAD * fontsize if spec.title else 0
+    width = max(sum(widths), title_width)
+    return Layout(np.array(widths), (width - sum(widths)) / 2, row_height, title_height, width,
+                  title_height + row_height * (len(cells) + 1))
+
+
+
+def _row_colors(spec):
+    # Background of every row, header first
+    n = len(spec.df)
+    colors = [spec.row_colors[i % len(spec.row_colors)] for i in range(n)]
+    for i in spec.highlight_rows:
+        colors[i] = HIGHLIGHT_COLOR
+    return [spec.header_color] + colors
+
+
+
+def draw_table(ax, spec, layout):
+    # Draw a table on axes whose data coordinates are points: one collection for the row backgrounds,
+    # one for the grid, and a text per cell
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    header, cells = _cells(spec)
+    widths, left, row_height, title_height, width, height = layout
+    edges = left + np.concatenate([[0], np.cumsum(widths)])
+    right = edges[-1]
+    centers = (edges[:-1] + edges[1:]) / 2
+    tops = title_height + row_height * np.arange(len(cells) + 2)
+
+    ax.set_xlim(0, width)
+    ax.set_ylim(height, 0)
+    ax.axis('off')
+
+    # Rows
+    boxes = [[(left, top), (right, top), (right, bottom), (left, bottom)] for top, bottom in zip(tops[:-1], tops[1:])]
+    ax.add_collection(PolyCollection(boxes, facecolors=_row_colors(spec), edgecolors='none'))
+
+    # Grid
+    lines = [[(left, y), (right, y)] for y in tops] + [[(x, tops[0]), (x, tops[-1])] for x in edges]
+    ax.add_collection(LineCollection(lines, colors=EDGE_COLOR, linewidths=EDGE_WIDTH))
+
+    # Texts
+    middles = tops[:-1] + row_height / 2
+    for j, name in enumerate(header):
+        ax.text(centers[j], middles[0], name, ha='center', va='center', fontsize=spec.fontsize,
+                color=spec.header_text_color, fontweight='bold' if spec.header_bold else 'normal')
+    bold_columns = set(spec.bold_columns)
+    for j, name in enumerate(header):
+        weight = 'bold' if name in bold_columns else 'normal'
+        for i, text in enumerate(cells[:, j]):
+            ax.text(centers[j], middles[i + 1], text, ha='center', va='center', fontsize=spec.fontsize,
+                    color=TEXT_COLOR, fontweight=weight)
+
+    if spec.title:
+        ax.text(width / 2, title_height / 2, spec.title, ha='center', va='center', fontsize=_title_size(spec),
+                fontweight='bold', color=spec.title_color or TEXT_COLOR)
+
+
+
+def plot_tables(specs, gap=TABLE_GAP):
+    # Tables side by side in a new figure sized to fit them exactly, tops aligned
+    import matplotlib.pyplot as plt
+
+    layouts = [_layout(spec, _mpl_text_width) for spec in specs]
+    fig_width = sum(layout.width for layout in layouts) + gap * (len(specs) - 1) + 2 * MARGIN
+    fig_height = max(layout.height for layout in layouts) + 2 * MARGIN
+    fig = plt.figure(figsize=(fig_width / 72, fig_height / 72))
+
+    left = MARGIN
+    for spec, layout in zip(specs, layouts):
+        width, height = layout.width, layout.height
+        ax = fig.add_axes([left / fig_width, 1 - (MARGIN + height) / fig_height, width / fig_width, height / fig_height])
+        draw_table(ax, spec, layout)
+        left += width + gap
+    return fig
+
+
+
+def raster_table(spec, dpi=DPI):
+    # A table drawn straight into a PIL image, with the geometry of plot_tables
+    from PIL import Image, ImageDraw
+
+    scale = dpi / 72
+    header, cells = _cells(spec)
+    widths, left, row_height, title_height, width, height = _layout(spec, _raster_text_width, scale)
+    image = Image.new('RGB', (int(np.ceil(width)) + 1, int(np.ceil(height)) + 1), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    edges = left + np.concatenate([[0], np.cumsum(widths)])
+    right = edges[-1]
+    centers = (edges[:-1] + edges[1:]) / 2
+    tops = title_height + row_height * np.arange(len(cells) + 2)
+    for color, top, bottom in zip(_row_colors(spec), tops[:-1], tops[1:]):
+        draw.rectangle([left, top, right, bottom], fill=color)
+    for y in tops:
+        draw.line([(left, y), (right, y)], fill=EDGE_COLOR, width=max(1, round(EDGE_WIDTH * scale)))
+    for x in edges:
+        draw.line([(x, tops[0]), (x, tops[-1])], fill=EDGE_COLOR, width=max(1, round(EDGE_WIDTH * scale)))
+
+    size = int(round(spec.fontsize * scale))
+    middles = tops[:-1] + row_height / 2
+    header_font = get_font(size, spec.header_bold)
+    for j, name in enumerate(header):
+        draw.text((centers[j], middles[0]), name, font=header_font, fill=spec.header_text_color, anchor='mm')
+    bold_columns = set(spec.bold_columns)
+    for j, name in enumerate(header):
+        font = get_font(size, name in bold_columns)
+        for i, text in enumerate(cells[:, j]):
+            draw.text((centers[j], middles[i + 1]), text, font=font, fill=TEXT_COLOR, anchor='mm')
+
+    if spec.title:
+        draw.text((width / 2, title_height / 2), spec.title, font=get_font(int(round(_title_size(spec) * scale))),
+                  fill=spec.title_color or TEXT_COLOR, anchor='mm')
+    return image
+
+
+
+def raster_tables(specs, gap=TABLE_GAP, dpi=DPI):
+    # Tables side by side in one PIL image, tops aligned
+    from PIL import Image
+
+    scale = dpi / 72
+    images = [raster_table(spec, dpi) for spec in specs]
+    margin, gap = int(MARGIN * scale), int(gap * scale)
+    width = sum(image.width for image in images) + gap * (len(images) - 1) + 2 * margin
+    height = max(image.height for image in images) + 2 * margin
+    sheet = Image.new('RGB', (width, height), BACKGROUND)
+    left = margin
+    for image in images:
+        sheet.paste(image, (left, margin))
+        left += image.width + gap
+    return sheet
+
+
+
+def _per_cell_table(spec):
+    # The former way of drawing the tables, kept as the reference of benchmark_tables:
+    # ax.table, then every cell styled one by one and the column widths measured at draw time
+    import matplotlib.pyplot as plt
+
+    df = spec.df
+    fig, ax = plt.subplots(figsize=(3.5, 3))
+    ax.axis('off')
+    table = ax.table(cellText=df.values, colLabels=df.columns, cellLoc='center', loc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(spec.fontsize)
+    table.auto_set_column_width(col=list(range(len(df.columns))))
+    table.scale(1, 1.5)
+    for j in range(len(df.columns)):
+        table[(0, j)].set_facecolor(spec.header_color)
+        table[(0, j)].get_text().set_color(spec.header_text_color)
+    for i in range(len(df)):
+        for j in range(len(df.columns)):
+            table[(i + 1, j)].set_facecolor(spec.row_colors[i % 2])
+    return fig
+
+
+
+def benchmark_tables(spec, repeats=3):
+    # Best time of drawing a table and encoding it as PNG with each backend
+    import matplotlib.pyplot as plt
+
+    def save(fig):
+        fig.savefig(io.BytesIO(), format='png', bbox_inches='tight')
+        plt.close(fig)
+
+    backends = {
+        'ax.table (per cell)': lambda: save(_per_cell_table(spec)),
+        'engine': lambda: save(plot_tables([spec])),
+        'raster': lambda: raster_tables([spec]).save(io.BytesIO(), format='png')
+    }
+    rows = []
+    for name, run in backends.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        rows.append((name, len(spec.df), min(times)))
+    return pd.DataFrame(rows, columns=['Backend', 'Rows', 'Seconds'])
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ingest import TEAM_COLUMNS
+from participation import DRAW, LOSS, WIN, OUTCOME_POINTS
+
+
+
+class TeammateMatrices:
+    # Players x players matrices of how many matches each pair played on the same team, split by outcome
+
+    def __init__(self, index):
+        self.players = index.players
+        self.player_ids = index.player_ids
+
+        # Team x player matrix: one row per roster column of each match
+        n_columns = len(TEAM_COLUMNS)
+        team = index.match.astype(np.int64) * n_columns + index.team
+        n_teams = index.n_matches * n_columns
+
+        def pairs(rows):
+            teams = sparse.csr_matrix((np.ones(rows.sum(), dtype=np.int32), (team[rows], index.player[rows])),
+                                      shape=(n_teams, index.n_players))
+            return (teams.T @ teams).tocsr()
+
+        # Co-occurrence of every pair, then only in wins, draws and losses (the diagonal is each player's own count)
+        self.together = pairs(np.ones(len(team), dtype=bool))
+        self.wins = pairs(index.outcome == WIN)
+        self.draws = pairs(index.outcome == DRAW)
+        self.losses = pairs(index.outcome == LOSS)
+
+    def _row(self, matrix, player):
+        # Row of the player as a dense array, without the player itself
+        row = matrix.getrow(self.player_ids[player]).toarray().ravel()
+        row[self.player_ids[player]] = 0
+        return row
+
+    def teammates(self, player):
+        # Number of matches played with each teammate, most frequent first
+        counts = pd.Series(self._row(self.together, player), index=self.players)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def teammate_results(self, player):
+        # Wins, losses, draws, games, points and efficiency (numeric, in percent) with each teammate
+        df_plot = pd.DataFrame({
+            'Winning Team': self._row(self.wins, player),
+            'Losing Team': self._row(self.losses, player),
+            'Draw Team': self._row(self.draws, player)
+        }, index=self.players)
+
+        df_plot['Games'] = df_plot['Winning Team'] + df_plot['Losing Team'] + df_plot['Draw Team']
+        df_plot = df_plot[df_plot['Games'] > 0].copy()
+        df_plot['Points'] = df_plot['Winning Team'] * OUTCOME_POINTS[WIN] + df_plot['Draw Team'] * OUTCOME_POINTS[DRAW]
+        df_plot['Efficiency'] = df_plot['Points'] / (df_plot['Games'] * 3) * 100
+
+        return df_plot
@@ -0,0 +1,32 @@
+import matplotlib
+import pytest
+
+import auxiliary_functions
+import batch_render
+from batch_render import RenderJob, render_all
+
+
+
+def plot_line(values):
+    # A chart drawn as the plot_* functions draw theirs
+    import matplotlib.pyplot as plt
+    plt.figure()
+    plt.plot(values)
+    auxiliary_functions.show_figure()
+
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_rendering_in_process_leaves_the_caller_as_it_was(tmp_path, monkeypatch, jobs):
+    monkeypatch.setattr(auxiliary_functions, 'plot_line', plot_line, raising=False)
+    show_figure, show_image = auxiliary_functions.show_figure, auxiliary_functions.show_image
+    backend = matplotlib.get_backend()
+
+    results = render_all([RenderJob(f'Line {i}', 'plot_line', ([1, 3, 2],), {}) for i in range(jobs)], str(tmp_path), processes=1)
+    assert results['Error'].isna().all()
+    assert [files for files in results['Files']] == [[str(tmp_path / f'Line {i}.png')] for i in range(jobs)]
+    assert all((tmp_path / f'Line {i}.png').exists() for i in range(jobs))
+
+    assert matplotlib.get_backend() == backend
+    assert auxiliary_functions.show_figure is show_figure and auxiliary_functions.show_image is show_image
+    assert batch_render._target is None
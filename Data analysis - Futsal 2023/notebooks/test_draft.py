@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from draft import draft_teams, team_sizes
+
+
+
+def brute_spreads(values, n_teams):
+    # Spread of every split of the players into teams of the draft sizes, the smallest first. Each player joins
+    # a team already started or starts the next one, so every split is met once
+    sizes = team_sizes(len(values), n_teams)
+    spreads = []
+
+    def split(player, teams):
+        if player == len(values):
+            if sorted(map(len, teams), reverse=True) == sizes:
+                averages = [np.mean([values[i] for i in team]) for team in teams]
+                spreads.append(max(averages) - min(averages))
+            return
+        for team in teams:
+            if len(team) < sizes[0]:
+                team.append(player)
+                split(player + 1, teams)
+                team.pop()
+        if len(teams) < n_teams:
+            split(player + 1, teams + [[player]])
+
+    split(0, [])
+    return sorted(spreads)
+
+
+
+def check_drafts(values, n_teams, processes, top=6):
+    strengths = {f'Player {i}': value for i, value in enumerate(values)}
+    drafts = draft_teams(strengths, n_teams, top=top, processes=processes)
+    expected = brute_spreads(list(values), n_teams)[:top]
+    assert np.allclose([draft.spread for draft in drafts], expected)
+
+    # Every draft is a different split of all the players into teams of the right sizes
+    splits = set()
+    for draft in drafts:
+        assert sorted(itertools.chain.from_iterable(draft.teams)) == sorted(strengths)
+        assert sorted(map(len, draft.teams), reverse=True) == team_sizes(len(values), n_teams)
+        splits.add(frozenset(map(frozenset, draft.teams)))
+    assert len(splits) == len(drafts)
+
+
+
+# (players, teams): even and uneven team sizes, one player per team included
+CASES = [(8, 2), (7, 2), (9, 2), (9, 3), (10, 3), (11, 3), (10, 4), (9, 4), (4, 4), (5, 2), (10, 5)]
+
+
+
+@pytest.mark.parametrize('n_players, n_teams', CASES)
+@pytest.mark.parametrize('seed', range(2))
+def test_draft_matches_brute_force(n_players, n_teams, seed):
+    values = np.random.default_rng(seed).normal(1000, 50, n_players).round(1)
+    check_drafts(values, n_teams, processes=1)
+
+
+
+@pytest.mark.parametrize('n_players, n_teams', CASES)
+def test_draft_with_ties(n_players, n_teams):
+    # Few distinct strengths: many players and splits are tied
+    values = np.random.default_rng(n_players * n_teams).integers(1, 4, n_players).astype(float)
+    check_drafts(values, n_teams, processes=1)
+
+
+
+@pytest.mark.parametrize('n_players, n_teams', [(8, 2), (9, 2), (10, 3), (9, 4)])
+def test_draft_in_processes(n_players, n_teams):
+    values = np.random.default_rng(n_players).normal(1000, 50, n_players).round(1)
+    check_drafts(values, n_teams, processes=2)
+    ties = np.random.default_rng(n_players).integers(1, 4, n_players).astype(float)
+    check_drafts(ties, n_teams, processes=2)
@@ -0,0 +1,53 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from export import export_tables, write_workbook
+
+
+
+def test_workbook_round_trip(tmp_path):
+    # Missing and infinite numbers, dates, booleans and XML special characters survive the streamed workbook
+    df = pd.DataFrame({
+        'Player': ['A & B', '<Theo>', ' "quoted" ', 'tab\there', None],
+        'Goals': [3, 0, -2, 7, 1],
+        'Average': [1.5, np.nan, np.inf, -np.inf, 0.25],
+        'Date': pd.to_datetime(['2023-01-03', '2023-12-19', None, '2023-06-01', '2023-02-28']),
+        'Played': [True, False, True, False, True]
+    })
+    path = tmp_path / 'tables.xlsx'
+    write_workbook({'standings': df, 'a/b:c': df.head(1)}, str(path))
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ['standings', 'a_b_c']
+
+    read = pd.read_excel(path, sheet_name='standings')
+    assert read['Player'].tolist()[:4] == ['A & B', '<Theo>', ' "quoted" ', 'tab\there']
+    assert pd.isna(read['Player'].iloc[4])
+    assert read['Goals'].tolist() == [3, 0, -2, 7, 1]
+    assert read['Average'].iloc[0] == 1.5 and read['Average'].iloc[4] == 0.25
+    assert read['Average'].iloc[1:4].isna().all()
+    pd.testing.assert_series_equal(read['Date'], df['Date'], check_dtype=False)
+    assert read['Played'].tolist() == [True, False, True, False, True]
+
+
+
+def test_time_zone_aware_dates(tmp_path):
+    # Written in their own wall-clock time, as Excel has no time zones
+    dates = pd.Series(pd.to_datetime(['2023-01-03 20:30', None, '2023-07-01 09:00'])).dt.tz_localize('America/Sao_Paulo')
+    path = tmp_path / 'tables.xlsx'
+    write_workbook({'matches': pd.DataFrame({'Kick-off': dates})}, str(path))
+
+    read = pd.read_excel(path)
+    pd.testing.assert_series_equal(read['Kick-off'], dates.dt.tz_localize(None), check_dtype=False, check_names=False)
+
+
+
+def test_export_skips_unchanged_tables(tmp_path):
+    tables = {'standings': pd.DataFrame({'Player': ['A'], 'Points': [3]})}
+    first = export_tables(tables, str(tmp_path), formats=('xlsx', 'csv'))
+    second = export_tables(tables, str(tmp_path), formats=('xlsx', 'csv'))
+    assert first['Written'].all() and not second['Written'].any()
+
+    tables['standings'].loc[0, 'Points'] = 4
+    assert export_tables(tables, str(tmp_path), formats=('xlsx', 'csv'))['Written'].all()
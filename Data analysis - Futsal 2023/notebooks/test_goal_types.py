@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from goal_types import ADVANTAGE, EQUALIZING, REDUCTION, TIEBREAKER, TURNING, GoalState, classify_goals
+
+
+
+def shared_date_goals():
+    # Two matches on the same day: the second starts from 0x0, whatever the first ended with
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2023-05-02'] * 6),
+        'Match': [0, 0, 0, 1, 1, 1],
+        'Score': ['1x0', '2x0', '2x1', '1x0', '1x1', '1x2']
+    })
+
+
+
+def test_matches_on_a_shared_date_are_classified_apart():
+    df = shared_date_goals()
+    expected = [TIEBREAKER, ADVANTAGE, REDUCTION, TIEBREAKER, EQUALIZING, TURNING]
+    assert classify_goals(df).tolist() == expected
+    assert classify_goals(df, key='Match').tolist() == expected
+
+    # One goal at a time gives the same types
+    states = {}
+    live = [states.setdefault(match, GoalState()).update(*score.split('x')) for match, score in zip(df['Match'], df['Score'])]
+    assert live == expected
+
+
+
+def test_goals_without_a_match_are_kept_apart_by_date():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2023-05-02', '2023-05-02', '2023-05-09']),
+        'Match': [-1, -1, -1],
+        'Score': ['1x0', '2x0', '0x1']
+    })
+    assert classify_goals(df, key='Match').tolist() == [TIEBREAKER, ADVANTAGE, TIEBREAKER]
+
+
+
+def test_goals_without_a_match_id_are_classified_by_date():
+    df = shared_date_goals().drop(columns='Match').iloc[:3].assign(Score=['1x0', '1x1', np.nan])
+    assert classify_goals(df).tolist()[:2] == [TIEBREAKER, EQUALIZING]
+    assert pd.isna(classify_goals(df).iloc[2])
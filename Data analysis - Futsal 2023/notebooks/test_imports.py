@@ -0,0 +1,12 @@
+import pytest
+
+from benchmark import CORE_MODULES, HEAVY_MODULES, PLOTTING_MODULES, import_time
+
+
+
+@pytest.mark.parametrize('modules', [['auxiliary_functions'], PLOTTING_MODULES, CORE_MODULES + PLOTTING_MODULES])
+def test_no_plotting_library_on_import(modules):
+    # Each import runs in a fresh interpreter: matplotlib, seaborn, PIL and IPython load only when something is drawn
+    assert {'matplotlib', 'seaborn', 'PIL'} <= set(HEAVY_MODULES)
+    seconds, heavy = import_time(modules, repeats=1)
+    assert heavy == []
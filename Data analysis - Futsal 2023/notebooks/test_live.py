@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from live import run_live
+from match_log import MatchLog
+
+
+START_EVENT = {'event': 'start', 'date': '2024-03-05', 'location': 'Court', 'team_a': ['Ana', 'Bia'], 'team_b': ['Caio', 'Duda']}
+
+
+
+async def feed(events):
+    for event in events:
+        yield event
+
+
+
+def run(events, **kwargs):
+    log = MatchLog()
+    return log, asyncio.run(run_live(feed(events), log, **kwargs))
+
+
+
+def test_a_match_from_start_to_end():
+    updates = []
+    log, finished = run([START_EVENT,
+                         {'Scorer': 'Ana', 'Assistant': 'Bia', 'Minute': 3, 'Score': '1x0'},
+                         {'Scorer': 'Caio', 'Minute': 30, 'Score': '1x1'},
+                         {'Scorer': 'Bia', 'Minute': 41, 'Score': '2x1'},
+                         {'event': 'end'}], on_update=updates.append)
+    assert [update.score for update in updates] == [(1, 0), (1, 1), (2, 1)]
+    assert [update.goal_type for update in updates] == ['Tiebreaker Goal', 'Equalizing Goal', 'Tiebreaker Goal']
+    assert len(finished) == 1 and log.n_matches == 1
+    assert log.goals_frame()['Score'].tolist() == ['1x0', '1x1', '2x1']
+
+
+
+def test_start_while_a_match_is_open():
+    # The second start is refused, so the goals of the open match still reach the log when it ends
+    errors = []
+    log, finished = run([START_EVENT,
+                         {'Scorer': 'Ana', 'Minute': 3, 'Score': '1x0'},
+                         {**START_EVENT, 'date': '2024-03-06'},
+                         {'Scorer': 'Caio', 'Minute': 30, 'Score': '1x1'},
+                         {'event': 'end'}], on_error=lambda event, error: errors.append(error))
+    assert len(errors) == 1 and 'still open' in str(errors[0])
+    assert len(finished) == 1 and finished[0].date.day == 5
+    assert log.goals_frame()['Score'].tolist() == ['1x0', '1x1']
+
+    with pytest.raises(ValueError, match='still open'):
+        run([START_EVENT, START_EVENT])
+
+
+
+@pytest.mark.parametrize('event, message', [({'Scorer': 'Ana', 'Score': '1x0'}, 'Goal before'), ({'event': 'end'}, 'End before')])
+def test_events_outside_a_match(event, message):
+    with pytest.raises(ValueError, match=message):
+        run([event])
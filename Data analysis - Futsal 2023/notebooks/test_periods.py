@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from ingest import load_season, number_matches
+from participation import ParticipationIndex
+from periods import period_labels, period_rankings, period_table
+
+
+
+def test_labels_carry_the_year():
+    dates = pd.to_datetime(['2023-01-01', '2023-01-02', '2023-12-25', '2024-04-10', '2023-04-10'])
+    _, weeks = period_labels(dates, 'week')
+    # 2023-01-01 is a Sunday, in the ISO week that started in 2022; 2023-12-25 is 51 weeks later
+    assert weeks.nunique() == 5 and weeks[0] != weeks[1]
+    assert str(weeks[0]) == '2022-12-26/2023-01-01'
+
+    _, months = period_labels(dates, 'month')
+    assert [str(month) for month in months] == ['2023-01', '2023-01', '2023-12', '2024-04', '2023-04']
+    _, quarters = period_labels(dates, 'quarter')
+    assert [str(quarter) for quarter in quarters] == ['2023Q1', '2023Q1', '2023Q4', '2024Q2', '2023Q2']
+    assert period_labels(dates, 'year')[1].tolist() == [2023, 2023, 2023, 2024, 2023]
+
+
+
+def two_seasons(later=pd.DateOffset(years=1)):
+    # The season and the same season 'later'
+    df, df_vd = load_season()
+    df_vd = number_matches(pd.concat([df_vd, df_vd.assign(Date=df_vd['Date'] + later)], ignore_index=True).drop(columns='Match'))
+    df = pd.concat([df, df.assign(Date=df['Date'] + later)], ignore_index=True)
+    return ParticipationIndex(df_vd), df
+
+
+
+# The weeks are moved by whole weeks, so every match keeps its weekday
+@pytest.mark.parametrize('period, later', [('month', pd.DateOffset(years=1)), ('quarter', pd.DateOffset(years=1)),
+                                           ('week', pd.Timedelta(weeks=52))])
+def test_seasons_stay_in_their_own_rows(period, later):
+    index, df = two_seasons(later)
+    table = period_table(index, df, period)
+    column = table.columns[1]
+    years = table[column].dt.start_time.dt.year
+    first, second = table[years == 2023].drop(columns=column), table[years == 2024].drop(columns=column)
+
+    # The second season repeats the first row for row
+    assert len(first) + len(second) == len(table)
+    pd.testing.assert_frame_equal(first.reset_index(drop=True), second.reset_index(drop=True))
+
+
+
+def test_rankings_of_a_month():
+    index, df = two_seasons()
+    table = period_table(index, df, 'month')
+    april = period_rankings(table, '2023-04')
+    assert [ranking.equals(other) for ranking, other in zip(april, period_rankings(table, pd.Period('2023-04', freq='M')))] == [True] * 3
+    assert april[0]['Points'].tolist() == period_rankings(table, '2024-04')[0]['Points'].tolist()
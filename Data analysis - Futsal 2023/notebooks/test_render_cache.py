@@ -0,0 +1,53 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import render_cache
+from batch_render import RenderJob
+from render_cache import RenderCache
+
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    # A copy of the analysis modules the keys are computed from, free to edit
+    folder = tmp_path / 'modules'
+    shutil.copytree(render_cache.MODULE_DIR, folder, ignore=shutil.ignore_patterns('.*', '__pycache__', '*.ipynb'))
+    monkeypatch.setattr(render_cache, 'MODULE_DIR', str(folder))
+    return folder
+
+
+
+def edit(path, old, new):
+    source = path.read_text(encoding='utf-8')
+    assert old in source
+    path.write_text(source.replace(old, new, 1), encoding='utf-8')
+
+
+
+def job_key(tmp_path):
+    job = RenderJob('Season Standing', 'plot_season_standings_table', (pd.DataFrame({'Player': ['Thomas'], 'Points': [3]}),), {})
+    return RenderCache(str(tmp_path / 'cache')).key(job, ['png'])
+
+
+
+def test_key_is_stable(modules, tmp_path):
+    assert job_key(tmp_path) == job_key(tmp_path)
+
+
+
+@pytest.mark.parametrize('module, old, new', [
+    # A helper and a constant of auxiliary_functions that plot_season_standings_table uses
+    ('auxiliary_functions.py', "def format_efficiency(df, column='Efficiency', decimals=2):",
+     "def format_efficiency(df, column='Efficiency', decimals=1):"),
+    ('auxiliary_functions.py', "color_points_bg = '#41210A'", "color_points_bg = '#000000'"),
+    # Modules reached through imports
+    ('tables.py', 'CELL_PAD = 0.6', 'CELL_PAD = 0.8'),
+    ('fonts.py', 'import os', 'import os\n'),
+    ('style.py', 'def apply_theme():', 'def apply_theme():\n    pass\n')
+])
+def test_code_change_misses(modules, tmp_path, module, old, new):
+    before = job_key(tmp_path)
+    edit(modules / module, old, new)
+    assert job_key(tmp_path) != before
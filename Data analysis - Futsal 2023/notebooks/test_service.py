@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+
+from service import StatsService
+
+
+
+@pytest.fixture(scope='module')
+def service():
+    return StatsService.from_pipeline()
+
+
+
+def get(service, target):
+    status, body, etag = service.response(target)
+    return status, json.loads(body)
+
+
+
+def test_tables(service):
+    status, rows = get(service, '/standings')
+    assert status == 200 and len(rows) == len(service.df_players)
+    assert get(service, '/scorers?limit=3')[1] == get(service, '/scorers')[1][:3]
+    assert get(service, '/assistants?limit=0') == (200, [])
+    assert get(service, '/standings/extra')[0] == 404
+
+
+
+@pytest.mark.parametrize('limit', ['-1', 'x', '1.5', '%C2%B2', '%D9%A3'])
+def test_invalid_limit(service, limit):
+    # Only ASCII digits: '²' is a digit to str.isdigit but not to int, the Arabic-Indic '٣' to both
+    assert get(service, f'/scorers?limit={limit}') == (400, {'error': 'limit must be a non-negative integer'})
+
+
+
+def test_players(service):
+    status, players = get(service, '/players')
+    assert status == 200 and players == service.player_index.players
+    player = players[0]
+    status, profile = get(service, f'/players/{player}')
+    assert status == 200 and set(profile['goals_by_segment']) == {'Beginning', 'Middle', 'End'}
+    status, teammates = get(service, f'/players/{player}/teammates')
+    assert status == 200 and all(row['Teammate'] != player for row in teammates)
+
+    assert get(service, '/players/Nobody') == (404, {'error': 'Unknown player: Nobody'})
+    assert get(service, f'/players/{player}/rivals') == (404, {'error': 'Not found'})
+    assert get(service, f'/players/{player}/teammates/x') == (404, {'error': 'Not found'})
+    assert get(service, '/nowhere') == (404, {'error': 'Not found'})
+    assert get(service, '/health')[1] == {'status': 'ok', 'players': len(players)}
+
+
+
+async def _exchange(service, requests):
+    # Send the raw requests over one connection and read back (status, headers, body) for each response
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    try:
+        for request in requests:
+            writer.write(request.encode('latin-1'))
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            headers = dict(line.split(': ', 1) for line in lines[1:] if line)
+            length = 0 if request.startswith('HEAD') else int(headers['Content-Length'])
+            responses.append((int(lines[0].split(' ')[1]), headers, await reader.readexactly(length)))
+        closed = await reader.read() == b''
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+    return responses, closed
+
+
+
+def exchange(service, *requests):
+    return asyncio.run(_exchange(service, requests))
+
+
+
+def test_keep_alive_etag_and_head(service):
+    (first, revalidated, head, last), closed = exchange(
+        service,
+        'GET /standings HTTP/1.1\r\nHost: x\r\n\r\n',
+        'GET /standings HTTP/1.1\r\nHost: x\r\nIf-None-Match: {etag}\r\n\r\n'.format(etag=service.response('/standings')[2]),
+        'HEAD /standings HTTP/1.1\r\nHost: x\r\n\r\n',
+        'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n'
+    )
+    status, headers, body = first
+    assert status == 200 and headers['Connection'] == 'keep-alive'
+    assert json.loads(body) == get(service, '/standings')[1]
+    assert revalidated[0] == 304 and revalidated[2] == b'' and revalidated[1]['ETag'] == headers['ETag']
+    assert head[0] == 200 and head[1]['Content-Length'] == headers['Content-Length']
+    assert last[0] == 200 and last[1]['Connection'] == 'close'
+    assert closed
+
+
+
+def test_http_1_0_closes_by_default(service):
+    (response,), closed = exchange(service, 'GET /health HTTP/1.0\r\n\r\n')
+    assert response[0] == 200 and response[1]['Connection'] == 'close' and closed
+
+
+
+def test_errors(service, monkeypatch):
+    def fail(parts, query):
+        raise RuntimeError('broken')
+
+    monkeypatch.setitem(service.routes, 'broken', fail)
+    (error, refused, limit, alive), closed = exchange(
+        service,
+        'GET /broken HTTP/1.1\r\n\r\n',
+        'POST /standings HTTP/1.1\r\nContent-Length: 0\r\n\r\n',
+        'GET /scorers?limit=%C2%B2 HTTP/1.1\r\n\r\n',
+        'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n'
+    )
+    assert error[0] == 500 and json.loads(error[2]) == {'error': 'Internal server error'}
+    assert refused[0] == 405
+    assert limit[0] == 400
+    assert alive[0] == 200 and closed
@@ -0,0 +1,21 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+# Value of every player after each match: 'values' is a dense matches x players matrix
+Timeline = namedtuple('Timeline', ['dates', 'players', 'values'])
+
+
+
+def points_timeline(index):
+    # Points earned by each player in each match (sparse), then accumulated down the matches
+    points = index.to_sparse(values=index.points.astype(np.int32)).toarray()
+    return Timeline(index.dates, index.players, np.cumsum(points, axis=0))
+
+
+
+def timeline_columns(timeline, player_names):
+    # Columns of the chosen players, in the order they were given
+    positions = {name: i for i, name in enumerate(timeline.players)}
+    return timeline.values[:, [positions[player] for player in player_names]]
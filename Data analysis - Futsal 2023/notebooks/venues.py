@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from ingest import NO_ASSIST, OWN_GOAL
+from participation import DRAW, LOSS, WIN, OUTCOME_POINTS
+
+
+# Columns of the venue table, as plot_goals_per_location expects them
+VENUE_COLUMNS = ['Location', 'Total Goals', 'Number of Matches', 'Average']
+
+# Columns of the player x venue table
+VENUE_PLAYER_COLUMNS = ['Location', 'Player', 'Matches', 'Wins', 'Losses', 'Draws', 'Points', 'Efficiency', 'Goals', 'Assists']
+
+
+
+def _keyed(df, df_vd):
+    # Goals and matches with their match IDs (ingest.load_season adds them, frames built elsewhere may lack them)
+    from ingest import assign_matches, number_matches
+
+    if 'Match' not in df_vd.columns:
+        df_vd = number_matches(df_vd)
+    if 'Match' not in df.columns:
+        df = assign_matches(df, df_vd)
+    return df, df_vd
+
+
+
+def goal_locations(df, df_vd):
+    # Venue of every goal, through the match it was scored in (NaN for goals without a match)
+    df, df_vd = _keyed(df, df_vd)
+    return df['Match'].map(df_vd.set_index('Match')['Location'].astype(object))
+
+
+
+def venue_counts(df, df_vd):
+    # Goals and matches of each venue, each goal counted once at the venue of its match
+    matches = df_vd.groupby('Location', observed=True).size()
+    goals = goal_locations(df, df_vd).value_counts()
+
+    # Plain labels, also when the venues are categorical (schema.compact_matches)
+    return goals.rename(index=str), matches.rename(index=str)
+
+
+
+def venue_table(df, df_vd):
+    return venue_summary(*venue_counts(df, df_vd))
+
+
+
+def venue_summary(goals, matches):
+    # Venue table from the goals and matches of each venue (Series indexed by location)
+    df_venues = pd.DataFrame({'Location': matches.index,
+                              'Total Goals': goals.reindex(matches.index, fill_value=0).to_numpy(),
+                              'Number of Matches': matches.to_numpy()})
+    df_venues['Average'] = df_venues['Total Goals'] / df_venues['Number of Matches']
+    return df_venues[VENUE_COLUMNS]
+
+
+
+class VenueStats:
+    # Venue aggregates of a season, computed once: the venue table (matches, goals and average goals of each
+    # venue) and the results, goals and assists of every player at every venue. The charts and the drill-downs
+    # read from these instead of joining goals and matches again
+
+    def __init__(self, index, df, df_vd):
+        df, df_vd = _keyed(df, df_vd)
+        locations = goal_locations(df, df_vd)
+        goals, matches = venue_counts(df, df_vd)
+        self.table = venue_summary(goals, matches)
+        self.locations = self.table['Location'].tolist()
+
+        # (loss, draw, win) counts of each (venue, player) in one pass over the participation rows
+        codes = pd.Index(self.locations).get_indexer(index.locations[index.match].astype(str))
+        bins = (codes.astype(np.int64) * index.n_players + index.player) * 3 + index.outcome
+        counts = np.bincount(bins, minlength=len(self.locations) * index.n_players * 3).reshape(-1, 3)
+        players = pd.MultiIndex.from_product([self.locations, index.players], names=['Location', 'Player'])
+        df_players = pd.DataFrame({
+            'Matches': counts.sum(axis=1),
+            'Wins': counts[:, WIN],
+            'Losses': counts[:, LOSS],
+            'Draws': counts[:, DRAW],
+            'Points': counts @ OUTCOME_POINTS.astype(np.int64)
+        }, index=players)
+        df_players = df_players[df_players['Matches'] > 0]
+        df_players = df_players.assign(Efficiency=(df_players['Points'] / (df_players['Matches'] * 3) * 100).round(2))
+
+        # Credited goals and assists of each (venue, player), of the players with results there
+        for label, column in [('Goals', 'Scorer'), ('Assists', 'Assistant')]:
+            credited = pd.DataFrame({'Location': locations.astype(object), 'Player': df[column].astype(object)})
+            credited = credited[~credited['Player'].isin([NO_ASSIST, OWN_GOAL]) & credited['Location'].notna()]
+            df_players[label] = credited.groupby(['Location', 'Player']).size().reindex(df_players.index, fill_value=0).to_numpy()
+
+        self.players = df_players.reset_index()[VENUE_PLAYER_COLUMNS]
+
+    def venue(self, location):
+        # Players of a venue, the most points first
+        df_venue = self.players[self.players['Location'] == location]
+        return df_venue.sort_values(by=['Points', 'Efficiency'], ascending=False, kind='stable').reset_index(drop=True)
+
+    def player(self, player):
+        # A player at every venue they played at, in the order of the venue table
+        return self.players[self.players['Player'] == player].reset_index(drop=True)